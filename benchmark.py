@@ -0,0 +1,328 @@
+"""Headless benchmarks for the simulation hot paths
+
+Times Particle.update over N particles, calculate_bernoulli_effect, one
+telemetry tick, saving, mapping and restoring state files, and draw_particles,
+draw_ui, the force/height strip chart and a complete run-loop frame (with the
+default and the deferred GC mode) at several window sizes and particle counts
+under the SDL dummy video driver, plus the time to the first presented frame
+measured in fresh processes. Results are written as JSON; a previous result
+file can be given as a baseline, in which case every case is compared by its
+median and the exit status is 1 if any case got slower than the tolerance
+allows.
+
+Usage:
+    python benchmark.py --json baseline.json
+    python benchmark.py --json current.json --baseline baseline.json --tolerance 0.15
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+BENCHMARK_VERSION = 1
+WINDOW_SIZES = ((800, 600), (1400, 800), (1920, 1080))
+PARTICLE_COUNTS = (300, 2000)
+UPDATE_COUNTS = (300, 2000, 10000)
+STATE_COUNTS = (2000, 100000)
+STATE_RUNS = 20
+STRIP_CHART_SPANS = (10, 120)  # Seconds of history; the per-frame cost should not depend on it
+FRAME_DT = 1.0 / 60
+
+# Frame cases stay below the minimum particle life (200 steps), so the
+# particle count does not change while a case is being timed
+FRAME_RUNS = 120
+WARMUP_RUNS = 10
+STARTUP_RUNS = 5
+
+
+def summarize(samples_ns):
+    """Per-call statistics in milliseconds from a list of nanosecond timings"""
+    values = sorted(samples_ns)
+    count = len(values)
+    return {
+        "runs": count,
+        "median_ms": values[count // 2] / 1e6,
+        "mean_ms": sum(values) / count / 1e6,
+        "min_ms": values[0] / 1e6,
+        "p95_ms": values[min(count - 1, int(count * 0.95))] / 1e6,
+        "max_ms": values[-1] / 1e6
+    }
+
+
+def measure(func, runs, warmup=WARMUP_RUNS):
+    """Call func warmup + runs times and summarize the timed calls"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter_ns()
+        func()
+        samples.append(time.perf_counter_ns() - start)
+    return summarize(samples)
+
+
+def bench_particle_update(count, runs):
+    """One update pass over `count` particles; needs no display"""
+    from bernoulli_core import Particle
+
+    random.seed(0)
+    particles = [Particle(random.uniform(-400, 400), random.uniform(-300, 300), random.uniform(-200, 200))
+                 for _ in range(count)]
+    ball_pos = [200, 400, 0]
+
+    def update_all():
+        for particle in particles:
+            particle.update(20, 30, 5, ball_pos, 30, FRAME_DT)
+    return measure(update_all, runs)
+
+
+def bench_bernoulli_effect(runs):
+    """Force model on the display-free core"""
+    from bernoulli_core import SimulationCore
+
+    core = SimulationCore()
+    core.init_physics_state([200, 400, 0])
+    core.wind_angle = 30
+    core.wind_vertical = 5
+    return measure(core.calculate_bernoulli_effect, runs)
+
+
+def bench_state_file(count, runs):
+    """Save, map and fully restore a state file holding `count` particles; one result each"""
+    from bernoulli_core import SimulationCore
+    from state_file import StateFile, save_state, load_state
+
+    random.seed(0)
+    core = SimulationCore()
+    core.init_physics_state([200, 400, 0])
+    core.particles = []
+    core.spawn_particles(count)
+    restored = SimulationCore()
+    restored.init_physics_state([0, 0, 0])
+
+    def open_state():
+        StateFile(path).close()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "state.bin")
+        return (measure(lambda: save_state(core, path), runs, warmup=1),
+                measure(open_state, runs, warmup=1),
+                measure(lambda: load_state(restored, path), runs, warmup=1))
+
+
+def bench_telemetry_record(runs):
+    """Append one tick to the memory-mapped telemetry ring buffer"""
+    from bernoulli_core import SimulationCore
+    from telemetry import TelemetryRecorder
+
+    core = SimulationCore()
+    core.init_physics_state([200, 400, 0])
+    with tempfile.TemporaryDirectory() as directory:
+        recorder = TelemetryRecorder(os.path.join(directory, "telemetry.bin"))
+        try:
+            return measure(lambda: recorder.record_tick(core, FRAME_DT), runs)
+        finally:
+            recorder.close()
+
+
+def bench_strip_chart(simulation, span_seconds, runs):
+    """Feed and draw the force/height chart for one frame"""
+    simulation.toggle_strip_chart()
+    simulation.strip_chart.span_seconds = span_seconds
+    simulation.draw_strip_chart()  # Place the chart and render it once
+
+    def frame():
+        simulation.update_strip_chart(FRAME_DT)
+        simulation.draw_strip_chart()
+    try:
+        return measure(frame, runs)
+    finally:
+        simulation.toggle_strip_chart()
+
+
+def make_simulation(size, particle_count, gc_mode="auto"):
+    """Simulation at a window size with exactly `particle_count` particles"""
+    from bernoulli_dual_view_refactored import BernoulliSimulation
+
+    random.seed(0)
+    simulation = BernoulliSimulation(target_fps=0, pacing="none", gc_mode=gc_mode)
+    simulation.resize_window(*size)
+    simulation.particles = []
+    simulation.spawn_particles(particle_count)
+    simulation.draw_frame()  # Build the static layer and widget layout
+    return simulation
+
+
+def bench_run_frame(simulation, runs):
+    def frame():
+        simulation.run_frame(FRAME_DT)
+        simulation.frame_index += 1
+    return measure(frame, runs)
+
+
+def bench_run_frame_deferred_gc(size, particle_count, runs):
+    """Complete frames with startup objects frozen and collection moved after the flip"""
+    from gc_control import restore_gc
+
+    simulation = make_simulation(size, particle_count, gc_mode="deferred")
+    try:
+        return bench_run_frame(simulation, runs)
+    finally:
+        restore_gc()
+
+
+def startup_probe():
+    """Construct the simulation, present one frame and print the startup report as JSON"""
+    from bernoulli_dual_view_refactored import BernoulliSimulation
+
+    simulation = BernoulliSimulation(target_fps=0, pacing="none")
+    simulation.run_frame(FRAME_DT)
+    simulation.finish_startup()
+    print(json.dumps(simulation.startup.report()))
+
+
+def bench_time_to_first_frame(runs):
+    """Startup report of `runs` fresh interpreter processes; phases are medians"""
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    command = [sys.executable, "-c", "import benchmark; benchmark.startup_probe()"]
+    reports = []
+    for _ in range(runs):
+        output = subprocess.run(command, env=env, cwd=os.path.dirname(os.path.abspath(__file__)),
+                                capture_output=True, text=True, check=True).stdout
+        reports.append(json.loads(output.strip().splitlines()[-1]))
+
+    stats = summarize([report["total_ms"] * 1e6 for report in reports])
+    stats["phases_ms"] = {phase: sorted(report["phases_ms"][phase] for report in reports)[runs // 2]
+                          for phase in reports[0]["phases_ms"]}
+    return stats
+
+
+def run_benchmarks(runs, sizes=WINDOW_SIZES, counts=PARTICLE_COUNTS, update_counts=UPDATE_COUNTS,
+                   state_counts=STATE_COUNTS, only=None, startup_runs=STARTUP_RUNS):
+    """Run every case whose name contains `only` (all cases if None); return {name: stats}"""
+    results = {}
+
+    def add(name, stats):
+        results[name] = stats
+        print(f"  {name:<40} {stats['median_ms']:9.3f} ms")
+
+    def record(name, bench, *args):
+        if only is None or only in name:
+            add(name, bench(*args))
+
+    for count in update_counts:
+        record(f"particle_update[n={count}]", bench_particle_update, count, runs)
+
+    record("calculate_bernoulli_effect", bench_bernoulli_effect, runs * 10)
+    record("telemetry_record", bench_telemetry_record, runs * 10)
+    for count in state_counts:
+        names = [f"{stage}_state[n={count}]" for stage in ("save", "map", "load")]
+        if only is None or any(only in name for name in names):
+            for name, stats in zip(names, bench_state_file(count, min(runs, STATE_RUNS))):
+                add(name, stats)
+    record("time_to_first_frame", bench_time_to_first_frame, startup_runs)
+
+    for size in sizes:
+        for count in counts:
+            tag = f"{size[0]}x{size[1]},n={count}"
+            names = [f"{stage}[{tag}]" for stage in ("draw_particles", "draw_ui", "frame", "frame_gc_deferred")]
+            names += [f"strip_chart[{tag},span={span}s]" for span in STRIP_CHART_SPANS]
+            if only is not None and not any(only in name for name in names):
+                continue
+            simulation = make_simulation(size, count)
+            record(names[0], measure, simulation.draw_particles, runs)
+            record(names[1], measure, simulation.draw_ui, runs)
+            record(names[2], bench_run_frame, simulation, min(runs, FRAME_RUNS))
+            record(names[3], bench_run_frame_deferred_gc, size, count, min(runs, FRAME_RUNS))
+            for name, span in zip(names[4:], STRIP_CHART_SPANS):
+                record(name, bench_strip_chart, simulation, span, runs)
+    return results
+
+
+def environment():
+    import pygame
+    return {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "platform": platform.platform(),
+        "machine": platform.machine()
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Compare medians against a baseline; return the names of regressed cases"""
+    regressions = []
+    print(f"\n{'case':<40} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, stats in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<40} {'-':>10} {stats['median_ms']:10.3f} {'new':>8}")
+            continue
+        ratio = stats["median_ms"] / reference["median_ms"] if reference["median_ms"] > 0 else 1.0
+        flag = ""
+        if ratio > 1 + tolerance:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<40} {reference['median_ms']:10.3f} {stats['median_ms']:10.3f} "
+              f"{(ratio - 1) * 100:+7.1f}%{flag}")
+    return regressions
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Benchmark the simulation headlessly")
+    parser.add_argument("--json", metavar="PATH", default=None,
+                        help="write the results to PATH")
+    parser.add_argument("--baseline", metavar="PATH", default=None,
+                        help="compare against a previous --json result")
+    parser.add_argument("--tolerance", type=float, default=0.15,
+                        help="allowed slowdown of the median before a case fails (default: 0.15)")
+    parser.add_argument("--runs", type=int, default=200,
+                        help="timed calls per case (default: 200)")
+    parser.add_argument("--quick", action="store_true",
+                        help="one window size and particle count, fewer runs")
+    parser.add_argument("--only", metavar="TEXT", default=None,
+                        help="only run cases whose name contains TEXT")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Render offscreen - must be set before pygame initializes the display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if args.quick:
+        runs = min(args.runs, 50)
+        results = run_benchmarks(runs, sizes=WINDOW_SIZES[1:2], counts=PARTICLE_COUNTS[:1],
+                                 update_counts=UPDATE_COUNTS[:2], state_counts=STATE_COUNTS[:1],
+                                 only=args.only, startup_runs=3)
+    else:
+        results = run_benchmarks(args.runs, only=args.only)
+
+    report = {"version": BENCHMARK_VERSION, "environment": environment(), "results": results}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("version") != BENCHMARK_VERSION:
+            print(f"warning: baseline was written by benchmark version {baseline.get('version')}")
+        regressions = compare(results, baseline["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than "
+                  f"{args.tolerance:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,349 @@
+"""Display-independent core of the dual-view simulations
+
+State defaults, the wind model, the particle engine and the ball integrator
+shared by every front-end. Nothing here imports pygame, so the physics can be
+stepped, benchmarked or tested without a display. Front-ends mix in
+SimulationCore and only supply the layout-dependent ball boundaries.
+"""
+import math
+import random
+from collections import namedtuple
+
+# Physical constants
+AIR_DENSITY = 1.225  # kg/m³
+GRAVITY = 9.81  # m/s²
+ATMOSPHERIC_PRESSURE = 101325  # Pa
+
+PARTICLE_COLORS = [(255, 255, 255), (173, 216, 230), (200, 200, 255)]
+
+# Limits for the ball position; ground_z is the floor of the depth axis
+BallBounds = namedtuple("BallBounds", "ground ceiling left right min_z max_z ground_z")
+
+
+def wind_components(wind_speed, wind_angle, wind_vertical):
+    """Wind vector (x, y, z) from the slider values"""
+    wind_rad = math.radians(wind_angle)
+    return wind_speed * math.cos(wind_rad), wind_vertical, wind_speed * math.sin(wind_rad)
+
+
+def bernoulli_forces(wind_speed, wind_angle, wind_vertical, ball_radius, vertical_thrust,
+                     side_force_coefficient):
+    """Pressures and forces on the ball for the given wind and ball size"""
+    wind_rad = math.radians(wind_angle)
+    wind_x, wind_y, wind_z = wind_components(wind_speed, wind_angle, wind_vertical)
+
+    # Calculate relative wind speed
+    relative_wind_speed = math.sqrt(wind_x**2 + wind_y**2 + wind_z**2)
+
+    # Ball properties
+    ball_radius_m = ball_radius / 100.0  # Convert pixels to meters
+    ball_area = math.pi * ball_radius_m**2
+    ball_mass = (4/3) * math.pi * (ball_radius_m**3) * 500  # Assume density 500 kg/m³
+
+    # Only calculate lift if there's significant wind
+    if relative_wind_speed > 0.5:  # Minimum wind threshold
+        # Magnus effect and flow separation
+        top_velocity = relative_wind_speed * 1.4
+        bottom_velocity = relative_wind_speed * 0.8
+
+        # Add angle factor for more realistic lift
+        angle_factor = abs(math.sin(wind_rad)) * 0.3
+        lift_coefficient = 0.5 * (1 + angle_factor)
+
+        # Calculate pressure using Bernoulli equation
+        top_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * top_velocity**2
+        bottom_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * bottom_velocity**2
+
+        pressure_difference = bottom_pressure - top_pressure
+
+        # Calculate forces
+        lift_force = pressure_difference * ball_area * lift_coefficient + vertical_thrust
+        side_force = wind_x * AIR_DENSITY * ball_area * side_force_coefficient
+        front_force = wind_z * AIR_DENSITY * ball_area * side_force_coefficient
+    else:
+        # No significant wind - no lift, only thrust
+        top_pressure = ATMOSPHERIC_PRESSURE
+        bottom_pressure = ATMOSPHERIC_PRESSURE
+        pressure_difference = 0
+        lift_force = vertical_thrust  # Only manual thrust
+        side_force = 0
+        front_force = 0
+
+    return {
+        "top_pressure": top_pressure,
+        "bottom_pressure": bottom_pressure,
+        "pressure_diff": pressure_difference,
+        "lift_force": lift_force,
+        "side_force": side_force,
+        "front_force": front_force,
+        "ball_mass": ball_mass
+    }
+
+
+class Particle:
+    """Wind tracer particle; subclasses may shrink its bounds and size"""
+    BOUNDS = (800, 600, 400)  # Reset once |x|, |y| or |z| exceeds these
+    SIZE_RANGE = (1, 3)
+
+    def __init__(self, x, y, z):
+        self.x = x
+        self.y = y
+        self.z = z
+        self.vx = 0
+        self.vy = 0
+        self.vz = 0
+        self.life = random.randint(200, 255)
+        self.size = random.uniform(*self.SIZE_RANGE)
+        self.color = random.choice(PARTICLE_COLORS)
+
+    def update(self, wind_speed, wind_angle, wind_vertical, ball_pos, ball_radius, dt):
+        # Convert wind angle to radians
+        wind_rad = math.radians(wind_angle)
+        wind_vec_x = math.cos(wind_rad)
+        wind_vec_z = math.sin(wind_rad)
+
+        # Calculate distance to ball
+        dx = self.x - ball_pos[0]
+        dy = self.y - ball_pos[1]
+        dz = self.z - ball_pos[2]
+        distance = math.sqrt(dx*dx + dy*dy + dz*dz)
+
+        # Wind field flow
+        if distance > ball_radius + 20:
+            # Far from ball - follow wind direction
+            self.vx = wind_vec_x * wind_speed * 0.3
+            self.vy = wind_vertical * 0.3
+            self.vz = wind_vec_z * wind_speed * 0.3
+
+            # Streamline curvature around ball
+            if distance < ball_radius + 100:
+                influence = (ball_radius + 100 - distance) / 100
+                self.vy += (1 if dy > 0 else -1) * influence * wind_speed * 0.1
+        else:
+            # Flow around ball
+            if distance > ball_radius:
+                angle = math.atan2(dy, dx)
+                self.vx = math.cos(angle + math.pi/2) * wind_speed * 0.3
+                self.vy = math.sin(angle + math.pi/2) * wind_speed * 0.3
+
+        # Update position
+        self.x += self.vx * dt * 60
+        self.y += self.vy * dt * 60
+        self.z += self.vz * dt * 60
+
+        # Reset particles that go out of bounds
+        bound_x, bound_y, bound_z = self.BOUNDS
+        if abs(self.x) > bound_x or abs(self.y) > bound_y or abs(self.z) > bound_z:
+            self.reset_position(wind_vec_x, wind_vec_z)
+
+        self.life = max(0, self.life - 1)
+
+    def reset_position(self, wind_vec_x, wind_vec_z):
+        """Reset particle position upwind, near the edge of the bounds"""
+        bound_x, bound_y, bound_z = self.BOUNDS
+        if wind_vec_x > 0:
+            self.x = random.uniform(-bound_x, -bound_x * 0.75)
+        elif wind_vec_x < 0:
+            self.x = random.uniform(bound_x * 0.75, bound_x)
+        else:
+            self.x = random.uniform(-bound_x, bound_x)
+
+        if wind_vec_z > 0:
+            self.z = random.uniform(-bound_z, -bound_z * 0.5)
+        elif wind_vec_z < 0:
+            self.z = random.uniform(bound_z * 0.5, bound_z)
+        else:
+            self.z = random.uniform(-bound_z, bound_z)
+
+        self.y = random.uniform(-bound_y * 0.5, bound_y * 0.5)
+        self.life = random.randint(200, 255)
+
+    def is_alive(self):
+        return self.life > 0
+
+
+class SimulationCore:
+    """Ball state, particle engine and integrator mixed into each front-end
+
+    Front-ends call init_physics_state() from their constructor and implement
+    ball_bounds() from their own layout. The class attributes below are the
+    knobs that differ between variants.
+    """
+    PARTICLE_CLASS = Particle
+    INITIAL_PARTICLES = 300
+    SPAWN_EXTENT = (400, 300, 200)  # Half-size of the region new particles appear in
+    SPAWN_PER_STEP = 5  # Dead particles replaced per step
+    ACCELERATION_SCALE = 50
+
+    def init_physics_state(self, ball_pos):
+        """Ball, wind and force state with the default slider values"""
+        # Ball properties
+        self.ball_pos = list(ball_pos)
+        self.ball_radius = 30
+        self.ball_mass = 0.5  # kg
+        self.ball_velocity = [0, 0, 0]  # [vx, vy, vz]
+
+        # Wind properties
+        self.wind_speed = 20  # m/s
+        self.wind_angle = 0   # degrees
+        self.wind_vertical = 0  # m/s
+        self.vertical_thrust = 0  # Additional thrust force
+        self.side_force_coefficient = 0.2  # Drag coefficient for side force
+
+        self.dragging = False
+
+        # Physics data for display
+        self.physics_data = {
+            "top_pressure": ATMOSPHERIC_PRESSURE,
+            "bottom_pressure": ATMOSPHERIC_PRESSURE,
+            "pressure_diff": 0,
+            "lift_force": 0,
+            "side_force": 0,
+            "front_force": 0,
+            "weight": 0,
+            "net_force": 0
+        }
+
+    def ball_bounds(self):
+        """BallBounds for the current layout"""
+        raise NotImplementedError
+
+    def spawn_particles(self, count):
+        """Add particles at random positions inside SPAWN_EXTENT"""
+        extent_x, extent_y, extent_z = self.SPAWN_EXTENT
+        for _ in range(count):
+            x = random.uniform(-extent_x, extent_x)
+            y = random.uniform(-extent_y, extent_y)
+            z = random.uniform(-extent_z, extent_z)
+            self.particles.append(self.PARTICLE_CLASS(x, y, z))
+
+    def generate_particles(self):
+        """Generate new particles to replace dead ones"""
+        dead_count = sum(1 for p in self.particles if not p.is_alive())
+        if dead_count == 0:
+            return  # Nothing to replace - keep the list instead of copying it every step
+        self.spawn_particles(min(dead_count, self.SPAWN_PER_STEP))
+
+        # Remove dead particles
+        self.particles = [p for p in self.particles if p.is_alive()]
+
+    def update_particles(self, dt):
+        """Move every particle through the current wind field"""
+        for particle in self.particles:
+            particle.update(self.wind_speed, self.wind_angle, self.wind_vertical,
+                            self.ball_pos, self.ball_radius, dt)
+
+    def calculate_bernoulli_effect(self):
+        """Calculate Bernoulli effect with improved accuracy"""
+        data = bernoulli_forces(self.wind_speed, self.wind_angle, self.wind_vertical, self.ball_radius,
+                                self.vertical_thrust, self.side_force_coefficient)
+        self.ball_mass = data["ball_mass"]
+        self.physics_data.update(data)
+
+        return {
+            "lift": data["lift_force"],
+            "side": data["side_force"],
+            "front": data["front_force"],
+            "ball_mass": data["ball_mass"],
+            "net_force": data["lift_force"]
+        }
+
+    def update_ball_physics(self, dt):
+        """Update ball physics with proper 3D motion and gravity"""
+        if self.dragging:
+            return
+
+        forces = self.calculate_bernoulli_effect()
+        ball_mass = forces["ball_mass"]
+
+        # Gravity affects all directions - primarily Y (downward) but also Z if tilted
+        weight_y = ball_mass * GRAVITY  # Primary gravity downward
+        weight_z = ball_mass * GRAVITY * 0.05  # Small Z-component gravity
+
+        # Calculate net forces and accelerations
+        net_force_y = forces["lift"] - weight_y  # Y direction (screen up/down)
+        net_force_x = forces["side"]  # X direction (screen left/right)
+        net_force_z = forces["front"] - weight_z  # Z direction (depth)
+        self.physics_data["weight"] = weight_y
+        self.physics_data["net_force"] = net_force_y
+
+        acceleration_y = net_force_y / ball_mass if ball_mass > 0 else 0
+        acceleration_x = net_force_x / ball_mass if ball_mass > 0 else 0
+        acceleration_z = net_force_z / ball_mass if ball_mass > 0 else 0
+
+        # Update velocities
+        scale = self.ACCELERATION_SCALE
+        self.ball_velocity[1] += acceleration_y * dt * scale
+        self.ball_velocity[0] += acceleration_x * dt * scale
+        self.ball_velocity[2] += acceleration_z * dt * scale
+
+        # Update positions
+        self.ball_pos[1] += self.ball_velocity[1] * dt
+        self.ball_pos[0] += self.ball_velocity[0] * dt
+        self.ball_pos[2] += self.ball_velocity[2] * dt
+
+        # Apply damping
+        bounds = self.ball_bounds()
+        if abs(self.ball_pos[1] - bounds.ground) < 10 and abs(self.ball_velocity[1]) < 5:
+            # Strong damping near ground
+            for i in range(3):
+                self.ball_velocity[i] *= 0.9
+        else:
+            # Normal damping
+            for i in range(3):
+                self.ball_velocity[i] *= 0.98
+
+        # Boundary constraints
+        self.apply_boundary_constraints(bounds)
+
+    def apply_boundary_constraints(self, bounds=None):
+        """Apply boundary constraints to keep ball in view with proper physics"""
+        if bounds is None:
+            bounds = self.ball_bounds()
+
+        # Y boundaries (ground and ceiling)
+        if self.ball_pos[1] >= bounds.ground:
+            self.ball_pos[1] = bounds.ground
+            if abs(self.ball_velocity[1]) < 2:
+                self.ball_velocity[1] = 0
+            else:
+                self.ball_velocity[1] = -abs(self.ball_velocity[1]) * 0.3
+        elif self.ball_pos[1] <= bounds.ceiling:
+            self.ball_pos[1] = bounds.ceiling
+            self.ball_velocity[1] = abs(self.ball_velocity[1]) * 0.3
+
+        # X boundaries (left and right walls)
+        if self.ball_pos[0] <= bounds.left:
+            self.ball_pos[0] = bounds.left
+            if abs(self.ball_velocity[0]) < 2:
+                self.ball_velocity[0] = 0
+            else:
+                self.ball_velocity[0] = abs(self.ball_velocity[0]) * 0.3
+        elif self.ball_pos[0] >= bounds.right:
+            self.ball_pos[0] = bounds.right
+            if abs(self.ball_velocity[0]) < 2:
+                self.ball_velocity[0] = 0
+            else:
+                self.ball_velocity[0] = -abs(self.ball_velocity[0]) * 0.3
+
+        # Z boundaries (front and back walls)
+        if self.ball_pos[2] >= bounds.max_z:
+            self.ball_pos[2] = bounds.max_z
+            if abs(self.ball_velocity[2]) < 2:
+                self.ball_velocity[2] = 0
+            else:
+                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
+        elif self.ball_pos[2] <= bounds.min_z:
+            self.ball_pos[2] = bounds.min_z
+            if abs(self.ball_velocity[2]) < 2:
+                self.ball_velocity[2] = 0
+            else:
+                self.ball_velocity[2] = abs(self.ball_velocity[2]) * 0.3
+
+        # Z方向地面約束
+        if self.ball_pos[2] >= bounds.ground_z:
+            self.ball_pos[2] = bounds.ground_z
+            if abs(self.ball_velocity[2]) < 2:
+                self.ball_velocity[2] = 0
+            elif self.ball_velocity[2] > 0:
+                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
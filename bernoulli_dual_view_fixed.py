@@ -1,11 +1,10 @@
 import pygame
 import math
-import random
 import sys
+import time
 import os
 
-# Initialize Pygame
-pygame.init()
+from bernoulli_core import SimulationCore, BallBounds, GRAVITY, Particle as CoreParticle
 
 # Constants - 修改預設大小為 800x600
 WIDTH = 800
@@ -42,10 +41,6 @@ CLOSE_BUTTON_COLOR = (196, 43, 28)
 MINIMIZE_BUTTON_COLOR = (255, 189, 68)
 RESIZE_BUTTON_COLOR = (52, 152, 219)  # 藍色縮放按鈕
 
-# Physics constants
-AIR_DENSITY = 1.225  # kg/m³
-GRAVITY = 9.81  # m/s²
-ATMOSPHERIC_PRESSURE = 101325  # Pa
 
 class WindowControls:
     """Handle window control buttons and title bar"""
@@ -200,82 +195,24 @@ class ResponsiveLayout:
         """Get rectangle for the left toolbar"""
         return pygame.Rect(0, TITLE_BAR_HEIGHT, LEFT_TOOLBAR_WIDTH, self.content_height)
 
-class Particle:
-    def __init__(self, x, y, z):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.vx = 0
-        self.vy = 0
-        self.vz = 0
-        self.life = random.randint(200, 255)
-        self.size = random.uniform(1, 2)  # 減小粒子大小
-        self.color = random.choice([WHITE, LIGHT_BLUE, (200, 200, 255)])
-        
-    def update(self, wind_speed, wind_angle, wind_vertical, ball_pos, ball_radius, dt):
-        # Convert wind angle to radians
-        wind_rad = math.radians(wind_angle)
-        wind_vec_x = math.cos(wind_rad)
-        wind_vec_z = math.sin(wind_rad)
-        
-        # Calculate distance to ball
-        dx = self.x - ball_pos[0]
-        dy = self.y - ball_pos[1]
-        dz = self.z - ball_pos[2]
-        distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-        
-        # Wind field flow
-        if distance > ball_radius + 20:
-            # Far from ball - follow wind direction
-            self.vx = wind_vec_x * wind_speed * 0.3
-            self.vy = wind_vertical * 0.3
-            self.vz = wind_vec_z * wind_speed * 0.3
-            
-            # Streamline curvature around ball
-            if distance < ball_radius + 100:
-                influence = (ball_radius + 100 - distance) / 100
-                self.vy += (1 if dy > 0 else -1) * influence * wind_speed * 0.1
-        else:
-            # Flow around ball
-            if distance > ball_radius:
-                angle = math.atan2(dy, dx)
-                self.vx = math.cos(angle + math.pi/2) * wind_speed * 0.3
-                self.vy = math.sin(angle + math.pi/2) * wind_speed * 0.3
-        
-        # Update position
-        self.x += self.vx * dt * 60
-        self.y += self.vy * dt * 60
-        self.z += self.vz * dt * 60
-        
-        # Reset particles that go out of bounds
-        if abs(self.x) > 400 or abs(self.y) > 300 or abs(self.z) > 200:  # 減小邊界
-            self.reset_position(wind_vec_x, wind_vec_z)
-        
-        self.life = max(0, self.life - 1)
+class Particle(CoreParticle):
+    BOUNDS = (400, 300, 200)  # 減小邊界
+    SIZE_RANGE = (1, 2)  # 減小粒子大小
+
+
+class BernoulliSimulation(SimulationCore):
+    # 減少粒子數量並減小加速度係數
+    PARTICLE_CLASS = Particle
+    INITIAL_PARTICLES = 150
+    SPAWN_EXTENT = (200, 150, 100)
+    SPAWN_PER_STEP = 3
+    ACCELERATION_SCALE = 30
     
-    def reset_position(self, wind_vec_x, wind_vec_z):
-        """Reset particle position based on wind direction"""
-        if wind_vec_x > 0:
-            self.x = random.uniform(-400, -300)
-        elif wind_vec_x < 0:
-            self.x = random.uniform(300, 400)
-        else:
-            self.x = random.uniform(-400, 400)
-            
-        if wind_vec_z > 0:
-            self.z = random.uniform(-200, -100)
-        elif wind_vec_z < 0:
-            self.z = random.uniform(100, 200)
-        else:
-            self.z = random.uniform(-200, 200)
-            
-        self.y = random.uniform(-150, 150)
-        self.life = random.randint(200, 255)
-        
-    def is_alive(self):
-        return self.life > 0
-class BernoulliSimulation:
     def __init__(self):
+        # Only the subsystems the simulation uses - no audio, joystick, etc.
+        pygame.display.init()
+        pygame.font.init()
+        
         # Initialize window with responsive design - 預設 800x600
         self.current_width = WIDTH
         self.current_height = HEIGHT
@@ -291,20 +228,11 @@ class BernoulliSimulation:
         # Ball properties - 修正初始位置計算
         content_height = self.current_height - TITLE_BAR_HEIGHT
         ground_level = content_height - 80  # 距離地面的高度
-        self.ball_pos = [self.layout.view_width // 2, ground_level + TITLE_BAR_HEIGHT, 0]
+        self.init_physics_state([self.layout.view_width // 2, ground_level + TITLE_BAR_HEIGHT, 0])
         self.ball_radius = 20  # 減小初始半徑以適應小視窗
-        self.ball_mass = 0.5  # kg
-        self.ball_velocity = [0, 0, 0]  # [vx, vy, vz]
-        
-        # Wind properties
         self.wind_speed = 15  # 減小初始風速
-        self.wind_angle = 0   # degrees
-        self.wind_vertical = 0  # m/s
-        self.vertical_thrust = 0  # Additional thrust force
-        self.side_force_coefficient = 0.2  # Drag coefficient for side force
         
-        # Physics state
-        self.dragging = False
+        # Interaction state
         self.active_view = None  # "xy" or "zx"
         self.drag_offset = [0, 0]
         
@@ -317,11 +245,7 @@ class BernoulliSimulation:
         self.particle_surface_xy = pygame.Surface((self.layout.view_width, self.layout.content_height), pygame.SRCALPHA)
         self.particle_surface_xz = pygame.Surface((self.layout.view_width, self.layout.content_height), pygame.SRCALPHA)
         
-        for _ in range(150):  # 減少粒子數量
-            x = random.uniform(-200, 200)
-            y = random.uniform(-150, 150)
-            z = random.uniform(-100, 100)
-            self.particles.append(Particle(x, y, z))
+        self.spawn_particles(self.INITIAL_PARTICLES)
         
         # Initialize fonts
         self.update_fonts()
@@ -337,16 +261,6 @@ class BernoulliSimulation:
         }
         self.active_slider = None
         
-        # Physics data for display
-        self.physics_data = {
-            "top_pressure": ATMOSPHERIC_PRESSURE,
-            "bottom_pressure": ATMOSPHERIC_PRESSURE,
-            "pressure_diff": 0,
-            "lift_force": 0,
-            "side_force": 0,
-            "front_force": 0
-        }
-        
         # Window resize options - 修正預設索引
         self.resize_options = [
             (800, 600, "小視窗"),
@@ -404,178 +318,18 @@ class BernoulliSimulation:
         new_width, new_height, _ = self.resize_options[self.current_resize_index]
         self.resize_window(new_width, new_height)
     
-    def calculate_bernoulli_effect(self):
-        """Calculate Bernoulli effect with improved accuracy"""
-        # Convert wind direction to vector
-        wind_rad = math.radians(self.wind_angle)
-        wind_x = self.wind_speed * math.cos(wind_rad)
-        wind_z = self.wind_speed * math.sin(wind_rad)
-        wind_y = self.wind_vertical
-        
-        # Calculate relative wind speed
-        relative_wind_speed = math.sqrt(wind_x**2 + wind_y**2 + wind_z**2)
-        
-        # Ball properties
-        ball_radius_m = self.ball_radius / 100.0  # Convert pixels to meters
-        ball_area = math.pi * ball_radius_m**2
-        ball_mass = (4/3) * math.pi * (ball_radius_m**3) * 500  # Assume density 500 kg/m³
-        self.ball_mass = ball_mass
-        
-        # Only calculate lift if there's significant wind
-        if relative_wind_speed > 0.5:  # Minimum wind threshold
-            # Magnus effect and flow separation
-            top_velocity = relative_wind_speed * 1.4
-            bottom_velocity = relative_wind_speed * 0.8
-            
-            # Add angle factor for more realistic lift
-            angle_factor = abs(math.sin(wind_rad)) * 0.3
-            lift_coefficient = 0.5 * (1 + angle_factor)
-            
-            # Calculate pressure using Bernoulli equation
-            top_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * top_velocity**2
-            bottom_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * bottom_velocity**2
-            
-            pressure_difference = bottom_pressure - top_pressure
-            
-            # Calculate forces
-            lift_force = pressure_difference * ball_area * lift_coefficient + self.vertical_thrust
-            side_force = wind_x * AIR_DENSITY * ball_area * self.side_force_coefficient
-            front_force = wind_z * AIR_DENSITY * ball_area * self.side_force_coefficient
-        else:
-            # No significant wind - no lift, only thrust
-            top_pressure = ATMOSPHERIC_PRESSURE
-            bottom_pressure = ATMOSPHERIC_PRESSURE
-            pressure_difference = 0
-            lift_force = self.vertical_thrust  # Only manual thrust
-            side_force = 0
-            front_force = 0
-        
-        # Update physics data
-        self.physics_data.update({
-            "top_pressure": top_pressure,
-            "bottom_pressure": bottom_pressure,
-            "pressure_diff": pressure_difference,
-            "lift_force": lift_force,
-            "side_force": side_force,
-            "front_force": front_force,
-            "ball_mass": ball_mass
-        })
-        
-        return {
-            "lift": lift_force,
-            "side": side_force,
-            "front": front_force,
-            "ball_mass": ball_mass,
-            "net_force": lift_force
-        }
-    
-    def update_ball_physics(self, dt):
-        """Update ball physics with proper 3D motion and gravity"""
-        if self.dragging:
-            return
-        
-        forces = self.calculate_bernoulli_effect()
-        ball_mass = forces["ball_mass"]
-        
-        # Gravity affects all directions - primarily Y (downward) but also Z if tilted
-        weight_y = ball_mass * GRAVITY  # Primary gravity downward
-        weight_z = ball_mass * GRAVITY * 0.05  # Small Z-component gravity
-        
-        # Calculate net forces and accelerations
-        net_force_y = forces["lift"] - weight_y  # Y direction (screen up/down)
-        net_force_x = forces["side"]  # X direction (screen left/right)
-        net_force_z = forces["front"] - weight_z  # Z direction (depth)
-        
-        acceleration_y = net_force_y / ball_mass if ball_mass > 0 else 0
-        acceleration_x = net_force_x / ball_mass if ball_mass > 0 else 0
-        acceleration_z = net_force_z / ball_mass if ball_mass > 0 else 0
-        
-        # Update velocities
-        self.ball_velocity[1] += acceleration_y * dt * 30  # 減小加速度係數
-        self.ball_velocity[0] += acceleration_x * dt * 30
-        self.ball_velocity[2] += acceleration_z * dt * 30
-        
-        # Update positions
-        self.ball_pos[1] += self.ball_velocity[1] * dt
-        self.ball_pos[0] += self.ball_velocity[0] * dt
-        self.ball_pos[2] += self.ball_velocity[2] * dt
-        
-        # Apply damping
+    def ball_bounds(self):
+        """Ball limits for the current layout - adjusted for title bar"""
         content_height = self.current_height - TITLE_BAR_HEIGHT
-        ground_level = content_height - self.ball_radius - 30 + TITLE_BAR_HEIGHT
-        
-        if abs(self.ball_pos[1] - ground_level) < 10 and abs(self.ball_velocity[1]) < 5:
-            # Strong damping near ground
-            for i in range(3):
-                self.ball_velocity[i] *= 0.9
-        else:
-            # Normal damping
-            for i in range(3):
-                self.ball_velocity[i] *= 0.98
-        
-        # Boundary constraints
-        self.apply_boundary_constraints()
-    
-    def apply_boundary_constraints(self):
-        """Apply boundary constraints to keep ball in view with proper physics"""
-        content_height = self.current_height - TITLE_BAR_HEIGHT
-        
-        # Y boundaries (ground and ceiling) - adjusted for title bar
-        ground_level = content_height - self.ball_radius - 30 + TITLE_BAR_HEIGHT
-        ceiling_level = self.ball_radius + 30 + TITLE_BAR_HEIGHT
-        
-        if self.ball_pos[1] >= ground_level:
-            self.ball_pos[1] = ground_level
-            if abs(self.ball_velocity[1]) < 2:
-                self.ball_velocity[1] = 0
-            else:
-                self.ball_velocity[1] = -abs(self.ball_velocity[1]) * 0.3
-        elif self.ball_pos[1] <= ceiling_level:
-            self.ball_pos[1] = ceiling_level
-            self.ball_velocity[1] = abs(self.ball_velocity[1]) * 0.3
-        
-        # X boundaries (left and right walls)
-        left_wall = self.ball_radius
-        right_wall = self.layout.view_width - self.ball_radius
-        
-        if self.ball_pos[0] <= left_wall:
-            self.ball_pos[0] = left_wall
-            if abs(self.ball_velocity[0]) < 2:
-                self.ball_velocity[0] = 0
-            else:
-                self.ball_velocity[0] = abs(self.ball_velocity[0]) * 0.3
-        elif self.ball_pos[0] >= right_wall:
-            self.ball_pos[0] = right_wall
-            if abs(self.ball_velocity[0]) < 2:
-                self.ball_velocity[0] = 0
-            else:
-                self.ball_velocity[0] = -abs(self.ball_velocity[0]) * 0.3
-        
-        # Z boundaries (front and back walls) - 修正Z邊界
-        max_z = content_height // 4
-        min_z = -content_height // 4
-        ground_z = content_height // 6
-        
-        if self.ball_pos[2] >= max_z:
-            self.ball_pos[2] = max_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            else:
-                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
-        elif self.ball_pos[2] <= min_z:
-            self.ball_pos[2] = min_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            else:
-                self.ball_velocity[2] = abs(self.ball_velocity[2]) * 0.3
-        
-        # Z方向地面約束
-        if self.ball_pos[2] >= ground_z:
-            self.ball_pos[2] = ground_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            elif self.ball_velocity[2] > 0:
-                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
+        return BallBounds(
+            ground=content_height - self.ball_radius - 30 + TITLE_BAR_HEIGHT,
+            ceiling=self.ball_radius + 30 + TITLE_BAR_HEIGHT,
+            left=self.ball_radius,
+            right=self.layout.view_width - self.ball_radius,
+            min_z=-content_height // 4,  # 修正Z邊界
+            max_z=content_height // 4,
+            ground_z=content_height // 6
+        )
     
     def get_ball_color(self):
         """Get ball color based on lift force"""
@@ -1176,27 +930,14 @@ class BernoulliSimulation:
         
         return True
     
-    def generate_particles(self):
-        """Generate new particles to replace dead ones"""
-        dead_count = sum(1 for p in self.particles if not p.is_alive())
-        
-        for _ in range(min(dead_count, 3)):  # Replace fewer particles each frame
-            x = random.uniform(-200, 200)
-            y = random.uniform(-150, 150)
-            z = random.uniform(-100, 100)
-            self.particles.append(Particle(x, y, z))
-        
-        # Remove dead particles
-        self.particles = [p for p in self.particles if p.is_alive()]
-    
     def run(self):
         """Main simulation loop"""
         running = True
-        last_time = pygame.time.get_ticks()
+        last_time = time.perf_counter()
         
         while running:
-            current_time = pygame.time.get_ticks()
-            dt = min(0.1, (current_time - last_time) / 1000.0)
+            current_time = time.perf_counter()
+            dt = min(0.1, current_time - last_time)
             last_time = current_time
             
             # Handle events
@@ -1206,9 +947,7 @@ class BernoulliSimulation:
             self.update_ball_physics(dt)
             
             # Update particles
-            for particle in self.particles:
-                particle.update(self.wind_speed, self.wind_angle, self.wind_vertical,
-                              self.ball_pos, self.ball_radius, dt)
+            self.update_particles(dt)
             
             # Generate new particles
             self.generate_particles()
@@ -1,11 +1,28 @@
+import time
+
+# Taken before anything else is imported so the startup report covers the imports
+STARTUP_ORIGIN = time.perf_counter()
+
 import pygame
 import math
 import random
 import sys
 import os
+import argparse
+import threading
+import json
+from collections import namedtuple
 
-# Initialize Pygame
-pygame.init()
+from frame_timing import FrameTimer, RateCounter, StageProfiler, StartupTimer, PACING_MODES
+from ui_widgets import Slider, Label, Panel, InfoReadout, Sparkline, StripChart
+from input_latency import LatencyTracker
+from input_replay import InputRecorder
+from frame_trace import TraceRecorder
+from gc_control import AllocationCounter, GC_MODES, enable_deferred_gc, collect_if_due
+from state_file import StateFile, save_state, load_state
+from telemetry import TelemetryRecorder, TELEMETRY_CAPACITY
+from flow_field import FieldHeatmap, QuiverField, HEATMAP_MODES, view_free_stream
+from bernoulli_core import SimulationCore, BallBounds, GRAVITY
 
 # Constants
 WIDTH = 1400
@@ -13,7 +30,15 @@ HEIGHT = 800
 MIN_WIDTH = 800
 MIN_HEIGHT = 600
 FPS = 60
+PHYSICS_HZ = 120  # Physics rate when running on the worker thread
+INFO_REFRESH_HZ = 10  # Physics readout refresh rate
+LATENCY_REFRESH_HZ = 4  # Latency overlay refresh rate
+PROFILER_REFRESH_HZ = 4  # Profiler overlay refresh rate
+PROFILER_HISTORY = 120  # Frames kept for the profiler averages and sparkline
+RESIZE_SETTLE_SECONDS = 0.15  # Rebuild the layout once the window size is stable this long
 VIEW_WIDTH = 400  # Width for 3D visualization
+STATE_FILE = "bernoulli_state.bin"  # Saved with F5, restored with F9
+STRIP_CHART_SECONDS = 10  # History shown by the force/height chart (G)
 
 # Base dimensions for scaling
 BASE_WIDTH = 1400
@@ -42,10 +67,34 @@ CLOSE_BUTTON_COLOR = (196, 43, 28)
 MINIMIZE_BUTTON_COLOR = (255, 189, 68)
 MAXIMIZE_BUTTON_COLOR = (39, 174, 96)
 
-# Physics constants (matching HTML version)
-AIR_DENSITY = 1.225  # kg/m³
-GRAVITY = 9.81  # m/s²
-ATMOSPHERIC_PRESSURE = 101325  # Pa
+# Slider key -> simulation attribute it controls
+SLIDER_ATTRIBUTES = {
+    "wind_speed": "wind_speed",
+    "wind_angle": "wind_angle",
+    "wind_vertical": "wind_vertical",
+    "ball_radius": "ball_radius",
+    "vertical_thrust": "vertical_thrust",
+    "side_force_coeff": "side_force_coefficient"
+}
+
+# Force/height chart (G): (label, color, axis) per series, and the initial axis ranges
+STRIP_CHART_SERIES = (("升力", GREEN, "force"), ("重量", RED, "force"), ("淨力", DARK_GRAY, "force"),
+                      ("高度", BLUE, "height"))
+STRIP_CHART_AXES = {"force": ("力", "N", -100, 100), "height": ("高度", "m", 0, 5)}
+
+# Run-loop stages timed by the profiler overlay, in execution order
+PROFILER_STAGES = ("handle_events", "update_ball_physics", "update_particles", "generate_particles",
+                   "static", "draw_particles", "overlays", "draw_ball", "draw_ui", "flip", "gc")
+
+# Methods recorded as spans by --trace, besides run_frame and every draw_* method
+TRACED_METHODS = ("handle_events", "update_pending_resize", "step_simulation", "update_ball_physics",
+                  "calculate_bernoulli_effect", "update_particles", "generate_particles",
+                  "capture_snapshot", "build_static_layer", "update_display", "present",
+                  "present_resize_preview")
+
+# Ball sprite cache settings
+BALL_SPRITE_CACHE_SIZE = 128  # Maximum number of cached ball sprites
+BALL_SPRITE_SUPERSAMPLE = 2  # Render scale for anti-aliasing (1 disables smoothing)
 
 class WindowControls:
     """Handle window control buttons and title bar"""
@@ -145,9 +194,19 @@ class WindowControls:
                            (center_x - icon_size//2, center_y),
                            (center_x + icon_size//2, center_y), 2)
 
+# Precomputed geometry of one control panel slider
+SliderGeometry = namedtuple("SliderGeometry", "track_rect hit_rect label_center extra_center")
+
 class ResponsiveLayout:
-    """Handle responsive layout calculations"""
-    def __init__(self, width, height):
+    """Handle responsive layout calculations
+    
+    All geometry is computed once per update_layout call. `version` increases
+    on every update so dependent caches know when to rebuild.
+    """
+    def __init__(self, width, height, slider_count=0):
+        self.version = 0
+        self.slider_count = slider_count
+        self.strip_chart_visible = False
         self.update_layout(width, height)
     
     def update_layout(self, width, height):
@@ -164,6 +223,7 @@ class ResponsiveLayout:
         # Layout calculations
         self.middle_section_width = max(200, int(width * 0.25))
         self.view_width = (width - self.middle_section_width) // 2
+        self.right_view_x = self.view_width + self.middle_section_width
         
         # Font sizes based on scale
         self.base_font_size = max(10, int(self.content_height / 50 * self.global_scale))
@@ -173,108 +233,244 @@ class ResponsiveLayout:
         self.slider_height = max(20, int(30 * self.global_scale))
         self.button_padding = max(5, int(10 * self.global_scale))
         self.panel_margin = max(5, int(10 * self.global_scale))
+        
+        self.compute_geometry()
+        self.version += 1
+    
+    def compute_geometry(self):
+        """Precompute rectangles, origins and anchors for the current size"""
+        scale = self.global_scale
+        
+        # Main areas
+        self.content_rect = pygame.Rect(0, TITLE_BAR_HEIGHT, self.width, self.content_height)
+        self.view_rects = (
+            pygame.Rect(0, TITLE_BAR_HEIGHT, self.view_width, self.content_height),
+            pygame.Rect(self.right_view_x, TITLE_BAR_HEIGHT, self.view_width, self.content_height)
+        )
+        self.control_panel_rect = pygame.Rect(self.view_width, TITLE_BAR_HEIGHT,
+                                              self.middle_section_width, self.content_height)
+        self.info_rect = pygame.Rect(self.control_panel_rect.x + 10, self.height - 200,
+                                     self.control_panel_rect.width - 20, 180)
+        self.instructions_rect = pygame.Rect(10, TITLE_BAR_HEIGHT + 50, self.view_width - 20,
+                                             max(120, int(140 * scale)))
+        
+        # Force/height chart above the info panel; the sliders close up to make room
+        self.strip_chart_rect = None
+        if self.strip_chart_visible:
+            chart_height = max(80, int(110 * scale))
+            self.strip_chart_rect = pygame.Rect(self.info_rect.x, self.info_rect.y - 10 - chart_height,
+                                                self.info_rect.width, chart_height)
+        
+        # Boundary lines
+        self.ground_y = int(self.content_height - 50 * self.scale_y) + TITLE_BAR_HEIGHT
+        self.ceiling_y = int(50 * self.scale_y) + TITLE_BAR_HEIGHT
+        self.z_ground_y = int((self.content_height // 2 + self.content_height // 4) * self.scale_y) + TITLE_BAR_HEIGHT
+        
+        # Axis origins (bottom-left corner of each view) and wind vector centers
+        axes_y = int(self.height - 80 * self.scale_y)
+        self.axis_origins = (
+            (int(30 * scale), axes_y),
+            (int(self.right_view_x + 30 * scale), axes_y)
+        )
+        center_y = int(self.content_height // 2 + TITLE_BAR_HEIGHT)
+        self.view_centers = (
+            (int(self.view_width // 2), center_y),
+            (int(self.right_view_x + self.view_width // 2), center_y)
+        )
+        
+        # Text anchors
+        label_offset = int(10 * scale)
+        self.label_anchors = {
+            "xy_title": (10, TITLE_BAR_HEIGHT + 10),
+            "zx_title": (self.right_view_x + 10, TITLE_BAR_HEIGHT + 10),
+            "ground": (label_offset, self.ground_y + int(5 * scale)),
+            "ground_zx": (self.right_view_x + label_offset, self.ground_y + int(5 * scale)),
+            "z_ground": (self.right_view_x + label_offset, self.z_ground_y + int(5 * scale)),
+            "panel_title": (self.control_panel_rect.centerx, TITLE_BAR_HEIGHT + 30),
+            "info_title": (self.info_rect.x + 10, self.info_rect.y + 5),
+            "info_lines": (self.info_rect.x + 10, self.info_rect.y + 30),
+            "total_wind": (int(10 * scale), self.height - int(30 * scale)),
+            "hud": (self.right_view_x + int(10 * scale), self.height - int(30 * scale)),
+            "latency": (self.right_view_x + 10, self.ceiling_y + 10),
+            "profiler": (20, self.instructions_rect.bottom + 10)
+        }
+        
+        # Slider tracks and hit boxes
+        self.slider_width = int(self.middle_section_width * 0.8)
+        self.slider_x = self.control_panel_rect.centerx - self.slider_width // 2
+        self.slider_thickness = max(4, int(8 * scale))
+        self.slider_handle_radius = max(6, int(12 * scale))
+        self.slider_geometry = [self.compute_slider_geometry(index) for index in range(self.slider_count)]
+    
+    def compute_slider_geometry(self, index):
+        """Geometry of the slider at a given position in the control panel"""
+        y_increment = int(self.content_height * 0.15 * self.scale_y)
+        first_offset = int(TITLE_BAR_HEIGHT + 70 * self.scale_y)
+        if self.strip_chart_rect is not None and self.slider_count > 1:
+            # Last hit box ends 40 px below its offset and 10 px above the chart
+            available = self.strip_chart_rect.top - 10 - int(40 * self.scale_y) - first_offset
+            y_increment = min(y_increment, available // (self.slider_count - 1))
+        y_offset = first_offset + index * y_increment
+        slider_y = y_offset + int(20 * self.scale_y)
+        middle_x = self.control_panel_rect.centerx
+        return SliderGeometry(
+            track_rect=pygame.Rect(self.slider_x, slider_y - self.slider_thickness // 2,
+                                   self.slider_width, self.slider_thickness),
+            hit_rect=pygame.Rect(self.slider_x, y_offset + int(10 * self.scale_y),
+                                 self.slider_width, int(30 * self.scale_y)),
+            label_center=(middle_x, y_offset - 5),
+            extra_center=(middle_x, y_offset + min(45, int(y_increment * 0.6)))
+        )
+    
+    def set_slider_count(self, count):
+        """Set how many sliders the control panel holds"""
+        if count != self.slider_count:
+            self.slider_count = count
+            self.update_layout(self.width, self.height)
+    
+    def set_strip_chart_visible(self, visible):
+        """Reserve (or release) room for the force/height chart in the control panel"""
+        if visible != self.strip_chart_visible:
+            self.strip_chart_visible = visible
+            self.update_layout(self.width, self.height)
     
     def get_content_rect(self):
         """Get the main content area (below title bar)"""
-        return pygame.Rect(0, TITLE_BAR_HEIGHT, self.width, self.content_height)
+        return self.content_rect
     
     def get_view_rects(self):
         """Get rectangles for left and right view panels"""
-        content_rect = self.get_content_rect()
-        left_view = pygame.Rect(0, TITLE_BAR_HEIGHT, self.view_width, self.content_height)
-        right_view = pygame.Rect(self.view_width + self.middle_section_width, TITLE_BAR_HEIGHT, 
-                               self.view_width, self.content_height)
-        return left_view, right_view
+        return self.view_rects
     
     def get_control_panel_rect(self):
         """Get rectangle for the middle control panel"""
-        return pygame.Rect(self.view_width, TITLE_BAR_HEIGHT, 
-                         self.middle_section_width, self.content_height)
+        return self.control_panel_rect
 
-class Particle:
-    def __init__(self, x, y, z):
-        self.x = x
-        self.y = y
-        self.z = z
-        self.vx = 0
-        self.vy = 0
-        self.vz = 0
-        self.life = random.randint(200, 255)
-        self.size = random.uniform(1, 3)
-        self.color = random.choice([WHITE, LIGHT_BLUE, (200, 200, 255)])
-        
-    def update(self, wind_speed, wind_angle, wind_vertical, ball_pos, ball_radius, dt):
-        # Convert wind angle to radians
-        wind_rad = math.radians(wind_angle)
-        wind_vec_x = math.cos(wind_rad)
-        wind_vec_z = math.sin(wind_rad)
-        
-        # Calculate distance to ball
-        dx = self.x - ball_pos[0]
-        dy = self.y - ball_pos[1]
-        dz = self.z - ball_pos[2]
-        distance = math.sqrt(dx*dx + dy*dy + dz*dz)
-        
-        # Wind field flow
-        if distance > ball_radius + 20:
-            # Far from ball - follow wind direction
-            self.vx = wind_vec_x * wind_speed * 0.3
-            self.vy = wind_vertical * 0.3
-            self.vz = wind_vec_z * wind_speed * 0.3
-            
-            # Streamline curvature around ball
-            if distance < ball_radius + 100:
-                influence = (ball_radius + 100 - distance) / 100
-                self.vy += (1 if dy > 0 else -1) * influence * wind_speed * 0.1
-        else:
-            # Flow around ball
-            if distance > ball_radius:
-                angle = math.atan2(dy, dx)
-                self.vx = math.cos(angle + math.pi/2) * wind_speed * 0.3
-                self.vy = math.sin(angle + math.pi/2) * wind_speed * 0.3
-        
-        # Update position
-        self.x += self.vx * dt * 60
-        self.y += self.vy * dt * 60
-        self.z += self.vz * dt * 60
-        
-        # Reset particles that go out of bounds
-        if abs(self.x) > 800 or abs(self.y) > 600 or abs(self.z) > 400:
-            self.reset_position(wind_vec_x, wind_vec_z)
-        
-        self.life = max(0, self.life - 1)
-    
-    def reset_position(self, wind_vec_x, wind_vec_z):
-        """Reset particle position based on wind direction"""
-        if wind_vec_x > 0:
-            self.x = random.uniform(-800, -600)
-        elif wind_vec_x < 0:
-            self.x = random.uniform(600, 800)
-        else:
-            self.x = random.uniform(-800, 800)
-            
-        if wind_vec_z > 0:
-            self.z = random.uniform(-400, -200)
-        elif wind_vec_z < 0:
-            self.z = random.uniform(200, 400)
-        else:
-            self.z = random.uniform(-400, 400)
-            
-        self.y = random.uniform(-300, 300)
-        self.life = random.randint(200, 255)
-        
-    def is_alive(self):
-        return self.life > 0
+class BallSpriteCache:
+    """Cache pre-composited ball sprites keyed by radius, color and scale"""
+    def __init__(self, max_size=BALL_SPRITE_CACHE_SIZE, supersample=BALL_SPRITE_SUPERSAMPLE):
+        self.max_size = max_size
+        self.supersample = max(1, supersample)
+        self.sprites = {}
+    
+    def get(self, radius, color, scale):
+        """Return the sprite for the given key, rendering it on first use"""
+        key = (radius, color, scale)
+        sprite = self.sprites.pop(key, None)
+        if sprite is None:
+            sprite = self._render(radius, color, scale)
+            if len(self.sprites) >= self.max_size:
+                # Evict the least recently used sprite (oldest insertion)
+                del self.sprites[next(iter(self.sprites))]
+        self.sprites[key] = sprite
+        return sprite
+    
+    def clear(self):
+        """Drop all cached sprites"""
+        self.sprites.clear()
+    
+    @staticmethod
+    def anchor(radius):
+        """Offset from the sprite's top-left corner to the ball center"""
+        return radius + 1
+    
+    def _render(self, radius, color, scale):
+        """Render shadow, fill, outline and highlight into one sprite"""
+        factor = self.supersample
+        shadow_offset = int(3 * scale)
+        outline_width = max(1, int(2 * scale))
+        size = 2 * (radius + 1) + shadow_offset
+        
+        surface = pygame.Surface((size * factor, size * factor), pygame.SRCALPHA)
+        center = self.anchor(radius) * factor
+        big_radius = radius * factor
+        
+        # Shadow
+        pygame.draw.circle(surface, (50, 50, 50), 
+                         (center + shadow_offset * factor, center + shadow_offset * factor), big_radius)
+        
+        # Ball with outline
+        pygame.draw.circle(surface, color, (center, center), big_radius)
+        pygame.draw.circle(surface, BLACK, (center, center), big_radius, outline_width * factor)
+        
+        # Highlight
+        highlight = center - (radius // 3) * factor
+        pygame.draw.circle(surface, WHITE, (highlight, highlight), max(1, radius // 4) * factor)
+        
+        if factor > 1:
+            surface = pygame.transform.smoothscale(surface, (size, size))
+        return surface.convert_alpha()
+
+# Immutable state handed from the physics thread to the renderer
+ParticleState = namedtuple("ParticleState", "x y z size color life")
+SimulationSnapshot = namedtuple("SimulationSnapshot", 
+                                "step ball_pos ball_velocity ball_color ball_radius wind_speed wind_angle "
+                                "wind_vertical particles physics_data")
+
+class SnapshotBuffer:
+    """Double buffer for publishing immutable simulation snapshots"""
+    def __init__(self, initial):
+        self.slots = [initial, initial]
+        self.front = 0
+    
+    def publish(self, snapshot):
+        """Write into the back slot, then flip it to the front"""
+        back = 1 - self.front
+        self.slots[back] = snapshot
+        # A single attribute store is atomic, so readers never see a torn state
+        self.front = back
+    
+    def read(self):
+        """Return the most recently published snapshot"""
+        return self.slots[self.front]
 
-class BernoulliSimulation:
-    def __init__(self):
+class BernoulliSimulation(SimulationCore):
+    def __init__(self, threaded_physics=False, target_fps=FPS, pacing="hybrid", fixed_resolution=False,
+                 info_hz=INFO_REFRESH_HZ, latency_report=None, recorder=None, replay=None, trace=None,
+                 startup_report=None, gc_mode="auto", trace_malloc=False, state_path=None, telemetry=None):
+        if threaded_physics and (recorder is not None or replay is not None):
+            raise ValueError("recording and replay need single-threaded physics to be deterministic")
+        
+        # Startup phases up to the first presented frame
+        self.startup = StartupTimer(STARTUP_ORIGIN)
+        self.startup_report = startup_report  # "-" prints the report, anything else is a JSON path
+        self.startup.mark("import")
+        
+        # Only the subsystems the simulation uses - no audio, joystick, etc.
+        pygame.display.init()
+        pygame.font.init()
+        self.startup.mark("init")
+        
         # Initialize window with responsive design
         self.current_width = WIDTH
         self.current_height = HEIGHT
-        self.screen = pygame.display.set_mode((self.current_width, self.current_height), 
+        self.window = pygame.display.set_mode((self.current_width, self.current_height), 
                                             pygame.RESIZABLE | pygame.NOFRAME)
+        self.window_size = (self.current_width, self.current_height)
+        self.startup.mark("window")
+        
+        # Coalesced resizing - only the latest size is applied once it settles
+        self.pending_size = None
+        self.resize_deadline = 0.0
+        
+        # Fixed-resolution mode draws at the design size and scales once per frame
+        self.fixed_resolution = fixed_resolution
+        if fixed_resolution:
+            self.current_width = BASE_WIDTH
+            self.current_height = BASE_HEIGHT
+            self.screen = pygame.Surface((BASE_WIDTH, BASE_HEIGHT)).convert()
+        else:
+            self.screen = self.window
+        self.update_present_transform()
         pygame.display.set_caption("伯努利原理科學模擬 - 雙平面視圖")
-        self.clock = pygame.time.Clock()
+        self.frame_timer = FrameTimer(target_fps, pacing)
+        
+        # Input recording/replay run on a fixed timestep so sessions are reproducible
+        self.recorder = recorder
+        self.replay = replay
+        self.frame_index = 0
+        deterministic = recorder is not None or replay is not None
+        self.fixed_dt = 1.0 / (target_fps or FPS) if deterministic else None
         
         # Initialize components
         self.window_controls = WindowControls(self.current_width, self.current_height)
@@ -283,64 +479,145 @@ class BernoulliSimulation:
         # Ball properties - 預設位置在地面上方
         content_height = self.current_height - TITLE_BAR_HEIGHT
         ground_level = content_height - 100
-        self.ball_pos = [self.layout.view_width // 2, ground_level + TITLE_BAR_HEIGHT, 0]
-        self.ball_radius = 30
-        self.ball_mass = 0.5  # kg
-        self.ball_velocity = [0, 0, 0]  # [vx, vy, vz]
-        
-        # Wind properties
-        self.wind_speed = 20  # m/s
-        self.wind_angle = 0   # degrees
-        self.wind_vertical = 0  # m/s
-        self.vertical_thrust = 0  # Additional thrust force
-        self.side_force_coefficient = 0.2  # Drag coefficient for side force
-        
-        # Physics state
-        self.dragging = False
+        self.init_physics_state([self.layout.view_width // 2, ground_level + TITLE_BAR_HEIGHT, 0])
+        
+        # Interaction state
         self.active_view = None  # "xy" or "zx"
         self.drag_offset = [0, 0]
         
+        # Pre-baked ball sprites
+        self.ball_sprites = BallSpriteCache()
+        
         # Wind visualization
         self.show_wind_vectors = True
         self.wind_arrow_length = 100
         
+        # Pressure/speed field overlay around the ball
+        self.heatmap_mode = "off"
+        self.heatmap = FieldHeatmap()
+        
+        # Local flow arrows (quiver) on a grid over both views
+        self.show_quiver = False
+        self.quiver = QuiverField()
+        
         # Particles for wind visualization
         self.particles = []
         self.particle_surface_xy = pygame.Surface((self.layout.view_width, self.layout.content_height), pygame.SRCALPHA)
         self.particle_surface_xz = pygame.Surface((self.layout.view_width, self.layout.content_height), pygame.SRCALPHA)
         
-        for _ in range(300):
-            x = random.uniform(-400, 400)
-            y = random.uniform(-300, 300)
-            z = random.uniform(-200, 200)
-            self.particles.append(Particle(x, y, z))
+        self.spawn_particles(self.INITIAL_PARTICLES)
         
-        # Initialize fonts
+        # Initialize fonts (the first SysFont call scans the system fonts)
+        self.startup.mark("setup")
         self.update_fonts()
+        self.startup.mark("font")
         
         # Sliders (保留原本的中文標籤)
         self.sliders = {
-            "wind_speed": {"value": self.wind_speed, "min": -50, "max": 50, "text": "風速（右正左負，公尺/秒）"},
-            "wind_angle": {"value": self.wind_angle, "min": 0, "max": 360, "text": "風向角度（度）"},
-            "wind_vertical": {"value": self.wind_vertical, "min": -20, "max": 20, "text": "垂直風力（公尺/秒）"},
-            "ball_radius": {"value": self.ball_radius, "min": 20, "max": 80, "text": "球體半徑/質量"},
-            "vertical_thrust": {"value": self.vertical_thrust, "min": -1000, "max": 1000, "text": "上升推力（N）"},
-            "side_force_coeff": {"value": self.side_force_coefficient, "min": 0, "max": 1.0, "text": "側向力係數"}
+            "wind_speed": Slider(self.wind_speed, -50, 50, "風速（右正左負，公尺/秒）"),
+            "wind_angle": Slider(self.wind_angle, 0, 360, "風向角度（度）"),
+            "wind_vertical": Slider(self.wind_vertical, -20, 20, "垂直風力（公尺/秒）"),
+            "ball_radius": Slider(self.ball_radius, 20, 80, "球體半徑/質量"),
+            "vertical_thrust": Slider(self.vertical_thrust, -1000, 1000, "上升推力（N）"),
+            "side_force_coeff": Slider(self.side_force_coefficient, 0, 1.0, "側向力係數")
         }
         self.active_slider = None
+        self.layout.set_slider_count(len(self.sliders))
         
-        # Physics data for display (保留中文標籤)
-        self.physics_data = {
-            "top_pressure": ATMOSPHERIC_PRESSURE,
-            "bottom_pressure": ATMOSPHERIC_PRESSURE,
-            "pressure_diff": 0,
-            "lift_force": 0,
-            "side_force": 0,
-            "front_force": 0
-        }
+        # Retained-mode widgets: each slider is followed by its value label
+        self.slider_labels = {key: Label(anchor="center") for key in self.sliders}
+        self.mass_label = Label(anchor="center")
+        self.control_panel = Panel()
+        for key, slider in self.sliders.items():
+            self.control_panel.add(slider)
+            self.control_panel.add(self.slider_labels[key])
+            if key == "ball_radius":
+                self.control_panel.add(self.mass_label)
+        self.info_readout = InfoReadout(color=DARK_BLUE, refresh_hz=info_hz)
+        self.strip_chart = StripChart(STRIP_CHART_SERIES, STRIP_CHART_AXES, span_seconds=STRIP_CHART_SECONDS)
+        self.show_strip_chart = False
+        self.widget_layout_version = None
+        
+        # Saved state (F5 saves, F9 restores); a given path is restored right away
+        self.state_path = state_path or STATE_FILE
+        if state_path is not None:
+            load_state(self, state_path)
+            self.sync_sliders()
         
         # Info panel state
         self.info_collapsed = False
+        
+        # Pre-composited static layer (backgrounds, boundaries, axes, labels)
+        self.static_layer = None
+        self.static_layer_version = None
+        self.build_static_layer()
+        
+        # Event dispatch tables - only these event types are queued at all
+        self.event_handlers = {
+            pygame.QUIT: self.on_quit,
+            pygame.MOUSEBUTTONDOWN: self.on_mouse_down,
+            pygame.MOUSEBUTTONUP: self.on_mouse_up,
+            pygame.MOUSEMOTION: self.on_mouse_motion,
+            pygame.KEYDOWN: self.on_key_down,
+            pygame.VIDEORESIZE: self.on_resize
+        }
+        self.key_handlers = {
+            pygame.K_v: self.toggle_wind_vectors,
+            pygame.K_q: self.toggle_quiver,
+            pygame.K_g: self.toggle_strip_chart,
+            pygame.K_h: self.cycle_heatmap_mode,
+            pygame.K_l: self.toggle_latency_overlay,
+            pygame.K_F3: self.toggle_profiler,
+            pygame.K_F5: self.save_state_file,
+            pygame.K_F9: self.load_state_file,
+            pygame.K_ESCAPE: lambda: False,
+            pygame.K_F11: self.toggle_maximize_window
+        }
+        pygame.event.set_blocked(None)
+        pygame.event.set_allowed(list(self.event_handlers))
+        
+        # Event rate HUD
+        self.event_rates = RateCounter()
+        self.hud_label = Label(self.format_hud(), color=DARK_GRAY)
+        
+        # Input-to-photon latency for ball and slider drags
+        self.latency = LatencyTracker(("ball_drag", "slider_drag"))
+        self.latency_report = latency_report  # JSON summary path written on exit
+        self.show_latency = False
+        self.latency_readout = InfoReadout(color=DARK_GRAY, refresh_hz=LATENCY_REFRESH_HZ)
+        self.input_time = 0.0
+        
+        # Per-stage run-loop timings (F3); only measured while the overlay is shown
+        self.profiler = StageProfiler(PROFILER_STAGES, history=PROFILER_HISTORY)
+        self.profiler_readout = InfoReadout(color=DARK_GRAY, refresh_hz=PROFILER_REFRESH_HZ)
+        self.profiler_sparkline = Sparkline()
+        self.allocations = AllocationCounter(PROFILER_HISTORY, trace_bytes=trace_malloc)
+        
+        # Optional physics worker thread
+        self.threaded_physics = threaded_physics
+        self.state_lock = threading.Lock()
+        self.physics_thread = None
+        self.physics_running = False
+        self.physics_step = 0
+        self.snapshots = SnapshotBuffer(self.capture_snapshot())
+        
+        # Per-tick telemetry ring buffer (--telemetry), written after every physics step
+        self.telemetry = telemetry
+        
+        # Span tracing (--trace); methods are only wrapped when it is requested
+        self.trace = trace
+        if trace is not None:
+            draw_methods = [name for name in dir(type(self)) if name.startswith("draw_")]
+            trace.instrument(self, TRACED_METHODS + tuple(draw_methods), "run_frame")
+        
+        # Deferred GC: everything built so far lives for the whole run, so freeze it
+        # and collect only after the flip instead of whenever an allocation trips it
+        if gc_mode not in GC_MODES:
+            raise ValueError(f"unknown GC mode {gc_mode!r}")
+        self.gc_mode = gc_mode
+        if gc_mode == "deferred":
+            enable_deferred_gc()
+        self.startup.mark("setup")
     
     def update_fonts(self):
         """Update fonts based on current layout"""
@@ -354,13 +631,27 @@ class BernoulliSimulation:
         new_width = max(MIN_WIDTH, new_width)
         new_height = max(MIN_HEIGHT, new_height)
         
+        if self.fixed_resolution:
+            # Layout stays at the design size - only the final scale pass changes
+            if (new_width, new_height) != self.window_size:
+                self.window = pygame.display.set_mode((new_width, new_height), 
+                                                    pygame.RESIZABLE | pygame.NOFRAME)
+                self.window_size = (new_width, new_height)
+                self.update_present_transform()
+            return
+        
+        # Drawing goes back to the window (it may have been redirected for a resize preview)
+        self.screen = self.window
+        
         if new_width != self.current_width or new_height != self.current_height:
             self.current_width = new_width
             self.current_height = new_height
             
             # Update screen
-            self.screen = pygame.display.set_mode((self.current_width, self.current_height), 
+            self.window = pygame.display.set_mode((self.current_width, self.current_height), 
                                                 pygame.RESIZABLE | pygame.NOFRAME)
+            self.window_size = (self.current_width, self.current_height)
+            self.screen = self.window
             
             # Update components
             self.window_controls.update_size(self.current_width, self.current_height)
@@ -375,14 +666,112 @@ class BernoulliSimulation:
             self.particle_surface_xz = pygame.Surface((self.layout.view_width, self.layout.content_height), 
                                                     pygame.SRCALPHA)
             
+            # Rebuild static layer for the new layout
+            self.build_static_layer()
+            
             # Adjust ball position if needed
             content_height = self.current_height - TITLE_BAR_HEIGHT
             max_x = self.layout.view_width - self.ball_radius
             max_y = content_height - self.ball_radius + TITLE_BAR_HEIGHT
             
-            self.ball_pos[0] = min(self.ball_pos[0], max_x)
-            self.ball_pos[1] = min(self.ball_pos[1], max_y)
+            if self.ball_pos[0] > max_x or self.ball_pos[1] > max_y:
+                self.ball_pos[0] = min(self.ball_pos[0], max_x)
+                self.ball_pos[1] = min(self.ball_pos[1], max_y)
+                # The readout must show the clamped position, not wait out its interval
+                self.info_readout.invalidate()
 
+    def request_resize(self, width, height):
+        """Queue a window resize; the rebuild runs once the size stops changing"""
+        if (width, height) == self.window_size:
+            # Back at the applied size (or our own set_mode echo) - nothing to rebuild
+            if self.pending_size is not None and self.fixed_resolution:
+                # The preview drew over the letterbox bars - refill them and restore the target
+                self.update_present_transform()
+            self.pending_size = None
+            if not self.fixed_resolution:
+                self.screen = self.window
+            return
+        
+        if self.pending_size is None and not self.fixed_resolution:
+            # Keep drawing at the old layout offscreen while the window is being dragged
+            self.screen = pygame.Surface((self.current_width, self.current_height)).convert()
+        self.pending_size = (width, height)
+        self.resize_deadline = self.now() + RESIZE_SETTLE_SECONDS
+    
+    def update_pending_resize(self):
+        """Apply a settled resize; return True while a resize is still in progress"""
+        if self.pending_size is None:
+            return False
+        if self.now() < self.resize_deadline:
+            return True
+        
+        self.resize_window(*self.pending_size)
+        self.pending_size = None
+        return False
+    
+    def now(self):
+        """Clock for UI timing - simulated time when recording or replaying"""
+        if self.fixed_dt is not None:
+            return self.frame_index * self.fixed_dt
+        return time.perf_counter()
+    
+    def present_resize_preview(self):
+        """Scale the last frame into the window while a resize is in progress"""
+        window = pygame.display.get_surface()
+        if not self.fixed_resolution:
+            pygame.transform.scale(self.screen, window.get_size(), window)
+            return
+        
+        # Keep the aspect ratio: letterbox into the window as it is right now
+        _, target_rect = self.letterbox(window.get_size())
+        window.fill(BLACK)
+        pygame.transform.scale(self.screen, target_rect.size, window.subsurface(target_rect))
+    
+    def letterbox(self, window_size):
+        """Uniform scale and centered rect of the design-resolution frame in a window"""
+        window_width, window_height = window_size
+        scale = min(window_width / BASE_WIDTH, window_height / BASE_HEIGHT)
+        target_size = (max(1, int(BASE_WIDTH * scale)), max(1, int(BASE_HEIGHT * scale)))
+        rect = pygame.Rect((0, 0), target_size)
+        rect.center = (window_width // 2, window_height // 2)
+        return scale, rect
+    
+    def update_present_transform(self):
+        """Compute where the design-resolution frame lands in the window"""
+        if not self.fixed_resolution:
+            self.present_scale = 1.0
+            self.present_rect = self.window.get_rect()
+            self.present_target = None
+            return
+        
+        # Uniform scale with letterboxing to preserve the aspect ratio
+        self.present_scale, self.present_rect = self.letterbox(self.window.get_size())
+        
+        # Scale straight into the window area, letterbox bars are filled once
+        self.window.fill(BLACK)
+        self.present_target = self.window.subsurface(self.present_rect)
+    
+    def present(self):
+        """Scale the design-resolution frame to the window in a single pass"""
+        if not self.fixed_resolution:
+            return
+        
+        target_size = self.present_rect.size
+        if target_size == self.screen.get_size():
+            self.present_target.blit(self.screen, (0, 0))
+        elif self.present_scale == int(self.present_scale):
+            # Exact integer multiple - nearest-neighbour scaling is exact and fast
+            pygame.transform.scale(self.screen, target_size, self.present_target)
+        else:
+            pygame.transform.smoothscale(self.screen, target_size, self.present_target)
+    
+    def map_mouse_pos(self, pos):
+        """Map a window position back into design-resolution coordinates"""
+        if not self.fixed_resolution:
+            return pos
+        return (int((pos[0] - self.present_rect.x) / self.present_scale),
+                int((pos[1] - self.present_rect.y) / self.present_scale))
+    
     def get_desktop_resolution(self):
         """Get desktop resolution with compatibility fallback for older pygame versions."""
         try:
@@ -408,178 +797,18 @@ class BernoulliSimulation:
         else:
             self.maximize_window()
     
-    def calculate_bernoulli_effect(self):
-        """Calculate Bernoulli effect with improved accuracy"""
-        # Convert wind direction to vector
-        wind_rad = math.radians(self.wind_angle)
-        wind_x = self.wind_speed * math.cos(wind_rad)
-        wind_z = self.wind_speed * math.sin(wind_rad)
-        wind_y = self.wind_vertical
-        
-        # Calculate relative wind speed
-        relative_wind_speed = math.sqrt(wind_x**2 + wind_y**2 + wind_z**2)
-        
-        # Ball properties
-        ball_radius_m = self.ball_radius / 100.0  # Convert pixels to meters
-        ball_area = math.pi * ball_radius_m**2
-        ball_mass = (4/3) * math.pi * (ball_radius_m**3) * 500  # Assume density 500 kg/m³
-        self.ball_mass = ball_mass
-        
-        # Only calculate lift if there's significant wind
-        if relative_wind_speed > 0.5:  # Minimum wind threshold
-            # Magnus effect and flow separation
-            top_velocity = relative_wind_speed * 1.4
-            bottom_velocity = relative_wind_speed * 0.8
-            
-            # Add angle factor for more realistic lift
-            angle_factor = abs(math.sin(wind_rad)) * 0.3
-            lift_coefficient = 0.5 * (1 + angle_factor)
-            
-            # Calculate pressure using Bernoulli equation
-            top_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * top_velocity**2
-            bottom_pressure = ATMOSPHERIC_PRESSURE - 0.5 * AIR_DENSITY * bottom_velocity**2
-            
-            pressure_difference = bottom_pressure - top_pressure
-            
-            # Calculate forces
-            lift_force = pressure_difference * ball_area * lift_coefficient + self.vertical_thrust
-            side_force = wind_x * AIR_DENSITY * ball_area * self.side_force_coefficient
-            front_force = wind_z * AIR_DENSITY * ball_area * self.side_force_coefficient
-        else:
-            # No significant wind - no lift, only thrust
-            top_pressure = ATMOSPHERIC_PRESSURE
-            bottom_pressure = ATMOSPHERIC_PRESSURE
-            pressure_difference = 0
-            lift_force = self.vertical_thrust  # Only manual thrust
-            side_force = 0
-            front_force = 0
-        
-        # Update physics data
-        self.physics_data.update({
-            "top_pressure": top_pressure,
-            "bottom_pressure": bottom_pressure,
-            "pressure_diff": pressure_difference,
-            "lift_force": lift_force,
-            "side_force": side_force,
-            "front_force": front_force,
-            "ball_mass": ball_mass
-        })
-        
-        return {
-            "lift": lift_force,
-            "side": side_force,
-            "front": front_force,
-            "ball_mass": ball_mass,
-            "net_force": lift_force
-        }
-    
-    def update_ball_physics(self, dt):
-        """Update ball physics with proper 3D motion and gravity"""
-        if self.dragging:
-            return
-        
-        forces = self.calculate_bernoulli_effect()
-        ball_mass = forces["ball_mass"]
-        
-        # Gravity affects all directions - primarily Y (downward) but also Z if tilted
-        weight_y = ball_mass * GRAVITY  # Primary gravity downward
-        weight_z = ball_mass * GRAVITY * 0.05  # Small Z-component gravity
-        
-        # Calculate net forces and accelerations
-        net_force_y = forces["lift"] - weight_y  # Y direction (screen up/down)
-        net_force_x = forces["side"]  # X direction (screen left/right)
-        net_force_z = forces["front"] - weight_z  # Z direction (depth)
-        
-        acceleration_y = net_force_y / ball_mass if ball_mass > 0 else 0
-        acceleration_x = net_force_x / ball_mass if ball_mass > 0 else 0
-        acceleration_z = net_force_z / ball_mass if ball_mass > 0 else 0
-        
-        # Update velocities
-        self.ball_velocity[1] += acceleration_y * dt * 50
-        self.ball_velocity[0] += acceleration_x * dt * 50
-        self.ball_velocity[2] += acceleration_z * dt * 50
-        
-        # Update positions
-        self.ball_pos[1] += self.ball_velocity[1] * dt
-        self.ball_pos[0] += self.ball_velocity[0] * dt
-        self.ball_pos[2] += self.ball_velocity[2] * dt
-        
-        # Apply damping
-        content_height = self.current_height - TITLE_BAR_HEIGHT
-        ground_level = content_height - self.ball_radius - 50 + TITLE_BAR_HEIGHT
-        
-        if abs(self.ball_pos[1] - ground_level) < 10 and abs(self.ball_velocity[1]) < 5:
-            # Strong damping near ground
-            for i in range(3):
-                self.ball_velocity[i] *= 0.9
-        else:
-            # Normal damping
-            for i in range(3):
-                self.ball_velocity[i] *= 0.98
-        
-        # Boundary constraints
-        self.apply_boundary_constraints()
-    
-    def apply_boundary_constraints(self):
-        """Apply boundary constraints to keep ball in view with proper physics"""
+    def ball_bounds(self):
+        """Ball limits for the current layout - adjusted for title bar"""
         content_height = self.current_height - TITLE_BAR_HEIGHT
-        
-        # Y boundaries (ground and ceiling) - adjusted for title bar
-        ground_level = content_height - self.ball_radius - 50 + TITLE_BAR_HEIGHT
-        ceiling_level = self.ball_radius + 50 + TITLE_BAR_HEIGHT
-        
-        if self.ball_pos[1] >= ground_level:
-            self.ball_pos[1] = ground_level
-            if abs(self.ball_velocity[1]) < 2:
-                self.ball_velocity[1] = 0
-            else:
-                self.ball_velocity[1] = -abs(self.ball_velocity[1]) * 0.3
-        elif self.ball_pos[1] <= ceiling_level:
-            self.ball_pos[1] = ceiling_level
-            self.ball_velocity[1] = abs(self.ball_velocity[1]) * 0.3
-        
-        # X boundaries (left and right walls)
-        left_wall = self.ball_radius
-        right_wall = self.layout.view_width - self.ball_radius
-        
-        if self.ball_pos[0] <= left_wall:
-            self.ball_pos[0] = left_wall
-            if abs(self.ball_velocity[0]) < 2:
-                self.ball_velocity[0] = 0
-            else:
-                self.ball_velocity[0] = abs(self.ball_velocity[0]) * 0.3
-        elif self.ball_pos[0] >= right_wall:
-            self.ball_pos[0] = right_wall
-            if abs(self.ball_velocity[0]) < 2:
-                self.ball_velocity[0] = 0
-            else:
-                self.ball_velocity[0] = -abs(self.ball_velocity[0]) * 0.3
-        
-        # Z boundaries (front and back walls)
-        max_z = content_height // 3
-        min_z = -content_height // 3
-        ground_z = content_height // 4
-        
-        if self.ball_pos[2] >= max_z:
-            self.ball_pos[2] = max_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            else:
-                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
-        elif self.ball_pos[2] <= min_z:
-            self.ball_pos[2] = min_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            else:
-                self.ball_velocity[2] = abs(self.ball_velocity[2]) * 0.3
-        
-        # Z方向地面約束
-        if self.ball_pos[2] >= ground_z:
-            self.ball_pos[2] = ground_z
-            if abs(self.ball_velocity[2]) < 2:
-                self.ball_velocity[2] = 0
-            elif self.ball_velocity[2] > 0:
-                self.ball_velocity[2] = -abs(self.ball_velocity[2]) * 0.3
+        return BallBounds(
+            ground=content_height - self.ball_radius - 50 + TITLE_BAR_HEIGHT,
+            ceiling=self.ball_radius + 50 + TITLE_BAR_HEIGHT,
+            left=self.ball_radius,
+            right=self.layout.view_width - self.ball_radius,
+            min_z=-content_height // 3,
+            max_z=content_height // 3,
+            ground_z=content_height // 4
+        )
     
     def get_ball_color(self):
         """Get ball color based on lift force"""
@@ -593,198 +822,320 @@ class BernoulliSimulation:
         else:
             return RED  # Falling (gravity dominates)
     
-    def draw_particles(self):
+    def draw_particles(self, state=None):
         """Draw wind field particles on both views"""
+        if state is None:
+            state = self
+        
         # Clear particle surfaces
         self.particle_surface_xy.fill((0, 0, 0, 0))
         self.particle_surface_xz.fill((0, 0, 0, 0))
         
-        for particle in self.particles:
-            if particle.is_alive():
-                alpha = int(particle.life * 0.8)
-                color = (*particle.color, alpha)
+        # Hoisted out of the per-particle loop
+        layout = self.layout
+        scale_x, scale_y, global_scale = layout.scale_x, layout.scale_y, layout.global_scale
+        view_width, content_height = layout.view_width, layout.content_height
+        offset_x, offset_y = BASE_WIDTH // 4, BASE_HEIGHT // 2
+        surface_xy, surface_xz = self.particle_surface_xy, self.particle_surface_xz
+        draw_circle = pygame.draw.circle
+        
+        for particle in state.particles:
+            if particle.life > 0:
+                size = max(1, int(particle.size * global_scale))
+                screen_x = int((particle.x + offset_x) * scale_x)
+                if not 0 <= screen_x < view_width:
+                    continue
                 
                 # XY view (left panel) - apply scaling
-                screen_x = int((particle.x + BASE_WIDTH // 4) * self.layout.scale_x)
-                screen_y = int((particle.y + BASE_HEIGHT // 2) * self.layout.scale_y)
-                
-                if 0 <= screen_x < self.layout.view_width and 0 <= screen_y < self.layout.content_height:
-                    size = max(1, int(particle.size * self.layout.global_scale))
-                    pygame.draw.circle(self.particle_surface_xy, particle.color, (screen_x, screen_y), size)
+                screen_y = int((particle.y + offset_y) * scale_y)
+                if 0 <= screen_y < content_height:
+                    draw_circle(surface_xy, particle.color, (screen_x, screen_y), size)
                 
                 # ZX view (right panel) - X horizontal, Z vertical with scaling
-                screen_x_zx = int((particle.x + BASE_WIDTH // 4) * self.layout.scale_x)
-                screen_y_zx = int((BASE_HEIGHT // 2 - particle.z) * self.layout.scale_y)
-                
-                if 0 <= screen_x_zx < self.layout.view_width and 0 <= screen_y_zx < self.layout.content_height:
-                    size = max(1, int(particle.size * self.layout.global_scale))
-                    pygame.draw.circle(self.particle_surface_xz, particle.color, (screen_x_zx, screen_y_zx), size)
+                screen_y_zx = int((offset_y - particle.z) * scale_y)
+                if 0 <= screen_y_zx < content_height:
+                    draw_circle(surface_xz, particle.color, (screen_x, screen_y_zx), size)
         
         # Blit particle surfaces to main screen
         self.screen.blit(self.particle_surface_xy, (0, TITLE_BAR_HEIGHT))
-        self.screen.blit(self.particle_surface_xz, (self.layout.view_width + self.layout.middle_section_width, TITLE_BAR_HEIGHT))
+        self.screen.blit(self.particle_surface_xz, (self.layout.right_view_x, TITLE_BAR_HEIGHT))
     
-    def draw_ball(self):
+    def draw_ball(self, state=None):
         """Draw the ball on both XY and ZX views"""
-        ball_color = self.get_ball_color()
-        
-        # XY view (left panel) - shows X and Y coordinates
-        ball_x_xy = int(self.ball_pos[0] * self.layout.scale_x)
-        ball_y_xy = int((self.ball_pos[1] - TITLE_BAR_HEIGHT) * self.layout.scale_y) + TITLE_BAR_HEIGHT
-        
-        # Use scaled radius
-        display_radius_xy = int(self.ball_radius * self.layout.global_scale)
-        
-        # Draw shadow with scaled offset
-        shadow_offset = int(3 * self.layout.global_scale)
-        pygame.draw.circle(self.screen, (50, 50, 50), 
-                         (ball_x_xy + shadow_offset, ball_y_xy + shadow_offset), 
-                         display_radius_xy)
+        if state is None:
+            state = self
+            ball_color = self.get_ball_color()
+        else:
+            ball_color = state.ball_color
+        ball_pos = state.ball_pos
         
-        # Draw ball
-        pygame.draw.circle(self.screen, ball_color, (ball_x_xy, ball_y_xy), display_radius_xy)
-        pygame.draw.circle(self.screen, BLACK, (ball_x_xy, ball_y_xy), display_radius_xy, 
-                         max(1, int(2 * self.layout.global_scale)))
+        # One pre-composited sprite per (radius, color, scale) serves both views
+        display_radius = int(state.ball_radius * self.layout.global_scale)
+        sprite = self.ball_sprites.get(display_radius, ball_color, self.layout.global_scale)
+        anchor = BallSpriteCache.anchor(display_radius)
         
-        # Add highlight
-        highlight_x = ball_x_xy - display_radius_xy // 3
-        highlight_y = ball_y_xy - display_radius_xy // 3
-        pygame.draw.circle(self.screen, WHITE, (highlight_x, highlight_y), 
-                         max(1, display_radius_xy // 4))
+        for ball_x, ball_y in self.ball_screen_positions(ball_pos):
+            self.screen.blit(sprite, (ball_x - anchor, ball_y - anchor))
+    
+    def ball_screen_positions(self, ball_pos):
+        """Screen centers of the ball in the XY and ZX views"""
+        # XY view (left panel) - shows X and Y coordinates
+        ball_x_xy = int(ball_pos[0] * self.layout.scale_x)
+        ball_y_xy = int((ball_pos[1] - TITLE_BAR_HEIGHT) * self.layout.scale_y) + TITLE_BAR_HEIGHT
         
         # ZX view (right panel) - shows X and Z coordinates
-        ball_x_zx = int(self.ball_pos[0] * self.layout.scale_x) + self.layout.view_width + self.layout.middle_section_width
-        ball_y_zx = int((self.layout.content_height // 2 - self.ball_pos[2]) * self.layout.scale_y) + TITLE_BAR_HEIGHT
+        ball_x_zx = int(ball_pos[0] * self.layout.scale_x) + self.layout.right_view_x
+        ball_y_zx = int((self.layout.content_height // 2 - ball_pos[2]) * self.layout.scale_y) + TITLE_BAR_HEIGHT
+        return (ball_x_xy, ball_y_xy), (ball_x_zx, ball_y_zx)
+    
+    def draw_field_overlay(self, state=None):
+        """Draw the pressure or speed heatmap around the ball on both views"""
+        if self.heatmap_mode == "off":
+            return
+        if state is None:
+            state = self
+        
+        display_radius = int(state.ball_radius * self.layout.global_scale)
+        centers = self.ball_screen_positions(state.ball_pos)
+        previous_clip = self.screen.get_clip()
+        for view, view_rect, center in zip(("xy", "zx"), self.layout.get_view_rects(), centers):
+            u_inf, v_inf = view_free_stream(state.wind_speed, state.wind_angle, state.wind_vertical, view)
+            surface = self.heatmap.get_surface(view, self.heatmap_mode, display_radius, u_inf, v_inf)
+            if surface is None:
+                continue
+            self.screen.set_clip(view_rect)
+            self.screen.blit(surface, surface.get_rect(center=center))
+        self.screen.set_clip(previous_clip)
+    
+    def draw_quiver(self, state=None):
+        """Draw local flow arrows on a grid over both views in one batch"""
+        if not self.show_quiver:
+            return
+        if state is None:
+            state = self
+        
+        display_radius = int(state.ball_radius * self.layout.global_scale)
+        centers = self.ball_screen_positions(state.ball_pos)
+        sequence = []
+        for view, view_rect, center in zip(("xy", "zx"), self.layout.get_view_rects(), centers):
+            u_inf, v_inf = view_free_stream(state.wind_speed, state.wind_angle, state.wind_vertical, view)
+            sequence += self.quiver.get_blits(view, view_rect, center, display_radius, u_inf, v_inf)
+        self.screen.blits(sequence, doreturn=False)
+    
+    def build_static_layer(self):
+        """Pre-composite the parts of the frame that only change with the layout"""
+        layer = pygame.Surface((self.current_width, self.current_height)).convert()
+        layer.fill(WHITE)
+        
+        # View backgrounds
+        left_view, right_view = self.layout.get_view_rects()
+        pygame.draw.rect(layer, LIGHT_BLUE, left_view)
+        pygame.draw.rect(layer, LIGHT_BLUE, right_view)
+        
+        # Separators, labels, boundaries and axes
+        self.draw_view_frames(layer)
+        self.draw_boundaries(layer)
+        self.draw_axes(layer)
+        
+        # Panel frames and instructions
+        self.draw_control_panel_background(layer)
+        self.draw_physics_info_background(layer)
+        self.draw_instructions(layer)
+        
+        self.static_layer = layer
+        self.static_layer_version = self.layout.version
+    
+    def draw_ui(self, state=None):
+        """Draw the dynamic parts of the UI on top of the static layer"""
+        self.draw_wind_vectors()
         
-        # Use scaled radius
-        display_radius_zx = int(self.ball_radius * self.layout.global_scale)
+        # Draw control panel
+        self.draw_control_panel()
+        
+        # Draw physics information
+        self.draw_physics_info(state)
+        self.draw_strip_chart()
         
-        # Draw shadow
-        pygame.draw.circle(self.screen, (50, 50, 50), 
-                         (ball_x_zx + shadow_offset, ball_y_zx + shadow_offset), 
-                         display_radius_zx)
+        self.draw_hud()
+        self.draw_latency_overlay()
+        self.draw_profiler_overlay()
+    
+    def draw_profiler_overlay(self):
+        """Draw per-stage timings and an FPS sparkline at the top of the XY view"""
+        if not self.profiler.enabled:
+            return
         
-        # Draw ball
-        pygame.draw.circle(self.screen, ball_color, (ball_x_zx, ball_y_zx), display_radius_zx)
-        pygame.draw.circle(self.screen, BLACK, (ball_x_zx, ball_y_zx), display_radius_zx, 
-                         max(1, int(2 * self.layout.global_scale)))
+        line_height = max(16, int(20 * self.layout.global_scale))
+        x, y = self.layout.label_anchors["profiler"]
+        self.profiler_readout.set_layout(self.font, (x, y), line_height, None)
+        now = self.now()
+        if self.profiler_readout.due(now):
+            self.profiler_readout.set_lines(self.format_profiler_lines(), now)
+            self.profiler_sparkline.set_values(self.profiler.fps_history(), self.frame_timer.target_fps)
+        
+        chart_y = y + len(self.profiler_readout.lines) * line_height + 4
+        self.profiler_sparkline.set_rect((x, chart_y, int(220 * self.layout.global_scale),
+                                          int(40 * self.layout.global_scale)))
+        self.profiler_readout.draw(self.screen)
+        self.profiler_sparkline.draw(self.screen)
+    
+    def format_profiler_lines(self):
+        """Overlay text: current / average / worst milliseconds per stage"""
+        lines = [f"效能分析 (F3) 目前 / 平均 / 最差 ms, {self.profiler.history} 幀"]
+        for stage in self.profiler.stages:
+            stats = self.profiler.stats(stage)
+            if stats is None:
+                lines.append(f"{stage}: -")
+            else:
+                lines.append(f"{stage}: {stats[0]:.2f} / {stats[1]:.2f} / {stats[2]:.2f}")
+        frame = self.profiler.frame_stats()
+        if frame is not None:
+            lines.append(f"frame: {frame[0]:.2f} / {frame[1]:.2f} / {frame[2]:.2f}  "
+                         f"({1000 / frame[1]:.0f} FPS)")
+        
+        # Allocation pressure: net GC-tracked objects per frame and time spent collecting
+        allocations = self.allocations.stats()
+        objects = allocations["objects"]
+        if objects is not None:
+            gc_ms = allocations["gc_ms"]
+            lines.append(f"gc 物件/幀: {objects[0]:.0f} / {objects[1]:.0f} / {objects[2]:.0f}")
+            lines.append(f"gc ({self.gc_mode}): {gc_ms[0]:.2f} / {gc_ms[1]:.2f} / {gc_ms[2]:.2f}  "
+                         f"回收 {'/'.join(str(count) for count in allocations['collections'])}")
+        peak_kb = allocations["peak_kb"]
+        if peak_kb is not None:
+            lines.append(f"配置峰值 KB: {peak_kb[0]:.1f} / {peak_kb[1]:.1f} / {peak_kb[2]:.1f}")
+        return lines
+    
+    def draw_latency_overlay(self):
+        """Draw input latency percentiles at the top of the ZX view"""
+        if not self.show_latency:
+            return
         
-        # Add highlight
-        highlight_x_zx = ball_x_zx - display_radius_zx // 3
-        highlight_y_zx = ball_y_zx - display_radius_zx // 3
-        pygame.draw.circle(self.screen, WHITE, (highlight_x_zx, highlight_y_zx), display_radius_zx // 4)
+        self.latency_readout.set_layout(self.font, self.layout.label_anchors["latency"],
+                                        max(16, int(20 * self.layout.global_scale)), None)
+        now = self.now()
+        if self.latency_readout.due(now):
+            lines = ["輸入延遲 p50 / p95 / p99"]
+            for kind, name in (("ball_drag", "球體拖曳"), ("slider_drag", "滑桿拖曳")):
+                stats = self.latency.stats(kind)
+                lines.append(f"{name}: {stats['p50_ms']:.1f} / {stats['p95_ms']:.1f} / "
+                             f"{stats['p99_ms']:.1f} ms ({stats['count']})")
+            self.latency_readout.set_lines(lines, now)
+        self.latency_readout.draw(self.screen)
+    
+    def write_latency_report(self, path):
+        """Write the latency percentiles and run settings as JSON"""
+        self.latency.write_summary(path, {
+            "threaded_physics": self.threaded_physics,
+            "pacing": self.frame_timer.pacing,
+            "target_fps": self.frame_timer.target_fps,
+            "fixed_resolution": self.fixed_resolution,
+            "frame_time": self.frame_timer.stats()
+        })
+        print(f"Latency summary written to {path}")
     
-    def draw_ui(self):
-        """Draw the complete UI with dual views and controls"""
+    def draw_hud(self):
+        """Draw the event rate counter at the bottom of the ZX view"""
+        if self.event_rates.update(self.now()):
+            self.hud_label.set_text(self.format_hud())
+        self.hud_label.set_font(self.font)
+        self.hud_label.set_position(self.layout.label_anchors["hud"])
+        self.hud_label.draw(self.screen)
+    
+    def format_hud(self):
+        """HUD text with the queued and dispatched event rates"""
+        return (f"事件: {self.event_rates.rate('received'):.0f}/s  "
+                f"處理: {self.event_rates.rate('handled'):.0f}/s")
+    
+    def draw_view_frames(self, surface):
+        """Draw view separators and view labels"""
         # Draw view separators with scaling
         line_width = max(1, int(3 * self.layout.global_scale))
-        pygame.draw.line(self.screen, BLACK, 
+        pygame.draw.line(surface, BLACK, 
                         (self.layout.view_width, TITLE_BAR_HEIGHT), 
                         (self.layout.view_width, self.current_height), line_width)
-        pygame.draw.line(self.screen, BLACK, 
-                        (self.layout.view_width + self.layout.middle_section_width, TITLE_BAR_HEIGHT), 
-                        (self.layout.view_width + self.layout.middle_section_width, self.current_height), line_width)
+        pygame.draw.line(surface, BLACK, 
+                        (self.layout.right_view_x, TITLE_BAR_HEIGHT), 
+                        (self.layout.right_view_x, self.current_height), line_width)
         
         # View labels
         xy_label = self.title_font.render("XY 平面視圖", True, BLACK)
-        self.screen.blit(xy_label, (10, TITLE_BAR_HEIGHT + 10))
+        surface.blit(xy_label, self.layout.label_anchors["xy_title"])
         
         zx_label = self.title_font.render("XZ 平面視圖", True, BLACK)
-        self.screen.blit(zx_label, (self.layout.view_width + self.layout.middle_section_width + 10, TITLE_BAR_HEIGHT + 10))
-        
-        # Draw coordinate axes
-        self.draw_boundaries()
-        self.draw_axes()
-        self.draw_wind_vectors()
-        
-        # Draw control panel
-        self.draw_control_panel()
-        
-        # Draw physics information
-        self.draw_physics_info()
-        
-        # Draw instructions
-        self.draw_instructions()
+        surface.blit(zx_label, self.layout.label_anchors["zx_title"])
     
-    def draw_boundaries(self):
+    def draw_boundaries(self, surface):
         """Draw ground and ceiling boundaries"""
-        content_height = self.current_height - TITLE_BAR_HEIGHT
-        ground_y = int(content_height - 50 * self.layout.scale_y) + TITLE_BAR_HEIGHT
-        ceiling_y = int(50 * self.layout.scale_y) + TITLE_BAR_HEIGHT
+        ground_y = self.layout.ground_y
+        ceiling_y = self.layout.ceiling_y
+        right_view_x = self.layout.right_view_x
         
         # Draw ground line on both views with scaling
         line_width = max(1, int(3 * self.layout.global_scale))
-        pygame.draw.line(self.screen, (139, 69, 19), (0, ground_y), (self.layout.view_width, ground_y), line_width)
-        pygame.draw.line(self.screen, (139, 69, 19), 
-                        (self.layout.view_width + self.layout.middle_section_width, ground_y), 
+        pygame.draw.line(surface, (139, 69, 19), (0, ground_y), (self.layout.view_width, ground_y), line_width)
+        pygame.draw.line(surface, (139, 69, 19), 
+                        (right_view_x, ground_y), 
                         (self.current_width, ground_y), line_width)
         
         # Draw ceiling line on both views with scaling
         ceiling_line_width = max(1, int(2 * self.layout.global_scale))
-        pygame.draw.line(self.screen, GRAY, (0, ceiling_y), (self.layout.view_width, ceiling_y), ceiling_line_width)
-        pygame.draw.line(self.screen, GRAY, 
-                        (self.layout.view_width + self.layout.middle_section_width, ceiling_y), 
+        pygame.draw.line(surface, GRAY, (0, ceiling_y), (self.layout.view_width, ceiling_y), ceiling_line_width)
+        pygame.draw.line(surface, GRAY, 
+                        (right_view_x, ceiling_y), 
                         (self.current_width, ceiling_y), ceiling_line_width)
         
         # Z方向地面線 (在XZ視圖中顯示) with scaling
-        z_ground_y = int((content_height // 2 + content_height // 4) * self.layout.scale_y) + TITLE_BAR_HEIGHT
-        pygame.draw.line(self.screen, (139, 69, 19), 
-                        (self.layout.view_width + self.layout.middle_section_width, z_ground_y), 
+        z_ground_y = self.layout.z_ground_y
+        pygame.draw.line(surface, (139, 69, 19), 
+                        (right_view_x, z_ground_y), 
                         (self.current_width, z_ground_y), line_width)
         
         # Ground labels with scaling
         ground_label = self.font.render("地面", True, (139, 69, 19))
-        label_offset = int(10 * self.layout.global_scale)
-        self.screen.blit(ground_label, (label_offset, ground_y + int(5 * self.layout.global_scale)))
-        self.screen.blit(ground_label, (self.layout.view_width + self.layout.middle_section_width + label_offset, 
-                                      ground_y + int(5 * self.layout.global_scale)))
+        surface.blit(ground_label, self.layout.label_anchors["ground"])
+        surface.blit(ground_label, self.layout.label_anchors["ground_zx"])
         
         # Z方向地面標籤
         z_ground_label = self.font.render("Z地面", True, (139, 69, 19))
-        self.screen.blit(z_ground_label, (self.layout.view_width + self.layout.middle_section_width + label_offset, 
-                                        z_ground_y + int(5 * self.layout.global_scale)))
+        surface.blit(z_ground_label, self.layout.label_anchors["z_ground"])
     
-    def draw_axes(self):
+    def draw_axes(self, surface):
         """Draw coordinate axes on both views"""
         axes_length = int(50 * self.layout.global_scale)
         axes_color = DARK_BLUE
         
-        # XY view axes (bottom-left corner) with scaling
-        origin_xy = (int(30 * self.layout.global_scale), 
-                    int(self.current_height - 80 * self.layout.scale_y))
+        # Axis origins at the bottom-left corner of each view
+        origin_xy, origin_zx = self.layout.axis_origins
         
         # X axis (horizontal, red) with scaling
         line_width = max(1, int(3 * self.layout.global_scale))
-        pygame.draw.line(self.screen, RED, origin_xy, 
+        pygame.draw.line(surface, RED, origin_xy, 
                         (origin_xy[0] + axes_length, origin_xy[1]), line_width)
         x_label = self.font.render("X", True, RED)
         label_offset = int(5 * self.layout.global_scale)
-        self.screen.blit(x_label, (origin_xy[0] + axes_length + label_offset, 
+        surface.blit(x_label, (origin_xy[0] + axes_length + label_offset, 
                                  origin_xy[1] - int(10 * self.layout.global_scale)))
         
         # Y axis (vertical, green)
-        pygame.draw.line(self.screen, GREEN, origin_xy, 
+        pygame.draw.line(surface, GREEN, origin_xy, 
                         (origin_xy[0], origin_xy[1] - axes_length), line_width)
         y_label = self.font.render("Y", True, GREEN)
-        self.screen.blit(y_label, (origin_xy[0] - int(15 * self.layout.global_scale), 
+        surface.blit(y_label, (origin_xy[0] - int(15 * self.layout.global_scale), 
                                  origin_xy[1] - axes_length - label_offset))
         
-        # ZX view axes (bottom-left corner of right panel)
-        origin_zx = (int(self.layout.view_width + self.layout.middle_section_width + 30 * self.layout.global_scale), 
-                    int(self.current_height - 80 * self.layout.scale_y))
-        
-        # X axis (horizontal, red)
-        pygame.draw.line(self.screen, RED, origin_zx, 
+        # ZX view axes - X axis (horizontal, red)
+        pygame.draw.line(surface, RED, origin_zx, 
                         (origin_zx[0] + axes_length, origin_zx[1]), line_width)
         x_label_zx = self.font.render("X", True, RED)
-        self.screen.blit(x_label_zx, (origin_zx[0] + axes_length + label_offset, 
+        surface.blit(x_label_zx, (origin_zx[0] + axes_length + label_offset, 
                                     origin_zx[1] - int(10 * self.layout.global_scale)))
         
         # Z axis (vertical, blue)
-        pygame.draw.line(self.screen, BLUE, origin_zx, 
+        pygame.draw.line(surface, BLUE, origin_zx, 
                         (origin_zx[0], origin_zx[1] - axes_length), line_width)
         z_label = self.font.render("Z", True, BLUE)
-        self.screen.blit(z_label, (origin_zx[0] - int(15 * self.layout.global_scale), 
+        surface.blit(z_label, (origin_zx[0] - int(15 * self.layout.global_scale), 
                                  origin_zx[1] - axes_length - label_offset))
     
     def draw_wind_vectors(self):
@@ -803,9 +1154,8 @@ class BernoulliSimulation:
         arrow_z = wind_z * scale * self.layout.global_scale
         arrow_y = self.wind_vertical * scale * self.layout.global_scale
         
-        # XY view wind vector (left panel)
-        center_xy = (int(self.layout.view_width // 2), 
-                    int(self.layout.content_height // 2 + TITLE_BAR_HEIGHT))
+        # Wind vectors start at the center of each view
+        center_xy, center_xz = self.layout.view_centers
         
         # Horizontal wind component (X direction)
         if abs(arrow_x) > 5 * self.layout.global_scale:
@@ -833,11 +1183,7 @@ class BernoulliSimulation:
             self.screen.blit(wind_label, (center_xy[0] + label_offset, 
                                         center_xy[1] - int(20 * self.layout.global_scale)))
         
-        # XZ view wind vector (right panel)
-        center_xz = (int(self.layout.view_width + self.layout.middle_section_width + self.layout.view_width // 2), 
-                    int(self.layout.content_height // 2 + TITLE_BAR_HEIGHT))
-        
-        # X direction (horizontal in XZ view)
+        # XZ view wind vector (right panel) - X direction (horizontal)
         if abs(arrow_x) > 5 * self.layout.global_scale:
             end_x_xz = int(center_xz[0] + arrow_x)
             line_width = max(1, int(4 * self.layout.global_scale))
@@ -861,8 +1207,7 @@ class BernoulliSimulation:
         # Total wind speed display
         total_wind = math.sqrt(wind_x**2 + wind_z**2 + self.wind_vertical**2)
         total_label = self.font.render(f"總風速: {total_wind:.1f} m/s", True, BLACK)
-        self.screen.blit(total_label, (int(10 * self.layout.global_scale), 
-                                     self.current_height - int(30 * self.layout.global_scale)))
+        self.screen.blit(total_label, self.layout.label_anchors["total_wind"])
     
     def draw_arrow_head(self, pos, pointing_right_or_up, color, horizontal=True):
         """Draw arrow head at the end of wind vector"""
@@ -882,136 +1227,137 @@ class BernoulliSimulation:
         
         pygame.draw.polygon(self.screen, color, points)
     
-    def draw_control_panel(self):
-        """Draw the control panel in the middle section"""
+    def draw_control_panel_background(self, surface):
+        """Draw the control panel background and title"""
         # Background
         panel_rect = self.layout.get_control_panel_rect()
-        pygame.draw.rect(self.screen, LIGHT_GRAY, panel_rect)
+        pygame.draw.rect(surface, LIGHT_GRAY, panel_rect)
         
         # Title
         title = self.title_font.render("控制面板", True, BLACK)
-        title_rect = title.get_rect(center=(panel_rect.centerx, TITLE_BAR_HEIGHT + 30))
-        self.screen.blit(title, title_rect)
-        
-        # Draw sliders with scaling
-        middle_x = panel_rect.centerx
-        slider_width = int(self.layout.middle_section_width * 0.8)
-        y_offset = int(TITLE_BAR_HEIGHT + 70 * self.layout.scale_y)
-        y_increment = int(self.layout.content_height * 0.15 * self.layout.scale_y)
-        
-        mouse_pos = pygame.mouse.get_pos()
+        title_rect = title.get_rect(center=self.layout.label_anchors["panel_title"])
+        surface.blit(title, title_rect)
+    
+    def draw_control_panel(self):
+        """Draw the control panel sliders in the middle section"""
+        self.sync_widgets()
+        self.control_panel.draw(self.screen)
+    
+    def layout_widgets(self):
+        """Place widgets from the precomputed layout geometry"""
+        border_radius = max(1, int(4 * self.layout.global_scale))
+        border_width = max(1, int(2 * self.layout.global_scale))
+        for (key, slider), geometry in zip(self.sliders.items(), self.layout.slider_geometry):
+            slider.set_geometry(geometry.track_rect, geometry.hit_rect, self.layout.slider_handle_radius,
+                                border_radius, border_width)
+            label = self.slider_labels[key]
+            label.set_font(self.font)
+            label.set_position(geometry.label_center)
+            if key == "ball_radius":
+                self.mass_label.set_font(self.font)
+                self.mass_label.set_position(geometry.extra_center)
+        
+        self.info_readout.set_layout(self.font, self.layout.label_anchors["info_lines"],
+                                     max(16, int(20 * self.layout.global_scale)),
+                                     self.layout.info_rect.bottom - 5)
+        self.info_readout.invalidate()
+        if self.layout.strip_chart_rect is not None:
+            self.strip_chart.set_rect(self.layout.strip_chart_rect)
+            self.strip_chart.set_font(self.font)
+        self.widget_layout_version = self.layout.version
+    
+    def ensure_widget_layout(self):
+        """Re-place widgets if the layout changed since they were placed"""
+        if self.widget_layout_version != self.layout.version:
+            self.layout_widgets()
+    
+    def sync_widgets(self):
+        """Push current values into the widgets; unchanged widgets stay clean"""
+        self.ensure_widget_layout()
         
         for key, slider in self.sliders.items():
-            self.draw_slider(key, slider, middle_x, slider_width, y_offset, mouse_pos)
-            y_offset += y_increment
-    
-    def draw_slider(self, key, slider, middle_x, slider_width, y_offset, mouse_pos):
-        """Draw a horizontal slider"""
-        slider_length = slider_width
-        slider_thickness = max(4, int(8 * self.layout.global_scale))
-        slider_x = middle_x - slider_length // 2
-        slider_y = y_offset + int(20 * self.layout.scale_y)
-        
-        # Slider track
-        track_rect = pygame.Rect(slider_x, slider_y - slider_thickness // 2, 
-                               slider_length, slider_thickness)
-        pygame.draw.rect(self.screen, GRAY, track_rect, border_radius=max(1, int(4 * self.layout.global_scale)))
-        
-        # Slider fill
-        value_range = slider["max"] - slider["min"]
-        if value_range != 0:
-            percent = (slider["value"] - slider["min"]) / value_range
-        else:
-            percent = 0
-        selected_length = int(slider_length * percent)
-        
-        if selected_length > 0:
-            fill_rect = pygame.Rect(slider_x, slider_y - slider_thickness // 2, 
-                                  selected_length, slider_thickness)
-            pygame.draw.rect(self.screen, BLUE, fill_rect, border_radius=max(1, int(4 * self.layout.global_scale)))
-        
-        # Slider handle
-        handle_radius = max(6, int(12 * self.layout.global_scale))
-        handle_center = (slider_x + selected_length, slider_y)
-        
-        # Check if mouse is hovering over handle
-        hovering = (mouse_pos[0] - handle_center[0]) ** 2 + (mouse_pos[1] - handle_center[1]) ** 2 <= handle_radius ** 2
-        handle_color = DARK_BLUE if hovering or self.active_slider == key else BLUE
-        
-        pygame.draw.circle(self.screen, handle_color, handle_center, handle_radius)
-        pygame.draw.circle(self.screen, BLACK, handle_center, handle_radius, max(1, int(2 * self.layout.global_scale)))
-        
-        # Slider label and value
+            slider.set_active(self.active_slider == key)
+            self.slider_labels[key].set_text(self.slider_label_text(key, slider))
+        ball_mass = self.physics_data.get("ball_mass", 0.5)
+        self.mass_label.set_text(f"質量: {ball_mass:.2f} kg")
+    
+    def slider_label_text(self, key, slider):
+        """Label text with the slider's current value and unit"""
         if key == "ball_radius":
-            ball_mass = self.physics_data.get("ball_mass", 0.5)
-            value_text = f"{slider['text']}: {slider['value']:.0f}px"
-            mass_text = f"質量: {ball_mass:.2f} kg"
-            
-            label_surf = self.font.render(value_text, True, BLACK)
-            mass_surf = self.font.render(mass_text, True, BLACK)
-            
-            label_rect = label_surf.get_rect(center=(middle_x, y_offset - 5))
-            mass_rect = mass_surf.get_rect(center=(middle_x, y_offset + 45))
-            
-            self.screen.blit(label_surf, label_rect)
-            self.screen.blit(mass_surf, mass_rect)
-        else:
-            value_text = f"{slider['text']}: {slider['value']:.1f}"
-            if key == "wind_angle":
-                value_text += "°"
-            elif "wind" in key or "thrust" in key:
-                if "thrust" in key:
-                    value_text = f"{slider['text']}: {slider['value']:.0f}"
-                value_text += " " + ("N" if "thrust" in key else "m/s")
-            
-            label_surf = self.font.render(value_text, True, BLACK)
-            label_rect = label_surf.get_rect(center=(middle_x, y_offset - 5))
-            self.screen.blit(label_surf, label_rect)
+            return f"{slider.text}: {slider.value:.0f}px"
+        
+        value_text = f"{slider.text}: {slider.value:.1f}"
+        if key == "wind_angle":
+            value_text += "°"
+        elif "wind" in key or "thrust" in key:
+            if "thrust" in key:
+                value_text = f"{slider.text}: {slider.value:.0f}"
+            value_text += " " + ("N" if "thrust" in key else "m/s")
+        return value_text
     
-    def draw_physics_info(self):
-        """Draw physics information panel"""
-        panel_rect = self.layout.get_control_panel_rect()
-        info_x = panel_rect.x + 10
-        info_y = self.current_height - 200
-        info_width = panel_rect.width - 20
-        info_height = 180
+    def update_slider_hover(self, pos):
+        """Update handle hover highlighting for a mouse position"""
+        for slider in self.sliders.values():
+            slider.set_hover(slider.contains_handle(pos))
+    
+    def draw_physics_info_background(self, surface):
+        """Draw physics information panel frame and title"""
+        info_rect = self.layout.info_rect
         
         # Background
-        info_rect = pygame.Rect(info_x, info_y, info_width, info_height)
-        pygame.draw.rect(self.screen, WHITE, info_rect)
-        pygame.draw.rect(self.screen, BLACK, info_rect, max(1, int(2 * self.layout.global_scale)))
+        pygame.draw.rect(surface, WHITE, info_rect)
+        pygame.draw.rect(surface, BLACK, info_rect, max(1, int(2 * self.layout.global_scale)))
         
         # Title
         title = self.font.render("物理數據", True, BLACK)
-        self.screen.blit(title, (info_x + 10, info_y + 5))
-        
-        # Physics data
-        y_pos = info_y + 30
-        line_height = max(16, int(20 * self.layout.global_scale))
-        
-        physics_info = [
-            f"球體位置: ({self.ball_pos[0]:.0f}, {self.ball_pos[1]:.0f}, {self.ball_pos[2]:.0f})",
-            f"球體速度: ({self.ball_velocity[0]:.1f}, {self.ball_velocity[1]:.1f}, {self.ball_velocity[2]:.1f})",
-            f"上方壓力: {self.physics_data['top_pressure']/1000:.1f} kPa",
-            f"下方壓力: {self.physics_data['bottom_pressure']/1000:.1f} kPa",
-            f"壓力差: {self.physics_data['pressure_diff']/1000:.2f} kPa",
-            f"升力: {self.physics_data['lift_force']:.2f} N",
-            f"側向力: {self.physics_data['side_force']:.2f} N",
-            f"球體質量: {self.physics_data.get('ball_mass', 0.5):.2f} kg"
+        surface.blit(title, self.layout.label_anchors["info_title"])
+    
+    def draw_physics_info(self, state=None):
+        """Draw physics information values, refreshed at the readout's rate"""
+        self.ensure_widget_layout()
+        now = self.now()
+        if self.info_readout.due(now):
+            self.info_readout.set_lines(self.format_physics_info(state), now)
+        self.info_readout.draw(self.screen)
+    
+    def draw_strip_chart(self):
+        """Draw the scrolling force/height chart above the info panel"""
+        if not self.show_strip_chart:
+            return
+        self.ensure_widget_layout()
+        self.strip_chart.draw(self.screen)
+    
+    def update_strip_chart(self, dt, state=None):
+        """Feed the chart the latest lift, weight, net force and height above the ground"""
+        if state is None:
+            state = self
+        physics_data = state.physics_data
+        height = (self.ball_bounds().ground - state.ball_pos[1]) / 100  # Pixels to meters
+        self.strip_chart.add(dt, (physics_data["lift_force"], physics_data["weight"],
+                                  physics_data["net_force"], height))
+    
+    def format_physics_info(self, state=None):
+        """Format the physics readout lines"""
+        if state is None:
+            state = self
+        ball_pos = state.ball_pos
+        ball_velocity = state.ball_velocity
+        physics_data = state.physics_data
+        
+        return [
+            f"球體位置: ({ball_pos[0]:.0f}, {ball_pos[1]:.0f}, {ball_pos[2]:.0f})",
+            f"球體速度: ({ball_velocity[0]:.1f}, {ball_velocity[1]:.1f}, {ball_velocity[2]:.1f})",
+            f"上方壓力: {physics_data['top_pressure']/1000:.1f} kPa",
+            f"下方壓力: {physics_data['bottom_pressure']/1000:.1f} kPa",
+            f"壓力差: {physics_data['pressure_diff']/1000:.2f} kPa",
+            f"升力: {physics_data['lift_force']:.2f} N",
+            f"側向力: {physics_data['side_force']:.2f} N",
+            f"球體質量: {physics_data.get('ball_mass', 0.5):.2f} kg"
         ]
-        
-        for info in physics_info:
-            if y_pos + line_height < info_y + info_height - 5:
-                text_surf = self.font.render(info, True, DARK_BLUE)
-                self.screen.blit(text_surf, (info_x + 10, y_pos))
-                y_pos += line_height
     
-    def draw_instructions(self):
+    def draw_instructions(self, surface):
         """Draw instructions panel"""
-        inst_x = 10
-        inst_y = TITLE_BAR_HEIGHT + 50
-        inst_width = self.layout.view_width - 20
-        inst_height = max(120, int(140 * self.layout.global_scale))
+        inst_x, inst_y, inst_width, inst_height = self.layout.instructions_rect
         
         # Semi-transparent background
         inst_surface = pygame.Surface((inst_width, inst_height), pygame.SRCALPHA)
@@ -1020,16 +1366,16 @@ class BernoulliSimulation:
         pygame.draw.rect(inst_surface, BLACK, (0, 0, inst_width, inst_height), 
                         max(1, int(2 * self.layout.global_scale)), 
                         border_radius=max(5, int(10 * self.layout.global_scale)))
-        self.screen.blit(inst_surface, (inst_x, inst_y))
+        surface.blit(inst_surface, (inst_x, inst_y))
         
         # Instructions text
         instructions = [
             "🖱️ 拖拽球體: 在任一視圖中點擊並拖拽球體",
             "🎛️ 調整參數: 使用右側滑桿控制風力和球體屬性",
-            "📊 觀察數據: 右下角顯示即時物理數據",
+            "📊 觀察數據: 右下角顯示即時物理數據  G: 力/高度圖",
             "🌪️ 伯努利原理: P + ½ρv² + ρgh = 常數",
             "💡 顏色含義: 🟢上升 🟡平衡 🔴下降",
-            "🌬️ 按 V 鍵切換風速圖顯示",
+            "🌬️ V: 風速圖  H: 壓力/速度場  Q: 流場箭頭  L: 輸入延遲  F3: 效能  F5/F9: 存檔/讀檔",
             "🪟 視窗控制: 使用右上角按鈕控制視窗"
         ]
         
@@ -1038,7 +1384,7 @@ class BernoulliSimulation:
         for instruction in instructions:
             if y_pos + line_height < inst_y + inst_height - 5:
                 text_surf = self.font.render(instruction, True, BLACK)
-                self.screen.blit(text_surf, (inst_x + 10, y_pos))
+                surface.blit(text_surf, (inst_x + 10, y_pos))
                 y_pos += line_height
     
     def handle_slider_interaction(self, pos):
@@ -1047,67 +1393,39 @@ class BernoulliSimulation:
         if not panel_rect.collidepoint(pos):
             return False
         
-        middle_x = panel_rect.centerx
-        slider_width = int(self.layout.middle_section_width * 0.8)
-        y_offset = int(TITLE_BAR_HEIGHT + 70 * self.layout.scale_y)
-        y_increment = int(self.layout.content_height * 0.15 * self.layout.scale_y)
-        
-        for key in self.sliders:
-            slider_rect = pygame.Rect(
-                middle_x - slider_width // 2,
-                y_offset + int(10 * self.layout.scale_y),
-                slider_width,
-                int(30 * self.layout.scale_y)
-            )
-            
-            if slider_rect.collidepoint(pos):
+        self.ensure_widget_layout()
+        for key, slider in self.sliders.items():
+            if slider.hit_rect.collidepoint(pos):
                 self.active_slider = key
                 self.update_slider_value(key, pos[0])
                 return True
-            
-            y_offset += y_increment
         
         return False
     
     def update_slider_value(self, key, mouse_x):
         """Update slider value based on mouse position"""
-        panel_rect = self.layout.get_control_panel_rect()
-        middle_x = panel_rect.centerx
-        slider_width = int(self.layout.middle_section_width * 0.8)
-        slider_x = middle_x - slider_width // 2
-        
-        # Calculate position ratio
-        ratio = max(0, min(1, (mouse_x - slider_x) / slider_width))
-        
+        # Update slider value from the position along its track
         slider = self.sliders[key]
-        value_range = slider["max"] - slider["min"]
-        new_value = slider["min"] + ratio * value_range
-        
-        # Update slider value
-        slider["value"] = new_value
+        slider.set_value(slider.value_at(mouse_x))
         
         # Update simulation parameters
-        if key == "wind_speed":
-            self.wind_speed = new_value
-        elif key == "wind_angle":
-            self.wind_angle = new_value
-        elif key == "wind_vertical":
-            self.wind_vertical = new_value
-        elif key == "ball_radius":
-            self.ball_radius = new_value
-        elif key == "vertical_thrust":
-            self.vertical_thrust = new_value
-        elif key == "side_force_coeff":
-            self.side_force_coefficient = new_value
+        setattr(self, SLIDER_ATTRIBUTES[key], slider.value)
+    
+    def sync_sliders(self):
+        """Move every slider to the simulation parameter it controls"""
+        for key, slider in self.sliders.items():
+            slider.set_value(getattr(self, SLIDER_ATTRIBUTES[key]))
     
     def handle_ball_interaction(self, pos, event_type):
         """Handle ball dragging in both views"""
         if event_type == "down":
+            # Hit-test what is on screen - with threaded physics, the last published snapshot
+            shown = self.snapshots.read() if self.threaded_physics else self
             # Check XY view (left panel)
             if pos[0] < self.layout.view_width and pos[1] > TITLE_BAR_HEIGHT:
-                ball_screen_x = int(self.ball_pos[0] * self.layout.scale_x)
-                ball_screen_y = int((self.ball_pos[1] - TITLE_BAR_HEIGHT) * self.layout.scale_y) + TITLE_BAR_HEIGHT
-                scaled_radius = int(self.ball_radius * self.layout.global_scale)
+                ball_screen_x = int(shown.ball_pos[0] * self.layout.scale_x)
+                ball_screen_y = int((shown.ball_pos[1] - TITLE_BAR_HEIGHT) * self.layout.scale_y) + TITLE_BAR_HEIGHT
+                scaled_radius = int(shown.ball_radius * self.layout.global_scale)
                 
                 ball_distance = math.sqrt((pos[0] - ball_screen_x)**2 + 
                                         (pos[1] - ball_screen_y)**2)
@@ -1119,11 +1437,11 @@ class BernoulliSimulation:
                     return True
             
             # Check ZX view (right panel)
-            elif pos[0] > self.layout.view_width + self.layout.middle_section_width and pos[1] > TITLE_BAR_HEIGHT:
-                zx_x = pos[0] - (self.layout.view_width + self.layout.middle_section_width)
-                ball_x_screen = int(self.ball_pos[0] * self.layout.scale_x)
-                ball_z_screen = int((self.layout.content_height // 2 - self.ball_pos[2]) * self.layout.scale_y) + TITLE_BAR_HEIGHT
-                scaled_radius = int(self.ball_radius * self.layout.global_scale)
+            elif pos[0] > self.layout.right_view_x and pos[1] > TITLE_BAR_HEIGHT:
+                zx_x = pos[0] - (self.layout.right_view_x)
+                ball_x_screen = int(shown.ball_pos[0] * self.layout.scale_x)
+                ball_z_screen = int((self.layout.content_height // 2 - shown.ball_pos[2]) * self.layout.scale_y) + TITLE_BAR_HEIGHT
+                scaled_radius = int(shown.ball_radius * self.layout.global_scale)
                 
                 ball_distance = math.sqrt((zx_x - ball_x_screen)**2 + 
                                         (pos[1] - ball_z_screen)**2)
@@ -1153,7 +1471,7 @@ class BernoulliSimulation:
             
             elif self.active_view == "zx":
                 # Update X and Z coordinates
-                zx_x = pos[0] - (self.layout.view_width + self.layout.middle_section_width)
+                zx_x = pos[0] - (self.layout.right_view_x)
                 screen_x = zx_x - self.drag_offset[0]
                 screen_z_pos = pos[1] - self.drag_offset[1]
                 
@@ -1172,131 +1490,421 @@ class BernoulliSimulation:
         return False
     
     def handle_events(self):
-        """Handle pygame events"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if event.button == 1:  # Left click
-                    # Handle window control buttons first
-                    action = self.window_controls.handle_click(event.pos)
-                    if action == "close":
-                        return False
-                    elif action == "minimize":
-                        pygame.display.iconify()
-                        continue
-                    elif action == "maximize":
-                        self.toggle_maximize_window()
-                        continue
-                    elif action == "drag_start":
-                        self.window_controls.dragging_window = True
-                        self.window_controls.drag_offset = event.pos
-                        continue
-                    
-                    # Try ball interaction first
-                    if not self.handle_ball_interaction(event.pos, "down"):
-                        # Try slider interaction
-                        self.handle_slider_interaction(event.pos)
-            
-            elif event.type == pygame.MOUSEBUTTONUP:
-                if event.button == 1:
-                    self.dragging = False
-                    self.active_view = None
-                    self.active_slider = None
-                    self.window_controls.dragging_window = False
-            
-            elif event.type == pygame.MOUSEMOTION:
-                # Handle window control button hover effects
-                self.window_controls.handle_mouse_motion(event.pos)
-                
-                # Handle window dragging
-                if self.window_controls.dragging_window:
-                    # This would require platform-specific window movement code
-                    # For now, we'll skip actual window movement
-                    pass
-                elif self.dragging:
-                    self.handle_ball_interaction(event.pos, "motion")
-                elif self.active_slider:
-                    self.update_slider_value(self.active_slider, event.pos[0])
-            
-            elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_v:
-                    self.show_wind_vectors = not self.show_wind_vectors
-                elif event.key == pygame.K_ESCAPE:
+        """Handle pygame events through the dispatch table
+        
+        Consecutive MOUSEMOTION events are collapsed to the latest one, which
+        is dispatched before the next non-motion event so ordering with clicks
+        is kept. Returns False when the application should exit.
+        """
+        events = self.poll_events()
+        self.input_time = time.perf_counter()
+        self.event_rates.add("received", len(events))
+        
+        pending_motion = None
+        for event in events:
+            if event.type == pygame.MOUSEMOTION:
+                pending_motion = event
+                continue
+            if pending_motion is not None:
+                if not self.dispatch_event(pending_motion):
                     return False
-                elif event.key == pygame.K_F11:
-                    # Toggle fullscreen
-                    self.toggle_maximize_window()
-            
-            elif event.type == pygame.VIDEORESIZE:
-                self.resize_window(event.w, event.h)
+                pending_motion = None
+            if not self.dispatch_event(event):
+                return False
         
+        if pending_motion is not None:
+            return self.dispatch_event(pending_motion)
         return True
     
-    def generate_particles(self):
-        """Generate new particles to replace dead ones"""
-        dead_count = sum(1 for p in self.particles if not p.is_alive())
+    def poll_events(self):
+        """Dequeue this frame's events, from the replay file when replaying"""
+        if self.replay is not None:
+            pygame.event.get()  # Drain real events so only the recording drives input
+            events = self.replay.events_for(self.frame_index)
+        else:
+            events = pygame.event.get()
+        if self.recorder is not None:
+            self.recorder.record(self.frame_index, events)
+        return events
+    
+    def dispatch_event(self, event):
+        """Run the handler for one event; return False to exit"""
+        handler = self.event_handlers.get(event.type)
+        if handler is None:
+            return True
+        self.event_rates.add("handled")
+        return handler(event) is not False
+    
+    def on_quit(self, event):
+        return False
+    
+    def on_mouse_down(self, event):
+        if event.button != 1:  # Left click only
+            return
+        # Mouse positions in the coordinate space the frame is drawn in
+        pos = self.map_mouse_pos(event.pos)
+        
+        # Handle window control buttons first
+        action = self.window_controls.handle_click(pos)
+        if action == "close":
+            return False
+        elif action == "minimize":
+            pygame.display.iconify()
+            return
+        elif action == "maximize":
+            self.toggle_maximize_window()
+            return
+        elif action == "drag_start":
+            self.window_controls.dragging_window = True
+            self.window_controls.drag_offset = pos
+            return
+        
+        # Try ball interaction first, then sliders
+        if self.handle_ball_interaction(pos, "down"):
+            self.record_input("ball_drag")
+        elif self.handle_slider_interaction(pos):
+            self.record_input("slider_drag")
+    
+    def on_mouse_up(self, event):
+        if event.button == 1:
+            self.dragging = False
+            self.active_view = None
+            self.active_slider = None
+            self.window_controls.dragging_window = False
+    
+    def on_mouse_motion(self, event):
+        pos = self.map_mouse_pos(event.pos)
+        
+        # Handle window control button hover effects
+        self.window_controls.handle_mouse_motion(pos)
+        self.update_slider_hover(pos)
+        
+        # Handle window dragging
+        if self.window_controls.dragging_window:
+            # This would require platform-specific window movement code
+            # For now, we'll skip actual window movement
+            pass
+        elif self.dragging:
+            self.handle_ball_interaction(pos, "motion")
+            self.record_input("ball_drag")
+        elif self.active_slider:
+            self.update_slider_value(self.active_slider, pos[0])
+            self.record_input("slider_drag")
+    
+    def record_input(self, kind):
+        """Stamp an interaction with the time its event was dequeued"""
+        after_step = None
+        if kind == "ball_drag" and self.threaded_physics:
+            # The drag is only visible once the physics thread publishes a newer snapshot
+            after_step = self.physics_step + 1
+        self.latency.input(kind, self.input_time, after_step)
+    
+    def on_key_down(self, event):
+        handler = self.key_handlers.get(event.key)
+        if handler is not None:
+            return handler()
+    
+    def on_resize(self, event):
+        self.request_resize(event.w, event.h)
+    
+    def toggle_wind_vectors(self):
+        self.show_wind_vectors = not self.show_wind_vectors
+    
+    def toggle_quiver(self):
+        self.show_quiver = not self.show_quiver
+    
+    def toggle_strip_chart(self):
+        self.show_strip_chart = not self.show_strip_chart
+        self.layout.set_strip_chart_visible(self.show_strip_chart)
+        self.strip_chart.clear()
+    
+    def toggle_latency_overlay(self):
+        self.show_latency = not self.show_latency
+    
+    def toggle_profiler(self):
+        self.profiler.set_enabled(not self.profiler.enabled)
+        if self.profiler.enabled:
+            self.allocations.start()
+        else:
+            self.allocations.stop()
+    
+    def save_state_file(self):
+        """Save the complete simulation state (F5)"""
+        count = save_state(self, self.state_path)
+        print(f"Saved state with {count} particles to {self.state_path}")
+    
+    def load_state_file(self):
+        """Restore the state saved with F5, or the one given with --load-state (F9)"""
+        try:
+            count = load_state(self, self.state_path)
+        except (OSError, ValueError) as error:
+            print(f"Cannot load state: {error}")
+            return
+        self.sync_sliders()
+        print(f"Loaded state with {count} particles from {self.state_path}")
+    
+    def cycle_heatmap_mode(self):
+        """Cycle the field overlay off -> pressure -> speed"""
+        index = HEATMAP_MODES.index(self.heatmap_mode)
+        self.heatmap_mode = HEATMAP_MODES[(index + 1) % len(HEATMAP_MODES)]
+    
+    def step_simulation(self, dt, profiler=None):
+        """Advance ball physics and particles by one step"""
+        # Update physics
+        self.update_ball_physics(dt)
+        if self.telemetry is not None:
+            self.telemetry.record_tick(self, dt)
+        if profiler is not None:
+            profiler.lap("update_ball_physics")
+        
+        # Update particles
+        self.update_particles(dt)
+        if profiler is not None:
+            profiler.lap("update_particles")
+        
+        # Generate new particles
+        self.generate_particles()
+        if profiler is not None:
+            profiler.lap("generate_particles")
+    
+    def capture_snapshot(self):
+        """Copy the current simulation state into an immutable snapshot"""
+        particles = tuple(ParticleState(p.x, p.y, p.z, p.size, p.color, p.life) 
+                          for p in self.particles if p.life > 0)
+        return SimulationSnapshot(
+            step=self.physics_step,
+            ball_pos=tuple(self.ball_pos),
+            ball_velocity=tuple(self.ball_velocity),
+            ball_color=self.get_ball_color(),
+            ball_radius=self.ball_radius,
+            wind_speed=self.wind_speed,
+            wind_angle=self.wind_angle,
+            wind_vertical=self.wind_vertical,
+            particles=particles,
+            physics_data=dict(self.physics_data)
+        )
+    
+    def start_physics_thread(self):
+        """Start advancing physics and particles on a worker thread"""
+        self.physics_running = True
+        self.physics_thread = threading.Thread(target=self.physics_loop, name="physics", daemon=True)
+        self.physics_thread.start()
+    
+    def stop_physics_thread(self):
+        """Stop the physics worker thread and wait for it to finish"""
+        self.physics_running = False
+        if self.physics_thread is not None:
+            self.physics_thread.join()
+            self.physics_thread = None
+    
+    def physics_loop(self):
+        """Fixed-rate physics loop run on the worker thread"""
+        step_dt = 1.0 / PHYSICS_HZ
+        timer = FrameTimer(PHYSICS_HZ, pacing="sleep")
+        
+        while self.physics_running:
+            with self.state_lock:
+                self.step_simulation(step_dt)
+                self.physics_step += 1
+                snapshot = self.capture_snapshot()
+            self.snapshots.publish(snapshot)
+            timer.tick()
+    
+    def draw_frame(self, state=None, profiler=None):
+        """Draw one complete frame onto the screen surface"""
+        # Static layer first in a single blit, rebuilt if the layout changed
+        if self.static_layer_version != self.layout.version:
+            self.build_static_layer()
+        self.screen.blit(self.static_layer, (0, 0))
         
-        for _ in range(min(dead_count, 5)):  # Replace a few each frame
-            x = random.uniform(-400, 400)
-            y = random.uniform(-300, 300)
-            z = random.uniform(-200, 200)
-            self.particles.append(Particle(x, y, z))
+        # Draw title bar
+        self.window_controls.draw(self.screen)
+        if profiler is not None:
+            profiler.lap("static")
+        
+        # Draw particles, field overlays and ball
+        self.draw_particles(state)
+        if profiler is not None:
+            profiler.lap("draw_particles")
+        self.draw_field_overlay(state)
+        self.draw_quiver(state)
+        if profiler is not None:
+            profiler.lap("overlays")
+        self.draw_ball(state)
+        if profiler is not None:
+            profiler.lap("draw_ball")
+        
+        # Draw UI
+        self.draw_ui(state)
+        if profiler is not None:
+            profiler.lap("draw_ui")
+    
+    def run_frame(self, dt):
+        """Handle input, advance the simulation and present one frame; return False on quit"""
+        # Stage timings are only taken while the profiler overlay is shown
+        profiler = self.profiler if self.profiler.enabled else None
+        if profiler is not None:
+            self.allocations.begin_frame()
+            profiler.begin_frame()
+        
+        # Handle events (the lock keeps input from racing the physics thread)
+        with self.state_lock:
+            running = self.handle_events()
+            resizing = self.update_pending_resize()
+        if profiler is not None:
+            profiler.lap("handle_events")
         
-        # Remove dead particles
-        self.particles = [p for p in self.particles if p.is_alive()]
+        if self.threaded_physics:
+            # Render the latest snapshot published by the physics thread
+            state = self.snapshots.read()
+        else:
+            self.step_simulation(dt, profiler)
+            state = None
+        if self.show_strip_chart:
+            self.update_strip_chart(dt, state)
+        
+        # Draw everything
+        self.draw_frame(state, profiler)
+        
+        # Update display
+        self.update_display(resizing)
+        if profiler is not None:
+            profiler.lap("flip")
+        
+        # Idle time before the pacing wait - run any collection that has come due
+        if self.gc_mode == "deferred":
+            collect_if_due()
+        if profiler is not None:
+            profiler.lap("gc")
+            profiler.end_frame()
+            self.allocations.end_frame()
+        self.latency.presented(time.perf_counter(), state.step if state is not None else None)
+        return running
+    
+    def finish_startup(self):
+        """Close the startup timing at the first presented frame and report it if requested"""
+        self.startup.mark("first_frame")
+        if self.startup_report == "-":
+            print(self.startup.format())
+        elif self.startup_report:
+            with open(self.startup_report, "w", encoding="utf-8") as f:
+                json.dump(self.startup.report(), f, indent=2)
+            print(f"Startup report written to {self.startup_report}")
+    
+    def update_display(self, resizing):
+        """Present the frame (or the resize preview) and flip"""
+        if resizing:
+            self.present_resize_preview()
+        else:
+            self.present()
+        pygame.display.flip()
     
     def run(self):
         """Main simulation loop"""
         running = True
-        last_time = pygame.time.get_ticks()
+        self.frame_timer.reset()
         
-        while running:
-            current_time = pygame.time.get_ticks()
-            dt = min(0.1, (current_time - last_time) / 1000.0)
-            last_time = current_time
-            
-            # Handle events
-            running = self.handle_events()
-            
-            # Update physics
-            self.update_ball_physics(dt)
-            
-            # Update particles
-            for particle in self.particles:
-                particle.update(self.wind_speed, self.wind_angle, self.wind_vertical,
-                              self.ball_pos, self.ball_radius, dt)
-            
-            # Generate new particles
-            self.generate_particles()
-            
-            # Draw everything
-            self.screen.fill(WHITE)
-            
-            # Draw title bar first
-            self.window_controls.draw(self.screen)
-            
-            # Draw view backgrounds
-            left_view, right_view = self.layout.get_view_rects()
-            
-            pygame.draw.rect(self.screen, LIGHT_BLUE, left_view)
-            pygame.draw.rect(self.screen, LIGHT_BLUE, right_view)
-            
-            # Draw particles and ball
-            self.draw_particles()
-            self.draw_ball()
-            
-            # Draw UI
-            self.draw_ui()
-            
-            # Update display
-            pygame.display.flip()
-            self.clock.tick(FPS)
+        if self.threaded_physics:
+            self.start_physics_thread()
         
+        while running:
+            # Smoothed frame time from the pacing timer, or the fixed step when recording
+            dt = self.fixed_dt or self.frame_timer.smoothed_dt
+            running = self.run_frame(dt)
+            if self.frame_index == 0:
+                self.finish_startup()
+            self.frame_timer.tick()
+            self.frame_index += 1
+        
+        self.stop_physics_thread()
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"Recorded {self.recorder.count} events over {self.frame_index} frames "
+                  f"to {self.recorder.path}")
+        if self.latency_report:
+            self.write_latency_report(self.latency_report)
+        if self.telemetry is not None:
+            self.telemetry.close()
+            print(f"Telemetry of {self.telemetry.written} ticks written to {self.telemetry.path}")
+        if self.trace is not None:
+            spans = self.trace.write()
+            print(f"Trace of {self.trace.frames_traced} frames ({spans} spans) written to {self.trace.path}")
         pygame.quit()
         sys.exit()
 
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="伯努利原理科學模擬 - 雙平面視圖")
+    parser.add_argument("--threaded", action="store_true",
+                        help="run physics and particles on a worker thread")
+    parser.add_argument("--fps", type=int, default=FPS,
+                        help=f"target frame rate, 0 for unlimited (default: {FPS})")
+    parser.add_argument("--pacing", choices=PACING_MODES, default="hybrid",
+                        help="frame pacing strategy (default: hybrid sleep-then-spin)")
+    parser.add_argument("--fixed-resolution", action="store_true",
+                        help=f"render at {BASE_WIDTH}x{BASE_HEIGHT} and scale to the window once per frame")
+    parser.add_argument("--info-hz", type=float, default=INFO_REFRESH_HZ,
+                        help=f"physics readout refresh rate, 0 for every frame (default: {INFO_REFRESH_HZ})")
+    parser.add_argument("--latency-json", metavar="PATH", default=None,
+                        help="write input latency percentiles to PATH on exit")
+    parser.add_argument("--record", metavar="PATH", default=None,
+                        help="record input events to PATH for input_replay.py (fixed timestep)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the random number generator (stored in recordings)")
+    parser.add_argument("--startup-report", metavar="PATH", nargs="?", const="-", default=None,
+                        help="report startup phase times at the first frame; print them, or write JSON to PATH")
+    parser.add_argument("--trace", metavar="PATH", default=None,
+                        help="write a Chrome trace-event JSON of the run loop to PATH on exit")
+    parser.add_argument("--trace-buffer", type=int, default=200_000,
+                        help="spans kept in the trace ring buffer (default: 200000)")
+    parser.add_argument("--trace-every", type=int, default=1,
+                        help="trace every Nth frame only (default: 1)")
+    parser.add_argument("--gc-mode", choices=GC_MODES, default="auto",
+                        help="auto: normal collection; deferred: freeze startup objects and "
+                             "collect only after each flip (default: auto)")
+    parser.add_argument("--trace-malloc", action="store_true",
+                        help="show peak allocated bytes per frame in the profiler (slows every frame)")
+    parser.add_argument("--load-state", metavar="PATH", default=None,
+                        help=f"start from a state saved with F5; F5/F9 then use PATH (default: {STATE_FILE})")
+    parser.add_argument("--telemetry", metavar="PATH", default=None,
+                        help="record per-tick forces, pressures, position and velocity to a memory-mapped "
+                             "ring buffer at PATH (read it with telemetry.py)")
+    parser.add_argument("--telemetry-capacity", type=int, default=TELEMETRY_CAPACITY,
+                        help=f"ticks kept in the telemetry ring buffer (default: {TELEMETRY_CAPACITY})")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    simulation = BernoulliSimulation()
+    args = parse_args()
+    
+    if args.load_state:
+        # Report a missing or damaged state file before any window opens
+        try:
+            StateFile(args.load_state).close()
+        except (OSError, ValueError) as error:
+            sys.exit(f"Cannot load state: {error}")
+    
+    recorder = None
+    if args.record or args.seed is not None:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 31)
+        random.seed(seed)
+        if args.record:
+            recorder = InputRecorder(args.record, seed, args.fps or FPS,
+                                     fixed_resolution=args.fixed_resolution,
+                                     state_path=args.load_state or STATE_FILE,
+                                     starts_from_state=args.load_state is not None)
+    
+    trace = None
+    if args.trace:
+        trace = TraceRecorder(args.trace, capacity=args.trace_buffer, every=args.trace_every)
+    
+    telemetry = None
+    if args.telemetry:
+        telemetry = TelemetryRecorder(args.telemetry, capacity=args.telemetry_capacity)
+    
+    simulation = BernoulliSimulation(threaded_physics=args.threaded, target_fps=args.fps, pacing=args.pacing,
+                                     fixed_resolution=args.fixed_resolution, info_hz=args.info_hz,
+                                     latency_report=args.latency_json, recorder=recorder, trace=trace,
+                                     startup_report=args.startup_report, gc_mode=args.gc_mode,
+                                     trace_malloc=args.trace_malloc, state_path=args.load_state,
+                                     telemetry=telemetry)
     simulation.run()
@@ -1,21 +1,17 @@
 import pygame
 import sys
+import time
 import math
 import random
 from pygame.locals import *
 
-# Initialize pygame
-pygame.init()
+from bernoulli_core import AIR_DENSITY, GRAVITY, ATMOSPHERIC_PRESSURE
 
-# Get display info for responsive design
-display_info = pygame.display.Info()
-SCREEN_WIDTH = display_info.current_w
-SCREEN_HEIGHT = display_info.current_h
-
-# Constants - now responsive to screen size
-WIDTH = min(int(SCREEN_WIDTH * 0.9), 1400)  # 90% of screen width, max 1400px
-HEIGHT = min(int(SCREEN_HEIGHT * 0.9), 800)  # 90% of screen height, max 800px
-VIEW_WIDTH = int(WIDTH * 0.4)  # 40% of window width for each view
+# Constants - the window is sized from the desktop when the simulation is created
+MAX_WIDTH = 1400
+MAX_HEIGHT = 800
+SCREEN_FRACTION = 0.9  # Window covers 90% of the desktop, up to the maximum size
+VIEW_FRACTION = 0.4  # 40% of window width for each view
 FPS = 60
 WHITE = (255, 255, 255)
 BLACK = (30, 30, 30)
@@ -29,9 +25,10 @@ DARK_GRAY = (180, 180, 200)
 PANEL_BG = (250, 252, 255)
 PANEL_SHADOW = (200, 210, 230)
 
-# Physics constants
-AIR_DENSITY = 1.225  # kg/m³
-GRAVITY = 9.81  # m/s²
+# Streamline settings
+STREAMLINE_POINTS = 20  # Points per streamline
+MIN_STREAMLINES = 2
+MAX_STREAMLINES = 64
 
 class Particle:
     def __init__(self, x, y, z, wind_speed, wind_angle, vertical_wind):
@@ -88,34 +85,49 @@ class Particle:
         # Decrease life
         self.life -= 1
         
-    def is_alive(self):
-        return self.life > 0 and 0 <= self.x <= WIDTH and 0 <= self.y <= HEIGHT and -VIEW_WIDTH/2 <= self.z <= VIEW_WIDTH/2
+    def is_alive(self, width, height, view_width):
+        return self.life > 0 and 0 <= self.x <= width and 0 <= self.y <= height and -view_width/2 <= self.z <= view_width/2
 
 class BernoulliSimulation:
     def __init__(self):
+        # Only the display and fonts are used - nothing is initialized at import
+        pygame.display.init()
+        pygame.font.init()
+        
+        # Responsive window size from the desktop (queried before the window exists)
+        display_info = pygame.display.Info()
+        width = min(int(display_info.current_w * SCREEN_FRACTION), MAX_WIDTH)
+        height = min(int(display_info.current_h * SCREEN_FRACTION), MAX_HEIGHT)
+        view_width = int(width * VIEW_FRACTION)
+        
+        # Particles spawn and are culled within the initial window size
+        self.base_width = width
+        self.base_height = height
+        self.base_view_width = view_width
+        
         # Set up display with responsive dimensions
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+        self.screen = pygame.display.set_mode((width, height), pygame.RESIZABLE)
         pygame.display.set_caption("伯努利原理科学玩具 - Bernoulli Principle Simulation")
         self.clock = pygame.time.Clock()
         
         # Store current window dimensions
-        self.current_width = WIDTH
-        self.current_height = HEIGHT
-        self.current_view_width = VIEW_WIDTH
-        self.middle_section_width = int(WIDTH * 0.2)  # 20% of width for middle section
+        self.current_width = width
+        self.current_height = height
+        self.current_view_width = view_width
+        self.middle_section_width = int(width * 0.2)  # 20% of width for middle section
         
         # Create transparent surfaces for particles in each view
-        self.particle_surface_xy = pygame.Surface((VIEW_WIDTH, HEIGHT), pygame.SRCALPHA)
-        self.particle_surface_xz = pygame.Surface((VIEW_WIDTH, HEIGHT), pygame.SRCALPHA)
+        self.particle_surface_xy = pygame.Surface((view_width, height), pygame.SRCALPHA)
+        self.particle_surface_xz = pygame.Surface((view_width, height), pygame.SRCALPHA)
         
         # Simulation parameters
         self.wind_speed = 20  # m/s
-        self.ball_radius = int(HEIGHT * 0.07)  # Responsive ball size (7% of height)
+        self.ball_radius = int(height * 0.07)  # Responsive ball size (7% of height)
         self.wind_angle = 0  # degrees (0 = from left to right)
         self.vertical_wind = 0  # m/s
         
         # Ball position (initially centered) - now with z-coordinate
-        self.ball_pos = [VIEW_WIDTH // 2, HEIGHT // 2, 0]
+        self.ball_pos = [view_width // 2, height // 2, 0]
         self.dragging = False
         self.active_view = None  # To track which view is being interacted with
         
@@ -153,6 +165,10 @@ class BernoulliSimulation:
         
         self.ball_vz = 0  # z方向速度
         
+        # 流線密度與快取 (每個視圖保留最近一次的幾何)
+        self.num_streamlines = 8
+        self.streamline_cache = {}
+        
     def generate_particles(self):
         # Add new particles from different sides based on wind angle
         angle_rad = math.radians(self.wind_angle)
@@ -162,20 +178,20 @@ class BernoulliSimulation:
         if random.random() < 0.3:
             # Determine entry point based on wind direction
             if cos_angle < 0:  # Wind from right
-                x = VIEW_WIDTH
-                y = random.randint(0, HEIGHT)
+                x = self.base_view_width
+                y = random.randint(0, self.base_height)
             elif cos_angle > 0:  # Wind from left
                 x = 0
-                y = random.randint(0, HEIGHT)
+                y = random.randint(0, self.base_height)
             elif sin_angle < 0:  # Wind from bottom
-                x = random.randint(0, VIEW_WIDTH)
-                y = HEIGHT
+                x = random.randint(0, self.base_view_width)
+                y = self.base_height
             else:  # Wind from top
-                x = random.randint(0, VIEW_WIDTH)
+                x = random.randint(0, self.base_view_width)
                 y = 0
                 
             # Random z position for 3D effect
-            z = random.uniform(-VIEW_WIDTH/4, VIEW_WIDTH/4)
+            z = random.uniform(-self.base_view_width/4, self.base_view_width/4)
             
             self.particles.append(Particle(x, y, z, self.wind_speed, self.wind_angle, self.vertical_wind))
     
@@ -225,7 +241,7 @@ class BernoulliSimulation:
         # P = P₀ - ½ρv²，其中P₀是靜止壓力
         
         # 假設靜止壓力為標準大氣壓
-        p0 = 101325  # 帕斯卡
+        p0 = ATMOSPHERIC_PRESSURE  # 帕斯卡
         
         # 計算各點壓力
         pressure_stagnation = p0 + 0.5 * AIR_DENSITY * (effective_velocity**2)  # 前方淹點壓力最高
@@ -321,105 +337,108 @@ class BernoulliSimulation:
     
     def draw_bernoulli_effects(self, x, y, radius, angle_rad, is_xz_view=False):
         """繪製伯努利效應的流線和壓力分佈"""
-        # 繪製流線
-        num_streamlines = 8
+        for color, points, arrow in self.get_streamlines(x, y, radius, angle_rad, is_xz_view):
+            # 繪製平滑曲線
+            pygame.draw.aalines(self.screen, color, False, points, 2)
+            
+            # 在流線末端繪製箭頭
+            if arrow:
+                pygame.draw.polygon(self.screen, color, arrow)
+    
+    def get_streamlines(self, x, y, radius, angle_rad, is_xz_view=False):
+        """Return cached streamline geometry, rebuilding it only when the inputs change"""
+        x = round(x)
+        y = round(y)
+        key = (x, y, radius, angle_rad, self.num_streamlines)
+        cached = self.streamline_cache.get(is_xz_view)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        
+        streamlines = self.build_streamlines(x, y, radius, angle_rad, is_xz_view)
+        self.streamline_cache[is_xz_view] = (key, streamlines)
+        return streamlines
+    
+    def build_streamlines(self, x, y, radius, angle_rad, is_xz_view=False):
+        """計算所有流線的點、顏色與箭頭 (一次批次計算，三角函數只算一次)"""
+        num_streamlines = self.num_streamlines
         streamline_length = radius * 3
-        streamline_points = 20
         
-        # 計算流線起點
-        start_angle = angle_rad + math.pi  # 從球體上游開始
-        start_radius = radius * 1.5
+        # 方向向量 (風向與垂直方向)
+        cos_a = math.cos(angle_rad)
+        sin_a = math.sin(angle_rad) if not is_xz_view else 0.0  # XY視圖才移動Y座標
+        cos_p = math.cos(angle_rad + math.pi/2)
+        sin_p = math.sin(angle_rad + math.pi/2) if not is_xz_view else 0.0
         
-        for i in range(num_streamlines):
-            # 計算垂直於風向的偏移
-            offset = (i - num_streamlines/2 + 0.5) * radius / (num_streamlines/3)
-            
-            # 起點座標
-            start_x = x + math.cos(start_angle) * start_radius
-            start_y = y + math.sin(start_angle) * start_radius
-            
-            # 垂直於風向的偏移
-            perp_angle = angle_rad + math.pi/2
-            start_x += math.cos(perp_angle) * offset
-            if not is_xz_view:  # XY視圖才移動Y座標
-                start_y += math.sin(perp_angle) * offset
+        # 流線起點 (從球體上游開始)
+        start_radius = radius * 1.5
+        base_x = x + math.cos(angle_rad + math.pi) * start_radius
+        base_y = y + math.sin(angle_rad + math.pi) * start_radius
+        
+        # 沿流線的距離表與偏移量表
+        steps = [streamline_length * j / (STREAMLINE_POINTS - 1) for j in range(STREAMLINE_POINTS)]
+        spacing = radius / (num_streamlines / 3)
+        offsets = [(i - num_streamlines/2 + 0.5) * spacing for i in range(num_streamlines)]
+        
+        influence_radius = radius * 2
+        streamlines = []
+        for offset in offsets:
+            start_x = base_x + cos_p * offset
+            start_y = base_y + sin_p * offset
+            deflection_dir = 1 if offset > 0 else -1
             
-            # 繪製流線
             points = []
-            for j in range(streamline_points):
-                # 流線長度參數
-                t = j / (streamline_points - 1)
-                dist = streamline_length * t
+            for dist in steps:
+                point_x = start_x + cos_a * dist
+                point_y = start_y + sin_a * dist
                 
-                # 基本位置
-                point_x = start_x + math.cos(angle_rad) * dist
-                point_y = start_y
-                if not is_xz_view:  # XY視圖才移動Y座標
-                    point_y += math.sin(angle_rad) * dist
-                
-                # 計算到球心的距離
-                dx = point_x - x
-                dy = point_y - y
-                distance = math.sqrt(dx*dx + dy*dy)
-                
-                # 流線繞球體彎曲
-                if distance < radius * 2:
-                    # 計算偏移量，越接近球體偏移越大
-                    deflection = max(0, 1 - distance / (radius * 2))
-                    deflection_amount = radius * deflection * 1.5
-                    
-                    # 根據流線位置決定偏移方向
-                    deflection_dir = 1 if offset > 0 else -1
-                    
-                    # 應用偏移
-                    perp_angle = angle_rad + math.pi/2
-                    point_x += math.cos(perp_angle) * deflection_amount * deflection_dir
-                    if not is_xz_view:  # XY視圖才移動Y座標
-                        point_y += math.sin(perp_angle) * deflection_amount * deflection_dir
+                # 流線繞球體彎曲，越接近球體偏移越大
+                distance = math.hypot(point_x - x, point_y - y)
+                if distance < influence_radius:
+                    deflection_amount = radius * (1 - distance / influence_radius) * 1.5 * deflection_dir
+                    point_x += cos_p * deflection_amount
+                    point_y += sin_p * deflection_amount
                 
                 points.append((point_x, point_y))
             
-            # 繪製流線
-            if len(points) > 1:
-                # 根據流速決定顏色
-                if abs(offset) < radius * 0.5:
-                    # 靠近球體中心的流線速度較快，顏色較深
-                    color = (0, 0, 200, 150)
-                else:
-                    # 遠離球體中心的流線速度較慢，顏色較淺
-                    color = (100, 150, 255, 150)
-                
-                # 繪製平滑曲線
-                pygame.draw.aalines(self.screen, color, False, points, 2)
-                
-                # 在流線末端繪製箭頭
-                if len(points) >= 2:
-                    end_point = points[-1]
-                    pre_end_point = points[-2]
-                    
-                    # 計算箭頭方向
-                    arrow_dx = end_point[0] - pre_end_point[0]
-                    arrow_dy = end_point[1] - pre_end_point[1]
-                    arrow_len = math.sqrt(arrow_dx*arrow_dx + arrow_dy*arrow_dy)
-                    
-                    if arrow_len > 0:
-                        arrow_dx /= arrow_len
-                        arrow_dy /= arrow_len
-                        
-                        # 箭頭尺寸
-                        arrow_size = 5
-                        
-                        # 箭頭兩側點
-                        arrow_perp_x = -arrow_dy
-                        arrow_perp_y = arrow_dx
-                        
-                        p1 = (end_point[0] - arrow_dx * arrow_size + arrow_perp_x * arrow_size,
-                              end_point[1] - arrow_dy * arrow_size + arrow_perp_y * arrow_size)
-                        p2 = (end_point[0] - arrow_dx * arrow_size - arrow_perp_x * arrow_size,
-                              end_point[1] - arrow_dy * arrow_size - arrow_perp_y * arrow_size)
-                        
-                        # 繪製箭頭
-                        pygame.draw.polygon(self.screen, color, [end_point, p1, p2])
+            # 靠近球體中心的流線速度較快，顏色較深
+            if abs(offset) < radius * 0.5:
+                color = (0, 0, 200, 150)
+            else:
+                color = (100, 150, 255, 150)
+            
+            streamlines.append((color, points, self.streamline_arrow(points)))
+        
+        return streamlines
+    
+    def streamline_arrow(self, points):
+        """計算流線末端箭頭的三個頂點"""
+        end_point = points[-1]
+        pre_end_point = points[-2]
+        arrow_dx = end_point[0] - pre_end_point[0]
+        arrow_dy = end_point[1] - pre_end_point[1]
+        arrow_len = math.hypot(arrow_dx, arrow_dy)
+        if arrow_len == 0:
+            return None
+        
+        arrow_dx /= arrow_len
+        arrow_dy /= arrow_len
+        
+        # 箭頭尺寸
+        arrow_size = 5
+        
+        # 箭頭兩側點
+        arrow_perp_x = -arrow_dy
+        arrow_perp_y = arrow_dx
+        
+        p1 = (end_point[0] - arrow_dx * arrow_size + arrow_perp_x * arrow_size,
+              end_point[1] - arrow_dy * arrow_size + arrow_perp_y * arrow_size)
+        p2 = (end_point[0] - arrow_dx * arrow_size - arrow_perp_x * arrow_size,
+              end_point[1] - arrow_dy * arrow_size - arrow_perp_y * arrow_size)
+        return [end_point, p1, p2]
+    
+    def set_streamline_density(self, count):
+        """調整流線數量"""
+        self.num_streamlines = max(MIN_STREAMLINES, min(MAX_STREAMLINES, count))
     
     def draw_particles(self):
         # Clear the particle surfaces
@@ -441,7 +460,8 @@ class BernoulliSimulation:
                               (int(xz_x), int(xz_y)), particle.size)
         
         # Remove dead particles
-        self.particles = [p for p in self.particles if p.is_alive()]
+        self.particles = [p for p in self.particles
+                          if p.is_alive(self.base_width, self.base_height, self.base_view_width)]
         
         # Draw the particle surfaces
         self.screen.blit(self.particle_surface_xy, (0, 0))
@@ -742,6 +762,7 @@ class BernoulliSimulation:
             "操作說明:",
             "- 按 'I' 鍵隱藏/顯示此信息",
             "- 按 'F' 鍵切換全屏模式",
+            "- 按 '+'/'-' 鍵調整流線密度",
             "- 在兩個視圖中拖動球體可改變其位置",
             "- 球體移動有速度限制，防止過快移動",
             "- 釋放球體後，它會逐漸減速停下",
@@ -779,6 +800,10 @@ class BernoulliSimulation:
                 elif event.key == K_f:
                     # Toggle fullscreen
                     pygame.display.toggle_fullscreen()
+                elif event.key in (K_EQUALS, K_PLUS, K_KP_PLUS):
+                    self.set_streamline_density(self.num_streamlines + 2)
+                elif event.key in (K_MINUS, K_KP_MINUS):
+                    self.set_streamline_density(self.num_streamlines - 2)
             
             elif event.type == VIDEORESIZE:
                 # Handle window resize event
@@ -922,12 +947,12 @@ class BernoulliSimulation:
             pass  # 直接用滑桿值即可
     
     def run(self):
-        last_time = pygame.time.get_ticks()
+        last_time = time.perf_counter()
         
         while True:
             # Calculate delta time for physics updates
-            current_time = pygame.time.get_ticks()
-            dt = (current_time - last_time) / 1000.0  # Convert to seconds
+            current_time = time.perf_counter()
+            dt = current_time - last_time  # Seconds
             last_time = current_time
             
             # Handle events
@@ -0,0 +1,240 @@
+"""Local flow field around the ball and the overlays built from it
+
+The wind model is ideal potential flow past a cylinder in the plane of each
+view: the free stream speeds up to twice its speed over the top and bottom
+of the ball and stagnates in front of and behind it. The field relative to
+the ball center does not depend on where the ball is, so overlays are cached
+against the wind and the ball radius only and blitted at the ball position.
+The normalized heatmap does not depend on the wind strength or, measured in
+ball radii, on the radius either: its grid is cached per wind direction and
+only rescaled when the radius changes.
+"""
+import math
+
+import pygame
+
+HEATMAP_MODES = ("off", "pressure", "speed")
+
+# Value ranges used for normalization (pressure coefficient and speed ratio)
+PRESSURE_COEFF_RANGE = (-3.0, 1.0)
+SPEED_RATIO_RANGE = (0.0, 2.0)
+
+# Colormap stops: position, (r, g, b)
+PRESSURE_STOPS = [(0.0, (40, 60, 200)), (0.5, (235, 235, 235)), (1.0, (210, 40, 40))]
+SPEED_STOPS = [(0.0, (68, 1, 84)), (0.35, (49, 104, 142)), (0.7, (53, 183, 121)), (1.0, (253, 231, 37))]
+
+# Heatmap grids are cached per wind direction in this many buckets
+HEATMAP_ANGLE_BUCKETS = 72
+
+# Quiver overlay
+QUIVER_COLOR = (25, 25, 112, 190)
+QUIVER_ANGLE_BUCKETS = 36
+QUIVER_LENGTH_BUCKETS = 4
+QUIVER_MIN_CELL = 32  # Smallest grid cell in pixels
+QUIVER_MAX_COLUMNS = 24  # Per view; bounds the glyph count on large windows
+
+
+def view_free_stream(wind_speed, wind_angle, wind_vertical, view):
+    """Free-stream velocity in the plane of a view as (horizontal, screen-up)"""
+    wind_rad = math.radians(wind_angle)
+    wind_x = wind_speed * math.cos(wind_rad)
+    if view == "xy":
+        return wind_x, wind_vertical
+    return wind_x, wind_speed * math.sin(wind_rad)
+
+
+def flow_velocity(dx, dy, radius, u_inf, v_inf):
+    """Velocity at offset (dx, dy) from the ball center, with dy pointing up
+
+    Uses the complex potential F(z) = conj(V) z + V R^2 / z, whose velocity
+    is V - conj(V) R^2 / conj(z)^2. Points inside the ball have no flow.
+    """
+    if dx * dx + dy * dy <= radius * radius:
+        return 0.0, 0.0
+    free_stream = complex(u_inf, v_inf)
+    velocity = free_stream - free_stream.conjugate() * radius * radius / complex(dx, -dy) ** 2
+    return velocity.real, velocity.imag
+
+
+def build_lut(stops, size=256):
+    """Precompute an RGB colormap as a list of 3-byte entries"""
+    lut = []
+    for i in range(size):
+        t = i / (size - 1)
+        for (t0, c0), (t1, c1) in zip(stops, stops[1:]):
+            if t <= t1:
+                f = (t - t0) / (t1 - t0) if t1 > t0 else 0.0
+                color = [int(a + (b - a) * f) for a, b in zip(c0, c1)]
+                break
+        lut.append(bytes(color))
+    return lut
+
+
+class FieldHeatmap:
+    """Pressure or speed heatmap around the ball, cached per view"""
+    def __init__(self, resolution=48, extent=4.0, alpha=150):
+        self.resolution = resolution  # Grid cells per side
+        self.extent = extent  # Half-size of the sampled region in ball radii
+        self.luts = {
+            "pressure": build_lut(PRESSURE_STOPS),
+            "speed": build_lut(SPEED_STOPS)
+        }
+        self.alpha = alpha
+        self.transparent = bytes(4)
+        self.angle_step = 360.0 / HEATMAP_ANGLE_BUCKETS
+        self.grids = {}  # (mode, direction bucket) -> grid surface, in ball radii
+        self.cache = {}  # view -> (key, surface)
+
+    def get_surface(self, view, mode, radius, u_inf, v_inf):
+        """Return the overlay surface centered on the ball, or None when there is no flow"""
+        if mode not in self.luts or radius <= 0 or math.hypot(u_inf, v_inf) < 0.5:
+            return None
+
+        # Only the direction matters after normalization; the radius is in whole pixels
+        bucket = round(math.degrees(math.atan2(v_inf, u_inf)) / self.angle_step) % HEATMAP_ANGLE_BUCKETS
+        key = (mode, bucket, radius)
+        cached = self.cache.get(view)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        grid = self.grids.get((mode, bucket))
+        if grid is None:
+            grid = self._render_grid(mode, bucket)
+            self.grids[(mode, bucket)] = grid
+        size = max(self.resolution, int(2 * radius * self.extent))
+        surface = pygame.transform.smoothscale(grid, (size, size)).convert_alpha()
+        self.cache[view] = (key, surface)
+        return surface
+
+    def _render_grid(self, mode, bucket):
+        """Evaluate the field for a unit ball and unit wind on the coarse grid"""
+        angle = math.radians(bucket * self.angle_step)
+        u_inf, v_inf = math.cos(angle), math.sin(angle)
+        radius = 1.0
+        lut = self.luts[mode]
+        top = len(lut) - 1
+        cells = self.resolution
+        half = radius * self.extent
+        step = 2 * half / cells
+        free_speed_sq = u_inf * u_inf + v_inf * v_inf
+        if mode == "pressure":
+            low, high = PRESSURE_COEFF_RANGE
+        else:
+            low, high = SPEED_RATIO_RANGE
+        span = high - low
+        fade_start = 0.6 * half  # Fade out toward the edge of the sampled region
+
+        pixels = bytearray()
+        for row in range(cells):
+            dy = half - (row + 0.5) * step
+            for col in range(cells):
+                dx = (col + 0.5) * step - half
+                distance = math.hypot(dx, dy)
+                if distance <= radius or distance >= half:
+                    pixels += self.transparent
+                    continue
+                u, v = flow_velocity(dx, dy, radius, u_inf, v_inf)
+                speed_sq = (u * u + v * v) / free_speed_sq
+                if mode == "pressure":
+                    value = 1.0 - speed_sq  # Pressure coefficient from Bernoulli
+                else:
+                    value = math.sqrt(speed_sq)
+                index = int((value - low) / span * top)
+                pixels += lut[max(0, min(top, index))]
+                fade = min(1.0, (half - distance) / (half - fade_start))
+                pixels.append(int(self.alpha * fade))
+
+        return pygame.image.frombuffer(bytes(pixels), (cells, cells), "RGBA").copy()
+
+
+class ArrowGlyphs:
+    """Pre-rendered rotated arrow sprites in angle and length buckets"""
+    def __init__(self, cell_size, color=QUIVER_COLOR,
+                 angle_buckets=QUIVER_ANGLE_BUCKETS, length_buckets=QUIVER_LENGTH_BUCKETS):
+        self.cell_size = cell_size
+        self.angle_buckets = angle_buckets
+        self.length_buckets = length_buckets
+        self.angle_step = 360.0 / angle_buckets
+
+        # glyphs[length][angle] -> (surface, offset of the surface center)
+        self.glyphs = []
+        for length_index in range(length_buckets):
+            length = max(6, int(cell_size * 0.85 * (length_index + 1) / length_buckets))
+            arrow = self._render_arrow(length, color)
+            row = []
+            for angle_index in range(angle_buckets):
+                rotated = pygame.transform.rotate(arrow, angle_index * self.angle_step)
+                row.append((rotated, (rotated.get_width() // 2, rotated.get_height() // 2)))
+            self.glyphs.append(row)
+
+    def get(self, angle_deg, speed_ratio):
+        """Glyph for a direction in degrees (counterclockwise) and a speed ratio in [0, 2]"""
+        angle_index = int(round(angle_deg / self.angle_step)) % self.angle_buckets
+        length_index = min(self.length_buckets - 1, int(speed_ratio * 0.5 * self.length_buckets))
+        return self.glyphs[length_index][angle_index]
+
+    @staticmethod
+    def _render_arrow(length, color):
+        """Arrow pointing right, centered on its surface"""
+        head = max(3, length // 3)
+        height = head + 2
+        arrow = pygame.Surface((length, height), pygame.SRCALPHA)
+        mid = height // 2
+        pygame.draw.line(arrow, color, (0, mid), (length - head, mid), max(1, length // 16))
+        pygame.draw.polygon(arrow, color, [(length - 1, mid), (length - head, mid - head // 2),
+                                           (length - head, mid + head // 2)])
+        return arrow
+
+
+class QuiverField:
+    """Local flow arrows on a grid over each view, rebuilt only when inputs change"""
+    def __init__(self):
+        self.glyphs = None
+        self.cache = {}  # view -> (key, blit sequence)
+
+    @staticmethod
+    def cell_size(view_width):
+        """Grid spacing that keeps at most QUIVER_MAX_COLUMNS columns per view"""
+        return max(QUIVER_MIN_CELL, -(-view_width // QUIVER_MAX_COLUMNS))
+
+    def get_blits(self, view, view_rect, center, radius, u_inf, v_inf):
+        """Blit sequence of (glyph, position) pairs for one view"""
+        free_speed = math.hypot(u_inf, v_inf)
+        if free_speed < 0.5:
+            return []
+
+        cell = self.cell_size(view_rect.width)
+        if self.glyphs is None or self.glyphs.cell_size != cell:
+            self.glyphs = ArrowGlyphs(cell)
+            self.cache.clear()
+
+        key = (tuple(view_rect), center, radius, u_inf, v_inf)
+        cached = self.cache.get(view)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        columns = view_rect.width // cell
+        rows = view_rect.height // cell
+        left = view_rect.x + (view_rect.width - columns * cell) // 2 + cell // 2
+        top = view_rect.y + (view_rect.height - rows * cell) // 2 + cell // 2
+        ball_x, ball_y = center
+        keep_out = radius + cell // 2
+
+        sequence = []
+        for row in range(rows):
+            y = top + row * cell
+            dy = ball_y - y
+            for col in range(columns):
+                x = left + col * cell
+                dx = x - ball_x
+                if dx * dx + dy * dy < keep_out * keep_out:
+                    continue
+                u, v = flow_velocity(dx, dy, radius, u_inf, v_inf)
+                speed_ratio = math.hypot(u, v) / free_speed
+                if speed_ratio < 0.05:
+                    continue
+                glyph, (offset_x, offset_y) = self.glyphs.get(math.degrees(math.atan2(v, u)), speed_ratio)
+                sequence.append((glyph, (x - offset_x, y - offset_y)))
+
+        self.cache[view] = (key, sequence)
+        return sequence
@@ -0,0 +1,190 @@
+"""Headless export of the dual-view simulation to a PNG sequence or raw RGB stream
+
+Runs BernoulliSimulation under the SDL dummy video driver with a fixed
+timestep. Frames are rendered offscreen and their pixel buffers are handed
+to a writer thread through a bounded queue, so file I/O and PNG encoding
+never run on the simulation thread.
+
+Usage:
+    python frame_export.py --seconds 60 --fps 60 --out clip/ --format png
+    python frame_export.py --seconds 60 --out clip.rgb --format raw
+    ffmpeg -f rawvideo -pix_fmt rgb24 -s 1400x800 -r 60 -i clip.rgb clip.mp4
+"""
+import argparse
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+import pygame
+
+EXPORT_FORMATS = ("png", "raw")
+
+
+class FrameWriter:
+    """Write frames handed over through a bounded queue on background threads
+
+    PNG frames are independent files, so several writer threads can encode
+    them in parallel. The raw stream must stay in order and uses one thread.
+    """
+    def __init__(self, path, size, fmt="png", queue_size=32, writers=1):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"unknown export format: {fmt!r} (expected one of {EXPORT_FORMATS})")
+
+        self.path = path
+        self.size = size
+        self.fmt = fmt
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.count_lock = threading.Lock()
+        self.error = None
+
+        target = self._write_raw if fmt == "raw" else self._write_png
+        count = 1 if fmt == "raw" else max(1, writers)
+        self.threads = [threading.Thread(target=target, name=f"frame-writer-{i}", daemon=True)
+                        for i in range(count)]
+
+    def start(self):
+        """Start the writer threads"""
+        if self.fmt == "png":
+            os.makedirs(self.path, exist_ok=True)
+        for thread in self.threads:
+            thread.start()
+
+    def submit(self, pixels):
+        """Queue one frame of RGB bytes; blocks only when the queue is full"""
+        if self.error is not None:
+            raise self.error
+        self.queue.put((self.frames_submitted, pixels))
+        self.frames_submitted += 1
+
+    def close(self):
+        """Flush the remaining frames and stop the writer threads"""
+        for _ in self.threads:
+            self.queue.put(None)
+        for thread in self.threads:
+            thread.join()
+        if self.error is not None:
+            raise self.error
+
+    def _write_raw(self):
+        """Writer thread body for the raw RGB24 stream"""
+        try:
+            with open(self.path, "wb") as stream:
+                while True:
+                    item = self.queue.get()
+                    if item is None:
+                        break
+                    stream.write(item[1])
+                    self._count_frame()
+        except Exception as exc:
+            self._fail(exc)
+
+    def _write_png(self):
+        """Writer thread body for the PNG sequence"""
+        try:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                index, pixels = item
+                frame = pygame.image.frombuffer(pixels, self.size, "RGB")
+                pygame.image.save(frame, os.path.join(self.path, f"frame_{index:05d}.png"))
+                self._count_frame()
+        except Exception as exc:
+            self._fail(exc)
+
+    def _count_frame(self):
+        with self.count_lock:
+            self.frames_written += 1
+
+    def _fail(self, exc):
+        """Record a writer failure so it surfaces on the simulation thread"""
+        self.error = exc
+        # Keep draining so a blocked producer can observe the error
+        while self.queue.get() is not None:
+            pass
+
+
+def export(simulation, seconds, fps, path, fmt="png", queue_size=32, writers=1):
+    """Render `seconds` of simulation at a fixed timestep and write every frame"""
+    to_bytes = getattr(pygame.image, "tobytes", None) or pygame.image.tostring
+    size = simulation.screen.get_size()
+    writer = FrameWriter(path, size, fmt, queue_size, writers)
+    writer.start()
+
+    dt = 1.0 / fps
+    total_frames = int(seconds * fps)
+    # UI timing (readout refresh, resize settling) follows simulated time, not the wall clock
+    simulation.fixed_dt = dt
+    simulation.frame_index = 0
+    start = time.perf_counter()
+    try:
+        for _ in range(total_frames):
+            pygame.event.pump()
+            simulation.step_simulation(dt)
+            simulation.draw_frame()
+            writer.submit(to_bytes(simulation.screen, "RGB"))
+            simulation.frame_index += 1
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "frames": writer.frames_written,
+        "elapsed": elapsed,
+        "realtime_factor": seconds / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Export the Bernoulli simulation headlessly")
+    parser.add_argument("--out", required=True,
+                        help="output directory (png) or file (raw)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="png",
+                        help="PNG sequence or raw RGB24 stream (default: png)")
+    parser.add_argument("--seconds", type=float, default=10.0,
+                        help="clip length in simulated seconds (default: 10)")
+    parser.add_argument("--fps", type=int, default=60,
+                        help="fixed timestep rate (default: 60)")
+    parser.add_argument("--size", default=None,
+                        help="frame size as WIDTHxHEIGHT (default: simulation default)")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the random number generator for reproducible clips")
+    parser.add_argument("--queue-size", type=int, default=32,
+                        help="frames buffered between renderer and writer (default: 32)")
+    parser.add_argument("--writers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="parallel PNG writer threads (default: up to 4)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Render offscreen - must be set before pygame initializes the display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    if args.seed is not None:
+        random.seed(args.seed)
+
+    from bernoulli_dual_view_refactored import BernoulliSimulation
+
+    simulation = BernoulliSimulation()
+    if args.size:
+        width, height = (int(v) for v in args.size.lower().split("x"))
+        simulation.resize_window(width, height)
+
+    result = export(simulation, args.seconds, args.fps, args.out, args.format,
+                    args.queue_size, args.writers)
+    print(f"Exported {result['frames']} frames in {result['elapsed']:.1f}s "
+          f"({result['realtime_factor']:.2f}x real time) to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Frame pacing and frame-time statistics for the simulation loops"""
+import math
+import time
+from collections import deque
+
+# Pacing strategies
+PACING_MODES = ("hybrid", "sleep", "none")
+SPIN_THRESHOLD_NS = 2_000_000  # Hybrid mode busy-waits for the last 2 ms
+
+NS_PER_SECOND = 1_000_000_000
+
+
+class FrameTimer:
+    """Measure frame times with perf_counter_ns and pace frames to a target rate"""
+    def __init__(self, target_fps=60, pacing="hybrid", history=240, smoothing=0.1, max_dt=0.1):
+        if pacing not in PACING_MODES:
+            raise ValueError(f"unknown pacing mode: {pacing!r} (expected one of {PACING_MODES})")
+
+        self.pacing = pacing
+        self.smoothing = smoothing
+        self.max_dt = max_dt
+        self.frame_times = deque(maxlen=history)  # Raw frame times in seconds
+        self.set_target_fps(target_fps)
+        self.reset()
+
+    def set_target_fps(self, target_fps):
+        """Change the target rate; 0 or less means unlimited"""
+        self.target_fps = max(0, target_fps)
+        self.frame_ns = NS_PER_SECOND // self.target_fps if self.target_fps else 0
+
+    def reset(self):
+        """Restart timing from now"""
+        self.last_ns = time.perf_counter_ns()
+        self.deadline_ns = self.last_ns + self.frame_ns
+        self.dt = 1.0 / self.target_fps if self.target_fps else 1.0 / 60
+        self.smoothed_dt = self.dt
+        self.frame_times.clear()
+
+    def tick(self):
+        """Wait for the next frame deadline, then return the smoothed dt in seconds"""
+        self.wait()
+
+        now = time.perf_counter_ns()
+        raw_dt = (now - self.last_ns) / NS_PER_SECOND
+        self.last_ns = now
+        self.frame_times.append(raw_dt)
+
+        # Clamp long stalls so physics never takes a huge step
+        self.dt = min(raw_dt, self.max_dt)
+        self.smoothed_dt += (self.dt - self.smoothed_dt) * self.smoothing
+        return self.smoothed_dt
+
+    def wait(self):
+        """Block until the current frame deadline using the configured strategy"""
+        if not self.frame_ns or self.pacing == "none":
+            return
+
+        now = time.perf_counter_ns()
+        if now >= self.deadline_ns:
+            # Missed the deadline - resynchronize instead of trying to catch up
+            self.deadline_ns = now + self.frame_ns
+            return
+
+        if self.pacing == "sleep":
+            time.sleep((self.deadline_ns - now) / NS_PER_SECOND)
+        else:
+            # Sleep most of the way, then spin for a precise wake-up
+            coarse_ns = self.deadline_ns - now - SPIN_THRESHOLD_NS
+            if coarse_ns > 0:
+                time.sleep(coarse_ns / NS_PER_SECOND)
+            while time.perf_counter_ns() < self.deadline_ns:
+                pass
+
+        self.deadline_ns += self.frame_ns
+
+    def get_fps(self):
+        """Average frames per second over the history window"""
+        total = sum(self.frame_times)
+        return len(self.frame_times) / total if total > 0 else 0.0
+
+    def stats(self):
+        """Frame-time statistics over the history window, in milliseconds"""
+        if not self.frame_times:
+            return {"fps": 0.0, "avg_ms": 0.0, "min_ms": 0.0, "max_ms": 0.0,
+                    "p99_ms": 0.0, "jitter_ms": 0.0, "frames": 0}
+
+        times = sorted(self.frame_times)
+        count = len(times)
+        avg = sum(times) / count
+        variance = sum((t - avg) ** 2 for t in times) / count
+        return {
+            "fps": 1.0 / avg if avg > 0 else 0.0,
+            "avg_ms": avg * 1000,
+            "min_ms": times[0] * 1000,
+            "max_ms": times[-1] * 1000,
+            "p99_ms": times[min(count - 1, int(count * 0.99))] * 1000,
+            "jitter_ms": math.sqrt(variance) * 1000,
+            "frames": count
+        }
+
+
+class RateCounter:
+    """Count named occurrences and report per-second rates over a fixed window"""
+    def __init__(self, window=1.0):
+        self.window = window
+        self.counts = {}
+        self.rates = {}
+        self.window_start = None  # Set by the first update, on whichever clock the caller uses
+
+    def add(self, name, count=1):
+        self.counts[name] = self.counts.get(name, 0) + count
+
+    def update(self, now=None):
+        """Close the window once it has elapsed; return True if the rates changed"""
+        if now is None:
+            now = time.perf_counter()
+        if self.window_start is None:
+            self.window_start = now
+            return False
+        elapsed = now - self.window_start
+        if elapsed < self.window:
+            return False
+
+        self.rates = {name: count / elapsed for name, count in self.counts.items()}
+        self.counts = dict.fromkeys(self.counts, 0)
+        self.window_start = now
+        return True
+
+    def rate(self, name):
+        """Rate per second of `name` over the last completed window"""
+        return self.rates.get(name, 0.0)
+
+
+class StageProfiler:
+    """Rolling per-stage timings for the last `history` frames
+
+    Stages are timed as laps: lap(name) charges the time since the previous
+    lap (or since begin_frame) to `name`. Callers only pass the profiler down
+    while it is enabled, so a disabled profiler is never touched per stage.
+    """
+    def __init__(self, stages, history=120):
+        self.stages = tuple(stages)
+        self.history = history
+        self.enabled = False
+        self.samples = {stage: deque(maxlen=history) for stage in self.stages}
+        self.frame_times = deque(maxlen=history)  # Begin-to-begin frame times in ns
+        self.current = {}
+        self.frame_start_ns = 0
+        self.last_ns = 0
+
+    def set_enabled(self, enabled):
+        """Turn timing on or off; history restarts when it is turned on"""
+        if enabled and not self.enabled:
+            self.reset()
+        self.enabled = enabled
+
+    def reset(self):
+        for samples in self.samples.values():
+            samples.clear()
+        self.frame_times.clear()
+        self.current = {}
+        self.frame_start_ns = 0
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        if self.frame_start_ns:
+            self.frame_times.append(now - self.frame_start_ns)
+        self.frame_start_ns = self.last_ns = now
+        self.current = {}
+
+    def lap(self, stage):
+        """Charge the time since the previous lap to `stage`"""
+        now = time.perf_counter_ns()
+        self.current[stage] = self.current.get(stage, 0) + now - self.last_ns
+        self.last_ns = now
+
+    def end_frame(self):
+        """Commit the laps of this frame; stages that did not run get no sample"""
+        for stage, elapsed in self.current.items():
+            self.samples[stage].append(elapsed)
+
+    def stats(self, stage):
+        """(current, average, worst) in milliseconds, or None if the stage has no samples"""
+        samples = self.samples[stage]
+        if not samples:
+            return None
+        return samples[-1] / 1e6, sum(samples) / len(samples) / 1e6, max(samples) / 1e6
+
+    def frame_stats(self):
+        """(current, average, worst) frame time in milliseconds, or None before two frames"""
+        if not self.frame_times:
+            return None
+        times = self.frame_times
+        return times[-1] / 1e6, sum(times) / len(times) / 1e6, max(times) / 1e6
+
+    def fps_history(self):
+        """Frames per second of each frame in the history, oldest first"""
+        return [NS_PER_SECOND / ns for ns in self.frame_times if ns > 0]
+
+
+class StartupTimer:
+    """Startup phases, each measured from the end of the previous one"""
+    def __init__(self, origin=None):
+        self.origin = time.perf_counter() if origin is None else origin
+        self.last = self.origin
+        self.phases = {}
+
+    def mark(self, phase):
+        """Charge the time since the previous mark to `phase`"""
+        now = time.perf_counter()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self.last
+        self.last = now
+
+    def total(self):
+        return self.last - self.origin
+
+    def report(self):
+        """Phase durations and total in milliseconds"""
+        return {
+            "phases_ms": {phase: seconds * 1000 for phase, seconds in self.phases.items()},
+            "total_ms": self.total() * 1000
+        }
+
+    def format(self):
+        parts = [f"{phase} {seconds * 1000:.1f}" for phase, seconds in self.phases.items()]
+        return f"Startup: {', '.join(parts)} ms (total {self.total() * 1000:.1f} ms)"
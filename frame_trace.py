@@ -0,0 +1,114 @@
+"""Chrome trace-event export of the simulation run loop
+
+Selected methods of an object are wrapped on the instance so that each call
+becomes a span. Spans are kept in a bounded ring buffer as complete ("X")
+events - a begin and end pair in one record, so dropping the oldest entries
+never leaves an unmatched begin or end behind. Only every Nth frame is
+recorded, and nothing is wrapped unless tracing was requested, so an
+untraced run pays nothing.
+
+Open the written file in chrome://tracing or https://ui.perfetto.dev.
+"""
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+class TraceRecorder:
+    """Record method spans into a ring buffer and write them as trace-event JSON"""
+    def __init__(self, path, capacity=200_000, every=1):
+        if capacity <= 0:
+            raise ValueError("trace buffer capacity must be positive")
+        if every <= 0:
+            raise ValueError("trace sampling interval must be positive")
+
+        self.path = path
+        self.capacity = capacity
+        self.every = every
+        self.spans = deque(maxlen=capacity)  # (name, start ns, duration ns, thread id)
+        self.thread_names = {}
+        self.frames_seen = 0
+        self.frames_traced = 0
+        self.active = False
+
+    def instrument(self, obj, methods, frame_method):
+        """Wrap `methods` of obj; each call of `frame_method` starts a new frame"""
+        for name in methods:
+            wrapped = self.wrap(getattr(obj, name), name)
+            setattr(obj, name, wrapped)
+        setattr(obj, frame_method, self.wrap_frame(getattr(obj, frame_method), frame_method))
+
+    def wrap(self, func, name):
+        """Wrap a callable so its calls are recorded while a sampled frame is active"""
+        spans = self.spans
+        clock = time.perf_counter_ns
+
+        @functools.wraps(func)
+        def traced(*args, **kwargs):
+            if not self.active:
+                return func(*args, **kwargs)
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                spans.append((name, start, clock() - start, self.thread_id()))
+        return traced
+
+    def wrap_frame(self, func, name):
+        """Wrap the per-frame entry point; it decides whether the frame is sampled"""
+        traced = self.wrap(func, name)
+
+        @functools.wraps(func)
+        def frame(*args, **kwargs):
+            self.active = self.frames_seen % self.every == 0
+            self.frames_seen += 1
+            if self.active:
+                self.frames_traced += 1
+            return traced(*args, **kwargs)
+        return frame
+
+    def thread_id(self):
+        ident = threading.get_ident()
+        if ident not in self.thread_names:
+            self.thread_names[ident] = threading.current_thread().name
+        return ident
+
+    def events(self):
+        """Buffered spans as trace-event dictionaries, timestamps in microseconds"""
+        spans = list(self.spans)
+        pid = os.getpid()
+        origin = min((span[1] for span in spans), default=0)
+        events = [{"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+                  for tid, name in self.thread_names.items()]
+        for name, start, duration, tid in spans:
+            events.append({
+                "name": name,
+                "cat": "simulation",
+                "ph": "X",
+                "ts": (start - origin) / 1000,
+                "dur": duration / 1000,
+                "pid": pid,
+                "tid": tid
+            })
+        return events
+
+    def write(self, path=None):
+        """Flush the buffer to a Chrome trace-event JSON file"""
+        path = path or self.path
+        trace = {
+            "traceEvents": self.events(),
+            "displayTimeUnit": "ms",
+            "otherData": {
+                "frames_seen": self.frames_seen,
+                "frames_traced": self.frames_traced,
+                "sample_every": self.every,
+                "buffer_capacity": self.capacity,
+                "spans_buffered": len(self.spans)
+            }
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f)
+        return len(self.spans)
@@ -0,0 +1,128 @@
+"""Garbage-collector control and per-frame allocation statistics
+
+In "deferred" mode the long-lived objects built during startup are moved to
+the permanent generation with gc.freeze(), automatic collection is turned
+off, and collect_if_due() runs the collection CPython would have run at a
+point the caller chooses - after the display flip, before the frame pacing
+wait - so collections no longer land in the middle of drawing a frame.
+"""
+import gc
+import time
+import tracemalloc
+from collections import deque
+
+GC_MODES = ("auto", "deferred")
+
+
+def enable_deferred_gc():
+    """Freeze everything allocated so far and stop automatic collection"""
+    gc.collect()
+    gc.freeze()
+    gc.disable()
+
+
+def restore_gc():
+    """Return to automatic collection"""
+    gc.unfreeze()
+    gc.enable()
+
+
+def collect_if_due():
+    """Collect the oldest generation whose count exceeds its threshold; return it, or -1"""
+    counts = gc.get_count()
+    thresholds = gc.get_threshold()
+    if counts[0] <= thresholds[0]:
+        return -1
+    # Same rule as CPython's automatic collection: oldest generation with count > threshold
+    generation = 0
+    for older in (2, 1):
+        if counts[older] > thresholds[older]:
+            generation = older
+            break
+    gc.collect(generation)
+    return generation
+
+
+class AllocationCounter:
+    """Per-frame growth of GC-tracked objects, collections and collector time
+
+    gc.get_count()[0] rises with every container object allocated and falls
+    when one is freed, so it measures the net allocations that trigger gen0
+    collections. A gc callback folds in the count reached just before each
+    collection and times the collection. With trace_bytes, tracemalloc also
+    reports the peak bytes allocated above the frame's starting point.
+    """
+    def __init__(self, history=120, trace_bytes=False):
+        self.history = history
+        self.trace_bytes = trace_bytes
+        self.objects = deque(maxlen=history)
+        self.gc_times = deque(maxlen=history)  # ns spent collecting per frame
+        self.collections = deque(maxlen=history)  # (gen0, gen1, gen2) per frame
+        self.peak_bytes = deque(maxlen=history)
+        self.running = False
+        self.started_tracemalloc = False
+        self.reset_frame()
+
+    def reset_frame(self):
+        self.base_count = gc.get_count()[0]
+        self.frame_objects = 0
+        self.frame_gc_ns = 0
+        self.frame_collections = [0, 0, 0]
+        self.gc_start_ns = 0
+        self.base_bytes = 0
+
+    def start(self):
+        if self.running:
+            return
+        gc.callbacks.append(self.on_gc)
+        if self.trace_bytes and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracemalloc = True
+        self.running = True
+
+    def stop(self):
+        if not self.running:
+            return
+        gc.callbacks.remove(self.on_gc)
+        if self.started_tracemalloc:
+            tracemalloc.stop()
+            self.started_tracemalloc = False
+        self.running = False
+
+    def on_gc(self, phase, info):
+        if phase == "start":
+            self.frame_objects += gc.get_count()[0] - self.base_count
+            self.gc_start_ns = time.perf_counter_ns()
+        else:
+            self.frame_gc_ns += time.perf_counter_ns() - self.gc_start_ns
+            self.frame_collections[info["generation"]] += 1
+            self.base_count = gc.get_count()[0]
+
+    def begin_frame(self):
+        self.reset_frame()
+        if self.trace_bytes and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+            self.base_bytes = tracemalloc.get_traced_memory()[0]
+
+    def end_frame(self):
+        self.objects.append(self.frame_objects + gc.get_count()[0] - self.base_count)
+        self.gc_times.append(self.frame_gc_ns)
+        self.collections.append(tuple(self.frame_collections))
+        if self.trace_bytes and tracemalloc.is_tracing():
+            self.peak_bytes.append(tracemalloc.get_traced_memory()[1] - self.base_bytes)
+
+    @staticmethod
+    def summarize(values, scale=1.0):
+        """(current, average, worst) of a history, or None if it is empty"""
+        if not values:
+            return None
+        return values[-1] * scale, sum(values) / len(values) * scale, max(values) * scale
+
+    def stats(self):
+        """Per-frame objects, gc milliseconds, collections per generation and peak KB"""
+        return {
+            "objects": self.summarize(self.objects),
+            "gc_ms": self.summarize(self.gc_times, 1e-6),
+            "collections": tuple(sum(frame[i] for frame in self.collections) for i in range(3)),
+            "peak_kb": self.summarize(self.peak_bytes, 1 / 1024)
+        }
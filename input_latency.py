@@ -0,0 +1,65 @@
+"""Input-to-photon latency tracking per interaction kind
+
+An input is stamped when its event is dequeued and resolved at the first
+display flip that can show its effect. With threaded physics the effect of
+a ball drag only appears once a snapshot taken after the input has been
+rendered, so inputs may carry the snapshot step they have to wait for.
+"""
+import json
+import time
+from collections import deque
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted sequence"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class LatencyTracker:
+    """Collect input-to-flip latencies and report p50/p95/p99 per interaction kind"""
+    def __init__(self, kinds, history=2000):
+        self.samples = {kind: deque(maxlen=history) for kind in kinds}
+        self.pending = {}  # kind -> (earliest unpresented input time, required snapshot step)
+
+    def input(self, kind, timestamp=None, after_step=None):
+        """Record an input; only the earliest one waiting for a flip is kept"""
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        if kind not in self.pending:
+            self.pending[kind] = (timestamp, after_step)
+
+    def presented(self, timestamp=None, step=None):
+        """Resolve inputs shown by the flip that just happened"""
+        if not self.pending:
+            return
+        if timestamp is None:
+            timestamp = time.perf_counter()
+        for kind, (input_time, after_step) in list(self.pending.items()):
+            if after_step is not None and (step is None or step < after_step):
+                continue
+            self.samples[kind].append(timestamp - input_time)
+            del self.pending[kind]
+
+    def stats(self, kind):
+        """Latency percentiles for one kind, in milliseconds"""
+        values = sorted(self.samples[kind])
+        return {
+            "count": len(values),
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "max_ms": values[-1] * 1000 if values else 0.0
+        }
+
+    def summary(self):
+        return {kind: self.stats(kind) for kind in self.samples}
+
+    def write_summary(self, path, extra=None):
+        """Write the percentiles (plus any run metadata) as JSON"""
+        report = dict(extra or {})
+        report["latency"] = self.summary()
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
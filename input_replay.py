@@ -0,0 +1,216 @@
+"""Record and replay the input event stream of the dual-view simulation
+
+A recording stores every event handle_events consumes (mouse buttons and
+motion, keys, resizes, quit) tagged with its frame index, plus the RNG seed,
+the fixed timestep, whether --fixed-resolution was on and a copy of the
+state file F9 would load when recording started (the --load-state file, if
+the session started from it). Replaying feeds the same events back on the
+same frames under the SDL dummy driver, so a session can be rerun against
+any build and its frame-time profile and final ball state compared. F5 and
+F9 in a replay only touch a private copy, never the user's state file.
+
+Usage:
+    python bernoulli_dual_view_refactored.py --record session.rec --seed 42
+    python input_replay.py session.rec --json result.json
+"""
+import argparse
+import json
+import os
+import struct
+import sys
+import tempfile
+import time
+
+import pygame
+
+RECORDING_MAGIC = b"BRNREC"
+RECORDING_VERSION = 3
+HEADER_FORMAT = "<6sHqHBI"  # magic, version, seed, fps, flags, initial state size
+EVENT_FORMAT = "<IBiii"  # frame, kind, three integer arguments
+
+# Event kinds stored in a recording
+KIND_MOUSE_DOWN = 1
+KIND_MOUSE_UP = 2
+KIND_MOUSE_MOTION = 3
+KIND_KEY_DOWN = 4
+KIND_RESIZE = 5
+KIND_QUIT = 6
+
+# Header flags
+FLAG_FIXED_RESOLUTION = 1
+FLAG_STARTS_FROM_STATE = 2  # The simulation loaded the embedded state at startup
+
+
+def encode_event(event):
+    """Event -> (kind, a, b, c), or None for event types that are not recorded"""
+    if event.type == pygame.MOUSEBUTTONDOWN:
+        return KIND_MOUSE_DOWN, event.pos[0], event.pos[1], event.button
+    if event.type == pygame.MOUSEBUTTONUP:
+        return KIND_MOUSE_UP, event.pos[0], event.pos[1], event.button
+    if event.type == pygame.MOUSEMOTION:
+        buttons = sum(1 << i for i, pressed in enumerate(event.buttons) if pressed)
+        return KIND_MOUSE_MOTION, event.pos[0], event.pos[1], buttons
+    if event.type == pygame.KEYDOWN:
+        return KIND_KEY_DOWN, event.key, event.mod, 0
+    if event.type == pygame.VIDEORESIZE:
+        return KIND_RESIZE, event.w, event.h, 0
+    if event.type == pygame.QUIT:
+        return KIND_QUIT, 0, 0, 0
+    return None
+
+
+def decode_event(kind, a, b, c):
+    """(kind, a, b, c) -> pygame event"""
+    if kind == KIND_MOUSE_DOWN:
+        return pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(a, b), button=c)
+    if kind == KIND_MOUSE_UP:
+        return pygame.event.Event(pygame.MOUSEBUTTONUP, pos=(a, b), button=c)
+    if kind == KIND_MOUSE_MOTION:
+        buttons = tuple(bool(c & (1 << i)) for i in range(3))
+        return pygame.event.Event(pygame.MOUSEMOTION, pos=(a, b), rel=(0, 0), buttons=buttons)
+    if kind == KIND_KEY_DOWN:
+        return pygame.event.Event(pygame.KEYDOWN, key=a, mod=b)
+    if kind == KIND_RESIZE:
+        return pygame.event.Event(pygame.VIDEORESIZE, w=a, h=b, size=(a, b))
+    if kind == KIND_QUIT:
+        return pygame.event.Event(pygame.QUIT)
+    raise ValueError(f"unknown event kind in recording: {kind}")
+
+
+class InputRecorder:
+    """Collect events per frame and write them as fixed-size binary records"""
+    def __init__(self, path, seed, fps, fixed_resolution=False, state_path=None, starts_from_state=False):
+        self.path = path
+        self.seed = seed
+        self.fps = fps
+        self.fixed_resolution = fixed_resolution
+        self.starts_from_state = starts_from_state
+        # Copied now - F5 may overwrite the file during the session, and F9 must load the same bytes on replay
+        self.initial_state = b""
+        if state_path is not None and (starts_from_state or os.path.exists(state_path)):
+            with open(state_path, "rb") as f:
+                self.initial_state = f.read()
+        self.records = bytearray()
+        self.count = 0
+
+    def record(self, frame, events):
+        for event in events:
+            encoded = encode_event(event)
+            if encoded is not None:
+                self.records += struct.pack(EVENT_FORMAT, frame, *encoded)
+                self.count += 1
+
+    def close(self):
+        with open(self.path, "wb") as f:
+            flags = ((FLAG_FIXED_RESOLUTION if self.fixed_resolution else 0)
+                     | (FLAG_STARTS_FROM_STATE if self.starts_from_state else 0))
+            f.write(struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, self.seed, self.fps,
+                                flags, len(self.initial_state)))
+            f.write(self.initial_state)
+            f.write(self.records)
+
+
+class InputReplay:
+    """Serve recorded events back frame by frame"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+
+        header_size = struct.calcsize(HEADER_FORMAT)
+        if len(data) < header_size:
+            raise ValueError(f"{path} is not an input recording")
+        magic, version, self.seed, self.fps, flags, state_size = struct.unpack_from(HEADER_FORMAT, data)
+        if magic != RECORDING_MAGIC:
+            raise ValueError(f"{path} is not an input recording")
+        if version != RECORDING_VERSION:
+            raise ValueError(f"unsupported recording version {version} (expected {RECORDING_VERSION})")
+        self.fixed_resolution = bool(flags & FLAG_FIXED_RESOLUTION)
+        self.starts_from_state = bool(flags & FLAG_STARTS_FROM_STATE)
+        self.initial_state = data[header_size:header_size + state_size]
+        if len(self.initial_state) != state_size:
+            raise ValueError(f"{path} is truncated")
+
+        self.frames = {}  # frame -> [(kind, a, b, c), ...]
+        self.last_frame = -1
+        for frame, *encoded in struct.iter_unpack(EVENT_FORMAT, data[header_size + state_size:]):
+            self.frames.setdefault(frame, []).append(tuple(encoded))
+            self.last_frame = max(self.last_frame, frame)
+
+    def events_for(self, frame):
+        return [decode_event(*encoded) for encoded in self.frames.get(frame, ())]
+
+    def finished(self, frame):
+        return frame > self.last_frame
+
+
+def replay(simulation, recording):
+    """Run a recording to completion as fast as possible; return the frame profile and final state"""
+    from frame_timing import FrameTimer
+
+    frame_count = recording.last_frame + 1
+    timer = FrameTimer(0, pacing="none", history=max(1, frame_count))
+    dt = 1.0 / recording.fps
+
+    start = time.perf_counter()
+    timer.reset()
+    while not recording.finished(simulation.frame_index):
+        running = simulation.run_frame(dt)
+        timer.tick()
+        simulation.frame_index += 1
+        if not running:
+            break
+
+    return {
+        "frames": simulation.frame_index,
+        "elapsed": time.perf_counter() - start,
+        "frame_time": timer.stats(),
+        "ball_pos": list(simulation.ball_pos),
+        "ball_velocity": list(simulation.ball_velocity),
+        "sliders": {key: slider.value for key, slider in simulation.sliders.items()}
+    }
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Replay a recorded input session headlessly")
+    parser.add_argument("recording", help="file written with --record")
+    parser.add_argument("--json", metavar="PATH", default=None,
+                        help="write the frame-time profile and final state to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Render offscreen - must be set before pygame initializes the display
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    import random
+    from bernoulli_dual_view_refactored import BernoulliSimulation
+
+    recording = InputReplay(args.recording)
+    with tempfile.TemporaryDirectory() as directory:
+        # F5/F9 in the replay use this private copy, never the user's state file
+        state_path = os.path.join(directory, "state.bin")
+        if recording.initial_state:
+            with open(state_path, "wb") as f:
+                f.write(recording.initial_state)
+
+        random.seed(recording.seed)
+        simulation = BernoulliSimulation(target_fps=recording.fps, pacing="none", replay=recording,
+                                         fixed_resolution=recording.fixed_resolution,
+                                         state_path=state_path if recording.starts_from_state else None)
+        simulation.state_path = state_path
+        result = replay(simulation, recording)
+    print(f"Replayed {result['frames']} frames in {result['elapsed']:.2f}s "
+          f"(avg {result['frame_time']['avg_ms']:.2f} ms, p99 {result['frame_time']['p99_ms']:.2f} ms)")
+    print("Final ball position: ({:.3f}, {:.3f}, {:.3f})".format(*result["ball_pos"]))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Compact binary save and restore of the complete simulation state
+
+A state file holds the ball position and velocity, the six slider parameters,
+the random generator state and every particle. Particles are stored column by
+column as raw array bytes (x, y, z, vx, vy, vz, size as doubles, life as
+int32, colour as an index into PARTICLE_COLORS), so loading maps the file and
+reads the columns through memoryviews instead of parsing records one by one.
+
+Layout (little-endian):
+    header      magic, version, particle count
+    state       ball_pos[3], ball_velocity[3], the parameters in PARAMETERS
+    rng         random.getstate(): version, 625 words, gauss_next
+    padding     up to an 8-byte boundary
+    columns     one array per entry of PARTICLE_COLUMNS, in that order
+
+Display-free like bernoulli_core, so scenarios can be prepared headlessly.
+"""
+import mmap
+import os
+import random
+import struct
+import sys
+from array import array
+
+from bernoulli_core import PARTICLE_COLORS
+
+STATE_MAGIC = b"BRNSTA"
+STATE_VERSION = 1
+HEADER_FORMAT = "<6sHI"  # magic, version, particle count
+STATE_FORMAT = "<12d"  # ball_pos, ball_velocity, parameters
+RNG_FORMAT = "<B625I?d"  # generator version, state words, has gauss_next, gauss_next
+
+# Simulation attributes set by the sliders, in file order
+PARAMETERS = ("wind_speed", "wind_angle", "wind_vertical", "ball_radius", "vertical_thrust",
+              "side_force_coefficient")
+
+# Particle attribute -> array typecode, in file order
+PARTICLE_COLUMNS = (("x", "d"), ("y", "d"), ("z", "d"), ("vx", "d"), ("vy", "d"), ("vz", "d"),
+                    ("size", "d"), ("life", "i"), ("color", "B"))
+
+# Arrays are written in the machine's byte order; swap them where that is big-endian
+SWAP_BYTES = sys.byteorder != "little"
+
+
+def align(offset, boundary=8):
+    return (offset + boundary - 1) // boundary * boundary
+
+
+def columns_offset():
+    """File offset of the first particle column"""
+    return align(struct.calcsize(HEADER_FORMAT) + struct.calcsize(STATE_FORMAT)
+                 + struct.calcsize(RNG_FORMAT))
+
+
+def pack_rng_state(state):
+    version, words, gauss_next = state
+    return struct.pack(RNG_FORMAT, version, *words, gauss_next is not None,
+                       gauss_next if gauss_next is not None else 0.0)
+
+
+def unpack_rng_state(data, offset):
+    version, *words, has_gauss, gauss_next = struct.unpack_from(RNG_FORMAT, data, offset)
+    return version, tuple(words), gauss_next if has_gauss else None
+
+
+def save_state(simulation, path):
+    """Write the simulation state to path; return the number of particles saved"""
+    particles = simulation.particles
+    color_index = {color: index for index, color in enumerate(PARTICLE_COLORS)}
+
+    columns = []
+    for name, typecode in PARTICLE_COLUMNS:
+        if name == "color":
+            column = array(typecode, [color_index[p.color] for p in particles])
+        else:
+            column = array(typecode, [getattr(p, name) for p in particles])
+        if SWAP_BYTES:
+            column.byteswap()
+        columns.append(column)
+
+    parameters = [getattr(simulation, name) for name in PARAMETERS]
+    with open(path, "wb") as f:
+        f.write(struct.pack(HEADER_FORMAT, STATE_MAGIC, STATE_VERSION, len(particles)))
+        f.write(struct.pack(STATE_FORMAT, *simulation.ball_pos, *simulation.ball_velocity, *parameters))
+        f.write(pack_rng_state(random.getstate()))
+        f.write(bytes(columns_offset() - f.tell()))
+        for column in columns:
+            f.write(column)
+    return len(particles)
+
+
+class StateFile:
+    """A state file mapped into memory; particle columns are views, not copies"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            # Also rules out empty files, which cannot be mapped
+            if os.fstat(f.fileno()).st_size < struct.calcsize(HEADER_FORMAT):
+                raise ValueError(f"{path} is not a simulation state file")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self.particle_count = struct.unpack_from(HEADER_FORMAT, self.map)
+            if magic != STATE_MAGIC:
+                raise ValueError(f"{path} is not a simulation state file")
+            if version != STATE_VERSION:
+                raise ValueError(f"unsupported state version {version} (expected {STATE_VERSION})")
+            if len(self.map) < columns_offset():
+                raise ValueError(f"{path} is truncated")
+
+            offset = struct.calcsize(HEADER_FORMAT)
+            values = struct.unpack_from(STATE_FORMAT, self.map, offset)
+            self.ball_pos = list(values[0:3])
+            self.ball_velocity = list(values[3:6])
+            self.parameters = dict(zip(PARAMETERS, values[6:]))
+            self.rng_state = unpack_rng_state(self.map, offset + struct.calcsize(STATE_FORMAT))
+
+            self.columns = {}
+            offset = columns_offset()
+            # Released on the way out, or a failed load could not close the map
+            with memoryview(self.map) as view:
+                for name, typecode in PARTICLE_COLUMNS:
+                    size = array(typecode).itemsize * self.particle_count
+                    if offset + size > len(self.map):
+                        raise ValueError(f"{path} is truncated")
+                    if SWAP_BYTES:
+                        column = array(typecode, view[offset:offset + size])
+                        column.byteswap()
+                    else:
+                        column = view[offset:offset + size].cast(typecode)
+                    self.columns[name] = column
+                    offset += size
+        except Exception:
+            self.close()
+            raise
+
+    def particles(self, particle_class):
+        """Build particle_class instances from the columns without running __init__"""
+        new = particle_class.__new__
+        colors = PARTICLE_COLORS
+        particles = []
+        append = particles.append
+        for x, y, z, vx, vy, vz, size, life, color in zip(*(self.columns[name] for name, _ in PARTICLE_COLUMNS)):
+            particle = new(particle_class)
+            particle.x = x
+            particle.y = y
+            particle.z = z
+            particle.vx = vx
+            particle.vy = vy
+            particle.vz = vz
+            particle.size = size
+            particle.life = life
+            particle.color = colors[color]
+            append(particle)
+        return particles
+
+    def restore(self, simulation):
+        """Apply the stored state, including the random generator, to a simulation"""
+        simulation.ball_pos = list(self.ball_pos)
+        simulation.ball_velocity = list(self.ball_velocity)
+        for name, value in self.parameters.items():
+            setattr(simulation, name, value)
+        simulation.particles = self.particles(simulation.PARTICLE_CLASS)
+        random.setstate(self.rng_state)
+
+    def close(self):
+        # Views into the map must be released before it can be closed
+        for column in getattr(self, "columns", {}).values():
+            if isinstance(column, memoryview):
+                column.release()
+        self.columns = {}
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def load_state(simulation, path):
+    """Restore the state saved in path into simulation; return the number of particles"""
+    with StateFile(path) as state:
+        state.restore(simulation)
+        return state.particle_count
@@ -0,0 +1,171 @@
+"""Per-tick telemetry in a memory-mapped ring buffer
+
+Every physics tick appends one record - simulation time, ball position and
+velocity, forces and pressures - to a preallocated file mapped into memory.
+The writer packs each record straight into the mapping and then bumps the
+record counter in the header, so another process can map the same file and
+read the live time series without copies, sockets or parsing:
+
+    reader = TelemetryReader("telemetry.bin")
+    for record in reader.latest(600):
+        print(record["time"], record["y"], record["lift_force"])
+
+or, with NumPy, numpy.frombuffer(reader.map, offset=DATA_OFFSET).reshape(-1, len(reader.fields)).
+
+Layout (little-endian):
+    header      magic, version, field count, capacity, records written
+    names       comma-separated field names, NUL padded to NAMES_SIZE
+    records     capacity slots of one double per field; slot = index % capacity
+
+Usage:
+    python bernoulli_dual_view_refactored.py --telemetry telemetry.bin
+    python telemetry.py telemetry.bin --tail 20
+    python telemetry.py telemetry.bin --csv telemetry.csv
+"""
+import argparse
+import csv
+import mmap
+import os
+import struct
+import sys
+from operator import itemgetter
+
+TELEMETRY_MAGIC = b"BRNTEL"
+TELEMETRY_VERSION = 1
+HEADER_FORMAT = "<6sHIIQ"  # magic, version, field count, capacity, records written
+WRITTEN_OFFSET = 16  # Offset of the records-written counter in the header
+NAMES_SIZE = 256
+DATA_OFFSET = struct.calcsize(HEADER_FORMAT) + NAMES_SIZE
+TELEMETRY_CAPACITY = 36000  # Five minutes at the 120 Hz physics rate
+
+# Recorded per tick, in record order; forces and pressures come from physics_data
+TELEMETRY_FIELDS = ("time", "x", "y", "z", "vx", "vy", "vz",
+                    "lift_force", "side_force", "front_force", "weight", "net_force",
+                    "top_pressure", "bottom_pressure", "pressure_diff")
+PHYSICS_FIELDS = TELEMETRY_FIELDS[7:]
+
+
+def record_format(field_count):
+    return f"<{field_count}d"
+
+
+class TelemetryRecorder:
+    """Append one record per physics tick to a memory-mapped ring buffer file"""
+    def __init__(self, path, capacity=TELEMETRY_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("telemetry capacity must be positive")
+
+        self.path = path
+        self.capacity = capacity
+        self.record = struct.Struct(record_format(len(TELEMETRY_FIELDS)))
+        self.physics_values = itemgetter(*PHYSICS_FIELDS)
+        self.written = 0
+        self.time = 0.0
+
+        names = ",".join(TELEMETRY_FIELDS).encode("ascii")
+        with open(path, "w+b") as f:
+            f.truncate(DATA_OFFSET + capacity * self.record.size)
+            self.map = mmap.mmap(f.fileno(), 0)
+        struct.pack_into(HEADER_FORMAT, self.map, 0, TELEMETRY_MAGIC, TELEMETRY_VERSION,
+                         len(TELEMETRY_FIELDS), capacity, 0)
+        self.map[struct.calcsize(HEADER_FORMAT):struct.calcsize(HEADER_FORMAT) + len(names)] = names
+
+    def record_tick(self, simulation, dt):
+        """Append the simulation's state after a tick of dt seconds"""
+        self.time += dt
+        offset = DATA_OFFSET + (self.written % self.capacity) * self.record.size
+        self.record.pack_into(self.map, offset, self.time, *simulation.ball_pos, *simulation.ball_velocity,
+                              *self.physics_values(simulation.physics_data))
+
+        # Published after the record, so a reader never sees a half-written newest entry
+        self.written += 1
+        struct.pack_into("<Q", self.map, WRITTEN_OFFSET, self.written)
+
+    def close(self):
+        self.map.flush()
+        self.map.close()
+
+
+class TelemetryReader:
+    """Read a telemetry file, live or after the run, through a read-only mapping"""
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < DATA_OFFSET:
+                raise ValueError(f"{path} is not a telemetry file")
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, field_count, self.capacity, _ = struct.unpack_from(HEADER_FORMAT, self.map)
+        if magic != TELEMETRY_MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a telemetry file")
+        if version != TELEMETRY_VERSION:
+            self.map.close()
+            raise ValueError(f"unsupported telemetry version {version} (expected {TELEMETRY_VERSION})")
+
+        names = self.map[struct.calcsize(HEADER_FORMAT):DATA_OFFSET].rstrip(b"\0").decode("ascii")
+        self.fields = tuple(names.split(","))
+        if len(self.fields) != field_count:
+            self.map.close()
+            raise ValueError(f"{path} has a corrupt field list")
+        self.record = struct.Struct(record_format(field_count))
+
+    @property
+    def written(self):
+        """Records written so far; the writer may still be adding more"""
+        return struct.unpack_from("<Q", self.map, WRITTEN_OFFSET)[0]
+
+    def latest(self, count=None):
+        """The newest `count` records (all kept records if None), oldest first, as dictionaries"""
+        written = self.written
+        available = min(written, self.capacity)
+        count = available if count is None else min(count, available)
+
+        records = []
+        for index in range(written - count, written):
+            offset = DATA_OFFSET + (index % self.capacity) * self.record.size
+            records.append(self.record.unpack_from(self.map, offset))
+
+        # Drop records the writer overwrote while they were being copied, and the slot it may be
+        # packing right now - record `written` goes over the oldest one before the counter moves
+        overwritten = self.written + 1 - self.capacity - (written - count)
+        if overwritten > 0:
+            records = records[overwritten:]
+        return [dict(zip(self.fields, record)) for record in records]
+
+    def close(self):
+        self.map.close()
+
+
+def parse_args(argv=None):
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Read a telemetry file written with --telemetry")
+    parser.add_argument("telemetry", help="file written with --telemetry")
+    parser.add_argument("--tail", type=int, default=10,
+                        help="print the newest N records (default: 10)")
+    parser.add_argument("--csv", metavar="PATH", default=None,
+                        help="export every kept record to PATH instead")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    reader = TelemetryReader(args.telemetry)
+    try:
+        if args.csv:
+            records = reader.latest()
+            with open(args.csv, "w", newline="", encoding="utf-8") as f:
+                writer = csv.DictWriter(f, fieldnames=reader.fields)
+                writer.writeheader()
+                writer.writerows(records)
+            print(f"Exported {len(records)} of {reader.written} records to {args.csv}")
+        else:
+            print(" ".join(f"{name:>15}" for name in reader.fields))
+            for record in reader.latest(args.tail):
+                print(" ".join(f"{value:15.4f}" for value in record.values()))
+    finally:
+        reader.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
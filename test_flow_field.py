@@ -0,0 +1,64 @@
+import os
+
+import pygame
+import pytest
+
+from flow_field import FieldHeatmap
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def display():
+    # convert_alpha() needs a display surface
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    yield
+    pygame.display.quit()
+
+
+def test_wind_strength_does_not_rebuild_the_heatmap():
+    heatmap = FieldHeatmap()
+    surface = heatmap.get_surface("xy", "pressure", 30, 10.0, 0.0)
+    assert heatmap.get_surface("xy", "pressure", 30, 25.0, 0.0) is surface
+    assert len(heatmap.grids) == 1
+
+
+def test_direction_within_a_bucket_reuses_the_surface():
+    heatmap = FieldHeatmap()
+    surface = heatmap.get_surface("xy", "pressure", 30, 10.0, 0.0)
+    assert heatmap.get_surface("xy", "pressure", 30, 10.0, 0.1) is surface
+    assert heatmap.get_surface("xy", "pressure", 30, 0.0, 10.0) is not surface
+    assert len(heatmap.grids) == 2
+
+
+def test_radius_change_rescales_the_cached_grid():
+    heatmap = FieldHeatmap(extent=4.0)
+    small = heatmap.get_surface("xy", "speed", 20, 10.0, 0.0)
+    large = heatmap.get_surface("xy", "speed", 40, 10.0, 0.0)
+    assert small.get_size() == (160, 160)
+    assert large.get_size() == (320, 320)
+    assert len(heatmap.grids) == 1
+
+
+def test_views_and_modes_are_cached_separately():
+    heatmap = FieldHeatmap()
+    xy = heatmap.get_surface("xy", "pressure", 30, 10.0, 0.0)
+    zx = heatmap.get_surface("zx", "speed", 30, 10.0, 0.0)
+    assert heatmap.get_surface("xy", "pressure", 30, 10.0, 0.0) is xy
+    assert heatmap.get_surface("zx", "speed", 30, 10.0, 0.0) is zx
+    assert heatmap.get_surface("zx", "pressure", 30, 10.0, 0.0) is not zx
+
+
+def test_no_surface_without_flow_or_radius():
+    heatmap = FieldHeatmap()
+    assert heatmap.get_surface("xy", "pressure", 30, 0.1, 0.1) is None
+    assert heatmap.get_surface("xy", "pressure", 0, 10.0, 0.0) is None
+    assert heatmap.get_surface("xy", "off", 30, 10.0, 0.0) is None
+
+
+def test_ball_interior_is_transparent_and_flow_is_not():
+    surface = FieldHeatmap().get_surface("xy", "pressure", 30, 10.0, 0.0)
+    center = surface.get_width() // 2
+    assert surface.get_at((center, center)).a == 0
+    assert surface.get_at((center, center - 40)).a > 0
@@ -0,0 +1,28 @@
+import pytest
+
+from frame_timing import RateCounter
+
+
+def test_rates_follow_the_callers_clock():
+    counter = RateCounter(window=1.0)
+    assert not counter.update(10.0)  # Starts the first window
+    counter.add("received", 30)
+    counter.add("handled")
+    assert not counter.update(10.5)
+    assert counter.rate("received") == 0.0
+
+    assert counter.update(11.0)
+    assert counter.rate("received") == 30.0
+    assert counter.rate("handled") == 1.0
+
+
+def test_rates_use_the_actual_window_length():
+    counter = RateCounter(window=1.0)
+    counter.update(0.0)
+    counter.add("received", 30)
+    assert counter.update(1.5)
+    assert counter.rate("received") == pytest.approx(20.0)
+
+    # Counts were reset with the window
+    assert counter.update(2.5)
+    assert counter.rate("received") == 0.0
@@ -0,0 +1,55 @@
+import gc
+
+import pytest
+
+import gc_control
+from gc_control import AllocationCounter, collect_if_due
+
+
+@pytest.fixture
+def fake_gc(monkeypatch):
+    """Drive collect_if_due with chosen counts; record the generations it collects"""
+    state = {"count": (0, 0, 0), "collected": []}
+    monkeypatch.setattr(gc_control.gc, "get_count", lambda: state["count"])
+    monkeypatch.setattr(gc_control.gc, "get_threshold", lambda: (700, 10, 10))
+    monkeypatch.setattr(gc_control.gc, "collect", lambda generation=2: state["collected"].append(generation))
+    return state
+
+
+@pytest.mark.parametrize("count, expected", [
+    ((0, 0, 0), -1),
+    ((700, 0, 0), -1),  # At the threshold is not over it
+    ((701, 0, 0), 0),
+    ((701, 10, 0), 0),
+    ((701, 11, 0), 1),
+    ((701, 11, 10), 1),
+    ((701, 11, 11), 2),
+    ((701, 0, 11), 2),  # The oldest generation over its threshold wins, as in CPython
+])
+def test_collect_if_due_matches_cpython_thresholds(fake_gc, count, expected):
+    fake_gc["count"] = count
+    assert collect_if_due() == expected
+    assert fake_gc["collected"] == ([] if expected == -1 else [expected])
+
+
+class Node:
+    pass
+
+
+def test_allocation_counter_counts_objects_and_collections():
+    counter = AllocationCounter(history=4)
+    counter.start()
+    try:
+        counter.begin_frame()
+        keep = [Node() for _ in range(50)]  # Not served from a free list, unlike small lists
+        gc.collect(0)
+        counter.end_frame()
+    finally:
+        counter.stop()
+    assert keep
+    assert counter.objects[-1] >= 50
+    assert counter.collections[-1][0] == 1
+    stats = counter.stats()
+    assert stats["collections"] == (1, 0, 0)
+    assert stats["gc_ms"][2] >= 0.0
+    assert stats["peak_kb"] is None
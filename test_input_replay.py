@@ -0,0 +1,100 @@
+import struct
+
+import pygame
+import pytest
+
+from input_replay import HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, InputRecorder, InputReplay
+
+
+def record(path, events_by_frame, **options):
+    recorder = InputRecorder(path, 42, 60, **options)
+    for frame, events in events_by_frame.items():
+        recorder.record(frame, events)
+    recorder.close()
+    return recorder
+
+
+def test_header_and_events_round_trip(tmp_path):
+    path = tmp_path / "session.rec"
+    recorder = record(path, {
+        0: [pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=(10, 20), button=1)],
+        3: [pygame.event.Event(pygame.MOUSEMOTION, pos=(11, 19), rel=(1, -1), buttons=(1, 0, 0)),
+            pygame.event.Event(pygame.ACTIVEEVENT, gain=1, state=1)],  # not recorded
+        7: [pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F5, mod=0)]
+    })
+    assert recorder.count == 3
+
+    replay = InputReplay(path)
+    assert (replay.seed, replay.fps) == (42, 60)
+    assert not replay.fixed_resolution
+    assert not replay.starts_from_state
+    assert replay.initial_state == b""
+    assert replay.last_frame == 7
+    assert replay.events_for(1) == []
+
+    motion, = replay.events_for(3)
+    assert motion.type == pygame.MOUSEMOTION
+    assert motion.pos == (11, 19)
+    assert motion.buttons == (True, False, False)
+    key, = replay.events_for(7)
+    assert key.key == pygame.K_F5
+    assert not replay.finished(7)
+    assert replay.finished(8)
+
+
+def test_flags_and_starting_state_are_stored(tmp_path):
+    state = tmp_path / "state.bin"
+    state.write_bytes(b"saved state bytes")
+    path = tmp_path / "session.rec"
+    record(path, {}, fixed_resolution=True, state_path=state, starts_from_state=True)
+    state.write_bytes(b"overwritten by F5")
+
+    replay = InputReplay(path)
+    assert replay.fixed_resolution
+    assert replay.starts_from_state
+    assert replay.initial_state == b"saved state bytes"
+
+
+def test_f9_state_is_stored_without_loading_it_at_start(tmp_path):
+    state = tmp_path / "state.bin"
+    state.write_bytes(b"on disk before the session")
+    path = tmp_path / "session.rec"
+    record(path, {}, state_path=state)
+
+    replay = InputReplay(path)
+    assert not replay.starts_from_state
+    assert replay.initial_state == b"on disk before the session"
+
+
+def test_missing_f9_state_is_not_an_error(tmp_path):
+    path = tmp_path / "session.rec"
+    record(path, {}, state_path=tmp_path / "missing.bin")
+    assert InputReplay(path).initial_state == b""
+
+
+def test_other_versions_are_rejected(tmp_path):
+    path = tmp_path / "old.rec"
+    path.write_bytes(struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION - 1, 42, 60, 0, 0))
+    with pytest.raises(ValueError, match="unsupported recording version"):
+        InputReplay(path)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / "other.rec"
+    path.write_bytes(struct.pack(HEADER_FORMAT, b"NOTREC", RECORDING_VERSION, 42, 60, 0, 0))
+    with pytest.raises(ValueError, match="not an input recording"):
+        InputReplay(path)
+
+
+def test_truncated_state_is_rejected(tmp_path):
+    path = tmp_path / "short.rec"
+    path.write_bytes(struct.pack(HEADER_FORMAT, RECORDING_MAGIC, RECORDING_VERSION, 42, 60, 0, 100) + b"abc")
+    with pytest.raises(ValueError, match="truncated"):
+        InputReplay(path)
+
+
+def test_file_shorter_than_header_is_rejected(tmp_path):
+    path = tmp_path / "short.rec"
+    path.write_bytes(RECORDING_MAGIC)
+    with pytest.raises(ValueError, match="not an input recording"):
+        InputReplay(path)
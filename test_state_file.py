@@ -0,0 +1,74 @@
+import random
+import struct
+
+import pytest
+
+from bernoulli_core import SimulationCore
+from state_file import HEADER_FORMAT, STATE_MAGIC, STATE_VERSION, StateFile, load_state, save_state
+
+
+def make_core(particles=50):
+    core = SimulationCore()
+    core.init_physics_state([200, 400, 0])
+    core.particles = []
+    core.spawn_particles(particles)
+    return core
+
+
+def test_round_trip_restores_ball_parameters_particles_and_rng(tmp_path):
+    path = tmp_path / "state.bin"
+    random.seed(1)
+    core = make_core()
+    core.ball_velocity = [1.5, -2.0, 0.25]
+    core.wind_angle = 30
+    core.particles[3].life = 7
+    save_state(core, path)
+    expected_random = random.random()
+
+    restored = SimulationCore()
+    restored.init_physics_state([0, 0, 0])
+    random.seed(99)
+    assert load_state(restored, path) == len(core.particles)
+
+    assert restored.ball_pos == core.ball_pos
+    assert restored.ball_velocity == core.ball_velocity
+    assert restored.wind_angle == 30
+    assert [(p.x, p.y, p.z, p.vx, p.vy, p.vz, p.size, p.life, p.color) for p in restored.particles] == \
+        [(p.x, p.y, p.z, p.vx, p.vy, p.vz, p.size, p.life, p.color) for p in core.particles]
+    assert random.random() == expected_random
+
+
+def test_file_shorter_than_header_is_rejected(tmp_path):
+    path = tmp_path / "short.bin"
+    path.write_bytes(b"BRN")
+    with pytest.raises(ValueError, match="not a simulation state file"):
+        StateFile(path)
+
+
+def test_empty_file_is_rejected(tmp_path):
+    path = tmp_path / "empty.bin"
+    path.write_bytes(b"")
+    with pytest.raises(ValueError):
+        StateFile(path)
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(struct.pack(HEADER_FORMAT, b"NOTSTA", STATE_VERSION, 0) + bytes(8192))
+    with pytest.raises(ValueError, match="not a simulation state file"):
+        StateFile(path)
+
+
+def test_header_only_file_is_truncated(tmp_path):
+    path = tmp_path / "header.bin"
+    path.write_bytes(struct.pack(HEADER_FORMAT, STATE_MAGIC, STATE_VERSION, 0))
+    with pytest.raises(ValueError, match="truncated"):
+        StateFile(path)
+
+
+def test_missing_particle_columns_are_truncated(tmp_path):
+    path = tmp_path / "state.bin"
+    save_state(make_core(20), path)
+    path.write_bytes(path.read_bytes()[:-10])
+    with pytest.raises(ValueError, match="truncated"):
+        StateFile(path)
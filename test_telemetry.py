@@ -0,0 +1,107 @@
+import struct
+
+import pytest
+
+from bernoulli_core import SimulationCore
+from telemetry import DATA_OFFSET, TELEMETRY_FIELDS, TelemetryReader, TelemetryRecorder
+
+
+@pytest.fixture
+def core():
+    core = SimulationCore()
+    core.init_physics_state([200, 400, 0])
+    return core
+
+
+def write_ticks(recorder, core, count):
+    for _ in range(count):
+        core.ball_pos[0] += 1
+        recorder.record_tick(core, 1.0)
+
+
+def test_records_before_the_ring_is_full(tmp_path, core):
+    path = tmp_path / "telemetry.bin"
+    recorder = TelemetryRecorder(path, capacity=8)
+    write_ticks(recorder, core, 5)
+
+    reader = TelemetryReader(path)
+    records = reader.latest()
+    assert reader.fields == TELEMETRY_FIELDS
+    assert [r["time"] for r in records] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    assert records[-1]["x"] == 205
+    assert [r["time"] for r in reader.latest(2)] == [4.0, 5.0]
+    reader.close()
+    recorder.close()
+
+
+def test_wrap_around_keeps_the_newest_records_in_order(tmp_path, core):
+    path = tmp_path / "telemetry.bin"
+    recorder = TelemetryRecorder(path, capacity=8)
+    write_ticks(recorder, core, 21)
+
+    reader = TelemetryReader(path)
+    assert reader.written == 21
+    # The oldest slot is the one the next record goes into, so it is not returned
+    assert [r["time"] for r in reader.latest()] == [float(t) for t in range(15, 22)]
+    assert [r["time"] for r in reader.latest(3)] == [19.0, 20.0, 21.0]
+    reader.close()
+    recorder.close()
+
+
+def test_slot_being_packed_is_dropped(tmp_path, core):
+    path = tmp_path / "telemetry.bin"
+    recorder = TelemetryRecorder(path, capacity=8)
+    write_ticks(recorder, core, 8)
+
+    # Writer is halfway through packing record 8 into slot 0 and has not published it
+    half = len(TELEMETRY_FIELDS) // 2
+    struct.pack_into(f"<{half}d", recorder.map, DATA_OFFSET, *([999.0] * half))
+
+    reader = TelemetryReader(path)
+    times = [r["time"] for r in reader.latest()]
+    assert times == [float(t) for t in range(2, 9)]
+    reader.close()
+    recorder.close()
+
+
+def test_records_overwritten_during_the_copy_are_dropped(tmp_path, core):
+    path = tmp_path / "telemetry.bin"
+    recorder = TelemetryRecorder(path, capacity=8)
+    write_ticks(recorder, core, 8)
+    reader = TelemetryReader(path)
+
+    # Three more records land while the reader is copying
+    unpack_from = reader.record.unpack_from
+    copied = []
+
+    class Record:
+        size = reader.record.size
+
+        @staticmethod
+        def unpack_from(buffer, offset):
+            copied.append(offset)
+            if len(copied) == 3:
+                write_ticks(recorder, core, 3)
+            return unpack_from(buffer, offset)
+
+    reader.record = Record
+    times = [r["time"] for r in reader.latest()]
+    assert times == sorted(times)
+    assert all(later == earlier + 1 for earlier, later in zip(times, times[1:]))
+    assert times[0] >= 5.0  # Slots of records 1-4 were rewritten, record 5's was being packed
+    reader.close()
+    recorder.close()
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"NOTTEL" + bytes(300))
+    with pytest.raises(ValueError, match="not a telemetry file"):
+        TelemetryReader(path)
+
+
+def test_file_shorter_than_the_header_is_rejected(tmp_path):
+    path = tmp_path / "short.bin"
+    path.write_bytes(b"BRNTEL")
+    with pytest.raises(ValueError, match="not a telemetry file"):
+        TelemetryReader(path)
@@ -0,0 +1,118 @@
+import pygame
+import pytest
+
+from ui_widgets import InfoReadout, StripChart
+
+
+def test_readout_accepts_values_once_per_interval():
+    readout = InfoReadout(refresh_hz=10)
+    assert readout.due(0.0)
+    readout.set_lines(["a"], 0.0)
+    assert not readout.due(0.05)
+    assert readout.due(0.1)
+    readout.set_lines(["b"], 0.1)
+    assert readout.lines == ["b"]
+    assert not readout.due(0.15)
+
+
+def test_readout_without_a_rate_refreshes_every_frame():
+    readout = InfoReadout(refresh_hz=0)
+    readout.set_lines(["a"], 5.0)
+    assert readout.due(5.0)
+
+
+def test_invalidate_forces_the_next_refresh():
+    readout = InfoReadout(refresh_hz=10)
+    readout.set_lines(["a"], 1.0)
+    assert not readout.due(1.0)
+    readout.invalidate()
+    assert readout.due(1.0)
+
+
+def test_only_changed_lines_are_re_rendered():
+    readout = InfoReadout(refresh_hz=0)
+    readout.set_lines(["x: 1", "y: 2", "z: 3"], 0.0)
+    for label in readout.line_labels:
+        label.dirty = False
+
+    readout.set_lines(["x: 1", "y: 5"], 0.1)
+    assert readout.lines == ["x: 1", "y: 5"]
+    assert [label.dirty for label in readout.line_labels] == [False, True]
+
+
+def test_lines_below_max_bottom_are_hidden():
+    readout = InfoReadout(pos=(0, 100), line_height=20, max_bottom=170)
+    readout.set_lines(["1", "2", "3", "4"], 0.0)
+    assert readout.visible_count() == 3
+    readout.set_layout(None, (0, 100), 20, None)
+    assert readout.visible_count() == 4
+
+
+def make_chart(width=50, height=30):
+    return StripChart([("lift", (255, 0, 0), "force"), ("height", (0, 0, 255), "height")],
+                      {"force": ("F", "N", -10, 10), "height": ("h", "m", 0, 5)},
+                      span_seconds=1.0, rect=(0, 0, width, height))
+
+
+def plot_bytes(surface):
+    # Column 0 is left out: once samples scroll off, a full redraw has no segment from the
+    # dropped sample, while the scrolled plot still shows where it entered the edge
+    width, height = surface.get_size()
+    return pygame.image.tobytes(surface.subsurface((1, 0, width - 1, height)), "RGB")
+
+
+def draw_fresh(chart):
+    target = pygame.Surface((chart.rect.width, chart.rect.height))
+    chart.draw(target)
+    return plot_bytes(target)
+
+
+def test_strip_chart_adds_one_sample_per_column_period():
+    chart = make_chart(width=50)  # 50 columns over 1 s - one per 20 ms
+    chart.add(0.01, (1, 1))
+    assert len(chart.samples) == 0
+    chart.add(0.01, (1, 1))
+    assert len(chart.samples) == 1
+    chart.add(0.1, (2, 2))
+    assert len(chart.samples) == 6
+    chart.add(10.0, (3, 3))  # A long stall fills at most one screen
+    assert len(chart.samples) == 50
+    assert chart.pending <= 56
+
+
+@pytest.mark.parametrize("dt", [0.02, 0.05, 0.13])
+def test_strip_chart_scrolling_matches_a_full_redraw(dt):
+    chart = make_chart()
+    reference = make_chart()
+    scrolled = pygame.Surface((50, 30))
+    for i in range(80):
+        # Steep swings on both axes, several new columns per frame for the larger steps
+        values = ((i * 7) % 19 - 9, (i * 3) % 11 * 0.45)
+        chart.add(dt, values)
+        reference.add(dt, values)
+        chart.draw(scrolled)
+        assert not chart.dirty
+
+        reference.dirty = True
+        assert plot_bytes(scrolled) == draw_fresh(reference), f"frame {i}"
+
+
+def test_strip_chart_widens_an_axis_for_out_of_range_values():
+    chart = make_chart()
+    chart.add(0.02, (1, 1))
+    chart.draw(pygame.Surface((50, 30)))
+    assert not chart.dirty
+
+    chart.add(0.02, (40, 1))
+    assert chart.dirty
+    assert chart.axes["force"][3] == 60
+    assert chart.axes["height"][2:] == [0, 5]
+
+
+def test_strip_chart_resize_keeps_the_newest_samples():
+    chart = make_chart(width=50)
+    chart.add(1.0, (1, 1))
+    chart.set_rect((0, 0, 20, 30))
+    assert chart.samples.maxlen == 20
+    assert len(chart.samples) == 20
+    assert chart.dirty
@@ -1,9 +1,6 @@
 import pygame
 import sys
 
-# Initialize Pygame
-pygame.init()
-
 # Constants
 WIDTH = 800
 HEIGHT = 600
@@ -110,6 +107,10 @@ class WindowControls:
                            (center_x + icon_size//2, center_y), 2)
 
 def main():
+    # Only the subsystems the demo uses
+    pygame.display.init()
+    pygame.font.init()
+    
     # Set up display
     screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE | pygame.NOFRAME)
     pygame.display.set_caption("視窗控制測試")
@@ -0,0 +1,465 @@
+"""Retained-mode UI widgets
+
+Each widget keeps its layout and a cached surface between frames and only
+re-renders when a dirty flag is set by a change to its value, text, hover
+state or geometry. Drawing a clean widget is a single blit.
+"""
+import time
+from collections import deque
+
+import pygame
+
+# Colors
+BLACK = (0, 0, 0)
+BLUE = (100, 149, 237)
+GRAY = (128, 128, 128)
+DARK_BLUE = (25, 25, 112)
+
+
+class Widget:
+    """Base widget with a screen rect, a cached surface and a dirty flag"""
+    def __init__(self, rect=None):
+        self.rect = pygame.Rect(rect) if rect is not None else pygame.Rect(0, 0, 0, 0)
+        self.surface = None
+        self.dirty = True
+
+    def mark_dirty(self):
+        self.dirty = True
+
+    def draw(self, target):
+        """Re-render if needed, then blit the cached surface"""
+        if self.dirty or self.surface is None:
+            self.surface = self.render()
+            self.dirty = False
+        if self.surface is not None:
+            target.blit(self.surface, self.rect)
+
+    def render(self):
+        """Return a new surface for the widget; called only when dirty"""
+        raise NotImplementedError
+
+
+class Label(Widget):
+    """Single line of text positioned by one of its rect anchors"""
+    def __init__(self, text="", font=None, color=BLACK, anchor="topleft", pos=(0, 0)):
+        super().__init__()
+        self.text = text
+        self.font = font
+        self.color = color
+        self.anchor = anchor
+        self.pos = pos
+
+    def set_text(self, text):
+        if text != self.text:
+            self.text = text
+            self.dirty = True
+
+    def set_font(self, font):
+        if font is not self.font:
+            self.font = font
+            self.dirty = True
+
+    def set_position(self, pos):
+        """Move the label; the rendered text is reused"""
+        self.pos = pos
+        if self.surface is not None:
+            self.rect = self.surface.get_rect(**{self.anchor: pos})
+
+    def render(self):
+        if self.font is None:
+            return None
+        surface = self.font.render(self.text, True, self.color)
+        self.rect = surface.get_rect(**{self.anchor: self.pos})
+        return surface
+
+
+class Slider(Widget):
+    """Horizontal slider with a value range, track and draggable handle"""
+    def __init__(self, value, min_value, max_value, text):
+        super().__init__()
+        self.value = value
+        self.min = min_value
+        self.max = max_value
+        self.text = text
+        self.hover = False
+        self.active = False
+
+        # Geometry, set by set_geometry from the layout
+        self.track_rect = pygame.Rect(0, 0, 0, 0)
+        self.hit_rect = pygame.Rect(0, 0, 0, 0)
+        self.handle_radius = 6
+        self.border_radius = 1
+        self.border_width = 1
+
+    def set_geometry(self, track_rect, hit_rect, handle_radius, border_radius, border_width):
+        """Place the slider; the widget rect covers the track and the handle"""
+        self.track_rect = track_rect
+        self.hit_rect = hit_rect
+        self.handle_radius = handle_radius
+        self.border_radius = border_radius
+        self.border_width = border_width
+        self.rect = pygame.Rect(track_rect.x - handle_radius - 1,
+                                track_rect.centery - handle_radius - 1,
+                                track_rect.width + 2 * handle_radius + 2,
+                                2 * handle_radius + 2)
+        self.dirty = True
+
+    def set_value(self, value):
+        if value != self.value:
+            self.value = value
+            self.dirty = True
+
+    def set_hover(self, hover):
+        if hover != self.hover:
+            self.hover = hover
+            self.dirty = True
+
+    def set_active(self, active):
+        if active != self.active:
+            self.active = active
+            self.dirty = True
+
+    def percent(self):
+        value_range = self.max - self.min
+        return (self.value - self.min) / value_range if value_range != 0 else 0
+
+    def value_at(self, x):
+        """Slider value for a horizontal mouse position"""
+        ratio = max(0, min(1, (x - self.track_rect.x) / self.track_rect.width))
+        return self.min + ratio * (self.max - self.min)
+
+    def handle_center(self):
+        selected_length = int(self.track_rect.width * self.percent())
+        return (self.track_rect.x + selected_length, self.track_rect.y + self.track_rect.height // 2)
+
+    def contains_handle(self, pos):
+        """Check if a position is over the handle"""
+        center_x, center_y = self.handle_center()
+        return (pos[0] - center_x) ** 2 + (pos[1] - center_y) ** 2 <= self.handle_radius ** 2
+
+    def render(self):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        track = self.track_rect.move(-self.rect.x, -self.rect.y)
+
+        # Track and fill
+        pygame.draw.rect(surface, GRAY, track, border_radius=self.border_radius)
+        selected_length = int(track.width * self.percent())
+        if selected_length > 0:
+            fill_rect = pygame.Rect(track.x, track.y, selected_length, track.height)
+            pygame.draw.rect(surface, BLUE, fill_rect, border_radius=self.border_radius)
+
+        # Handle
+        handle_center = (track.x + selected_length, track.y + track.height // 2)
+        handle_color = DARK_BLUE if self.hover or self.active else BLUE
+        pygame.draw.circle(surface, handle_color, handle_center, self.handle_radius)
+        pygame.draw.circle(surface, BLACK, handle_center, self.handle_radius, self.border_width)
+        return surface
+
+
+class Panel(Widget):
+    """Container that draws its children in order over an optional cached background"""
+    def __init__(self, rect=None, children=None, fill=None, border_color=None, border_width=0):
+        super().__init__(rect)
+        self.children = list(children) if children else []
+        self.fill = fill
+        self.border_color = border_color
+        self.border_width = border_width
+
+    def add(self, child):
+        self.children.append(child)
+        return child
+
+    def set_rect(self, rect):
+        rect = pygame.Rect(rect)
+        if rect != self.rect:
+            self.rect = rect
+            self.dirty = True
+
+    def draw(self, target):
+        if self.fill is not None or self.border_color is not None:
+            super().draw(target)
+        for child in self.children:
+            child.draw(target)
+
+    def render(self):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        if self.fill is not None:
+            surface.fill(self.fill)
+        if self.border_color is not None and self.border_width > 0:
+            pygame.draw.rect(surface, self.border_color, surface.get_rect(), self.border_width)
+        return surface
+
+
+class InfoReadout(Widget):
+    """Block of text lines refreshed at a fixed rate
+
+    Values are only accepted every 1/refresh_hz seconds, and each line is a
+    cached Label, so a line is re-rendered only when its formatted text
+    actually changed.
+    """
+    def __init__(self, font=None, color=DARK_BLUE, pos=(0, 0), line_height=16, max_bottom=None,
+                 refresh_hz=10, anchor="topleft"):
+        super().__init__()
+        self.font = font
+        self.color = color
+        self.pos = pos
+        self.line_height = line_height
+        self.max_bottom = max_bottom  # Lines reaching this y are not shown
+        self.anchor = anchor
+        self.line_labels = []
+        self.next_refresh = 0.0
+        self.set_refresh_rate(refresh_hz)
+
+    def set_refresh_rate(self, refresh_hz):
+        """Set how often new values are accepted; 0 or less refreshes every frame"""
+        self.refresh_hz = refresh_hz
+        self.interval = 1.0 / refresh_hz if refresh_hz > 0 else 0.0
+
+    def set_layout(self, font, pos, line_height, max_bottom):
+        """Place the lines; text is only re-rendered if the font changed"""
+        self.font = font
+        self.pos = pos
+        self.line_height = line_height
+        self.max_bottom = max_bottom
+        for index, label in enumerate(self.line_labels):
+            label.set_font(font)
+            label.set_position(self.line_position(index))
+
+    def line_position(self, index):
+        return (self.pos[0], self.pos[1] + index * self.line_height)
+
+    def invalidate(self):
+        """Accept new values on the next check, e.g. after the layout or the state jumped"""
+        self.next_refresh = 0.0
+
+    def due(self, now=None):
+        """Check whether the throttle allows new values"""
+        if now is None:
+            now = time.perf_counter()
+        return now >= self.next_refresh
+
+    def set_lines(self, lines, now=None):
+        """Accept new lines and restart the throttle interval"""
+        if now is None:
+            now = time.perf_counter()
+        self.next_refresh = now + self.interval
+
+        del self.line_labels[len(lines):]
+        for index, line in enumerate(lines):
+            if index < len(self.line_labels):
+                self.line_labels[index].set_text(line)
+            else:
+                self.line_labels.append(Label(line, self.font, self.color, self.anchor,
+                                              self.line_position(index)))
+
+    @property
+    def lines(self):
+        return [label.text for label in self.line_labels]
+
+    def visible_count(self):
+        """Number of lines that fit above max_bottom"""
+        count = len(self.line_labels)
+        if self.max_bottom is None or self.line_height <= 0:
+            return count
+        fit = 0
+        while fit < count and self.pos[1] + (fit + 1) * self.line_height < self.max_bottom:
+            fit += 1
+        return fit
+
+    def draw(self, target):
+        for label in self.line_labels[:self.visible_count()]:
+            label.draw(target)
+
+
+class Sparkline(Widget):
+    """Small line chart of a series with an optional reference line"""
+    def __init__(self, rect=None, color=BLUE, reference_color=GRAY, background=(255, 255, 255, 180)):
+        super().__init__(rect)
+        self.color = color
+        self.reference_color = reference_color
+        self.background = background
+        self.values = []
+        self.reference = None
+
+    def set_rect(self, rect):
+        rect = pygame.Rect(rect)
+        if rect != self.rect:
+            self.rect = rect
+            self.dirty = True
+
+    def set_values(self, values, reference=None):
+        self.values = list(values)
+        self.reference = reference
+        self.dirty = True
+
+    def render(self):
+        surface = pygame.Surface(self.rect.size, pygame.SRCALPHA)
+        surface.fill(self.background)
+        width, height = self.rect.size
+        top = max(self.values, default=0)
+        if self.reference:
+            top = max(top, self.reference)
+        top *= 1.25  # Headroom so the series does not run along the top edge
+        if top <= 0 or width < 2 or height < 2:
+            return surface
+
+        def y_for(value):
+            return height - 1 - int(value / top * (height - 2))
+
+        if self.reference:
+            reference_y = y_for(self.reference)
+            pygame.draw.line(surface, self.reference_color, (0, reference_y), (width - 1, reference_y))
+        if len(self.values) >= 2:
+            step = (width - 1) / (len(self.values) - 1)
+            points = [(int(i * step), y_for(value)) for i, value in enumerate(self.values)]
+            pygame.draw.lines(surface, self.color, False, points)
+        return surface
+
+
+class StripChart(Widget):
+    """Scrolling time-series chart that only draws the newest columns
+
+    The plot is kept on a persistent surface. New samples are queued by add()
+    and draw() scrolls the surface left by the number of new columns and draws
+    just the newest segment of every series, so the per-frame cost does not
+    depend on how much history is shown. The whole plot is rebuilt from the
+    kept samples only when it is resized or a value leaves its axis range.
+
+    series: (label, color, axis) per value; axes: {axis: (title, unit, low, high)}
+    """
+    def __init__(self, series, axes, span_seconds=10.0, rect=None, background=(255, 255, 255),
+                 axis_color=GRAY):
+        super().__init__(rect)
+        self.series = tuple(series)
+        self.axes = {axis: list(spec) for axis, spec in axes.items()}
+        self.span_seconds = span_seconds
+        self.background = background
+        self.axis_color = axis_color
+        self.samples = deque(maxlen=max(1, self.rect.width))
+        self.pending = 0  # Samples added since the surface was last brought up to date
+        self.elapsed = 0.0
+        self.font = None
+        self.legend = None
+
+    def set_rect(self, rect):
+        rect = pygame.Rect(rect)
+        if rect.size != self.rect.size:
+            self.samples = deque(self.samples, maxlen=max(1, rect.width))
+            self.dirty = True
+        self.rect = rect
+
+    def set_font(self, font):
+        if font is not self.font:
+            self.font = font
+            self.legend = None
+
+    def clear(self):
+        self.samples.clear()
+        self.elapsed = 0.0
+        self.dirty = True
+
+    def add(self, dt, values):
+        """Advance time by dt; record values once per column period that has passed"""
+        period = self.span_seconds / max(1, self.rect.width)
+        self.elapsed += dt
+        columns = int(self.elapsed / period)
+        if columns == 0:
+            return
+        self.elapsed -= columns * period
+        for _ in range(min(columns, self.samples.maxlen)):
+            self.push(values)
+
+    def push(self, values):
+        """Append one sample, widening an axis (and redrawing everything) if it does not fit"""
+        for (_, _, axis), value in zip(self.series, values):
+            spec = self.axes[axis]
+            if value < spec[2] or value > spec[3]:
+                spec[2] = min(spec[2], value * 1.5)
+                spec[3] = max(spec[3], value * 1.5)
+                self.dirty = True
+                self.legend = None
+        self.samples.append(tuple(values))
+        self.pending += 1
+
+    def y_for(self, value, axis, height):
+        _, _, low, high = self.axes[axis]
+        return int((high - value) / (high - low) * (height - 1))
+
+    def draw_axes(self, surface, x, width):
+        """Zero lines of the axes whose range includes zero, over columns x..x+width"""
+        height = surface.get_height()
+        for axis, (_, _, low, high) in self.axes.items():
+            if low <= 0 <= high:
+                y = self.y_for(0, axis, height)
+                pygame.draw.line(surface, self.axis_color, (x, y), (x + width - 1, y))
+
+    def render(self):
+        """Full redraw from the kept samples"""
+        surface = pygame.Surface(self.rect.size)
+        surface.fill(self.background)
+        width, height = self.rect.size
+        if width < 2 or height < 2:
+            return surface
+        self.draw_axes(surface, 0, width)
+        samples = list(self.samples)
+        start = width - len(samples)
+        for index, (_, color, axis) in enumerate(self.series):
+            points = [(start + i, self.y_for(sample[index], axis, height)) for i, sample in enumerate(samples)]
+            if len(points) >= 2:
+                pygame.draw.lines(surface, color, False, points)
+        self.pending = 0
+        return surface
+
+    def scroll(self):
+        """Shift the plot left by the pending columns and draw only those"""
+        surface = self.surface
+        width, height = self.rect.size
+        columns = min(self.pending, width)
+        self.pending = 0
+        surface.scroll(-columns, 0)
+
+        # Redraw the new columns and the previous newest one, which gains the segments to them,
+        # in the same series order as a full redraw. Lines start one sample further left;
+        # the column they touch there is already final and is restored afterwards.
+        redraw = min(columns + 1, width)
+        left = width - redraw
+        kept = surface.subsurface((left - 1, 0, 1, height)).copy() if left > 0 else None
+        surface.fill(self.background, (left, 0, redraw, height))
+        self.draw_axes(surface, left, redraw)
+
+        samples = [self.samples[i] for i in range(max(0, len(self.samples) - redraw - 1), len(self.samples))]
+        start = width - len(samples)
+        for index, (_, color, axis) in enumerate(self.series):
+            points = [(start + i, self.y_for(sample[index], axis, height)) for i, sample in enumerate(samples)]
+            if len(points) >= 2:
+                pygame.draw.lines(surface, color, False, points)
+        if kept is not None:
+            surface.blit(kept, (left - 1, 0))
+
+    def render_legend(self):
+        """Series labels in their colors, then the axis ranges"""
+        line_height = self.font.get_linesize()
+        labels = [self.font.render(label, True, color) for label, color, _ in self.series]
+        ranges = self.font.render("  ".join(f"{title} {low:.0f}~{high:.0f} {unit}"
+                                            for title, unit, low, high in self.axes.values()), True, DARK_BLUE)
+        width = max(sum(label.get_width() + 8 for label in labels), ranges.get_width())
+        legend = pygame.Surface((width, line_height * 2), pygame.SRCALPHA)
+        legend.fill((255, 255, 255, 200))
+        x = 0
+        for label in labels:
+            legend.blit(label, (x, 0))
+            x += label.get_width() + 8
+        legend.blit(ranges, (0, line_height))
+        return legend
+
+    def draw(self, target):
+        if self.dirty or self.surface is None or self.surface.get_size() != self.rect.size:
+            self.surface = self.render()
+            self.dirty = False
+        elif self.pending:
+            self.scroll()
+        target.blit(self.surface, self.rect)
+        if self.font is not None:
+            if self.legend is None:
+                self.legend = self.render_legend()
+            target.blit(self.legend, (self.rect.x + 4, self.rect.y + 2))